@@ -0,0 +1,189 @@
+# ==========================================
+# SkillGapAI - Batch Comparison
+# Many resumes against one JD: parallel parsing, one encode of the
+# distinct skills, one stacked similarity tensor, ranked shortlist
+# ==========================================
+
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from skillgapai_classify import CATEGORIES, classify_similarity, overall_score
+from skillgapai_core import NamedBytesIO
+from skillgapai_ingest import ingest_upload
+from skillgapai_pipeline import content_hash
+from skillgapai_tracing import span
+
+
+# ------------------------------------------
+# PARSING & EXTRACTION
+# ------------------------------------------
+def _parse_one(index, uploaded_file):
+    try:
+        ingested = ingest_upload(uploaded_file)
+        return index, uploaded_file.name, ingested.text, None, ingested.note
+    except Exception as e:
+        return index, uploaded_file.name, "", str(e), ""
+
+
+def _parse_bytes(index, name, data):
+    return _parse_one(index, NamedBytesIO(data, name))
+
+
+def parse_uploads(files, max_workers=8, pool=None, cache=None):
+    """
+    Parse uploaded files concurrently; yields (index, name, text, error, truncation note) as each finishes.
+
+    Without `pool` a thread pool is used. PDF backends are mostly pure Python
+    and hold the GIL, so pass a ProcessPoolExecutor to parse on several cores;
+    files are then shipped to the workers as (name, bytes). With a
+    ParsedDocuments `cache`, files parsed before (by any app) are served from
+    it first and newly parsed text is added to it.
+    """
+    todo = list(range(len(files)))
+    if cache is not None:
+        hashes = [content_hash(f.getvalue()) for f in files]
+        todo = []
+        for i, f in enumerate(files):
+            doc = cache.get(hashes[i])
+            if doc is None:
+                todo.append(i)
+            else:
+                yield i, f.name, doc["text"], None, doc["note"]
+
+    for result in _parse_all([(i, files[i]) for i in todo], max_workers, pool):
+        i, name, text, error, note = result
+        if cache is not None and text and not error:
+            cache.put(hashes[i], name, text, note)
+        yield result
+
+
+def _parse_all(indexed_files, max_workers, pool):
+    if pool is not None:
+        futures = [pool.submit(_parse_bytes, i, f.name, f.getvalue()) for i, f in indexed_files]
+        for future in as_completed(futures):
+            yield future.result()
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # copy_context keeps traced() spans working inside the worker threads
+        futures = [pool.submit(contextvars.copy_context().run, _parse_one, i, f) for i, f in indexed_files]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+# Each spaCy worker process loads its own pipeline, so one only pays off for this many docs
+MIN_DOCS_PER_PROCESS = 32
+MAX_EXTRACT_PROCESSES = 4
+
+
+def extract_processes(n_docs, max_processes=MAX_EXTRACT_PROCESSES):
+    """nlp.pipe worker processes for a batch of n_docs (1 for small batches)"""
+    return max(1, min(max_processes, os.cpu_count() or 1, n_docs // MIN_DOCS_PER_PROCESS))
+
+
+def extract_skill_lists(nlp, matcher, texts, batch_size=32, n_process=None, candidates=None):
+    """
+    Run the PhraseMatcher over all texts with nlp.pipe; yields (index, sorted skills) in order.
+
+    The spaCy pipeline runs in `n_process` worker processes (default: from the
+    batch size via extract_processes); matching and candidate scoring happen
+    on the returned docs in this process. With a CandidateExtractor,
+    open-vocabulary skills are added too; docs are scored one nlp.pipe batch
+    at a time so phrases shared within a batch are encoded once while results
+    still stream.
+    """
+    n_process = extract_processes(len(texts)) if n_process is None else n_process
+    with span("phrase_match_skills", docs=len(texts), processes=n_process):
+        pending = []
+        for i, doc in enumerate(nlp.pipe(texts, batch_size=batch_size, n_process=n_process)):
+            found = set(nlp.vocab.strings[m[0]] for m in matcher(doc))
+            if candidates is None:
+                yield i, sorted(found)
+                continue
+            pending.append((i, found, doc))
+            if len(pending) == batch_size or i == len(texts) - 1:
+                extra = candidates.skills_for_docs([d for _, _, d in pending])
+                for (j, skills, _), more in zip(pending, extra):
+                    yield j, sorted(skills.union(more))
+                pending = []
+
+
+# ------------------------------------------
+# ENCODING & STACKED SIMILARITY
+# ------------------------------------------
+def encode_union(encoder, skill_lists, jd_skills):
+    """Encode every distinct skill across all resumes and the JD exactly once (unit-normalized)"""
+    vocab = sorted(set(jd_skills).union(*skill_lists))
+    with span("encode", skills=len(vocab)):
+        emb = np.asarray(encoder.encode(vocab), dtype=np.float32) if vocab else np.zeros((0, 1), np.float32)
+    norms = np.linalg.norm(emb, axis=1, keepdims=True)
+    emb = emb / np.where(norms == 0, 1, norms)
+    return {skill: i for i, skill in enumerate(vocab)}, emb
+
+
+def stacked_similarity(skill_lists, jd_skills, vocab_index, emb):
+    """
+    (N resumes, max resume skills, JD skills) cosine tensor, padded with -inf.
+
+    Similarities between every distinct skill and the JD skills are computed in
+    one matrix product, then gathered per resume through a padded index array.
+    """
+    with span("cosine_similarity", resumes=len(skill_lists)):
+        jd_idx = np.array([vocab_index[s] for s in jd_skills], dtype=np.int64)
+        sim = emb @ emb[jd_idx].T
+        sim = np.vstack([sim, np.full((1, len(jd_skills)), -np.inf, dtype=np.float32)])
+
+        pad = sim.shape[0] - 1
+        width = max((len(s) for s in skill_lists), default=0)
+        idx = np.full((len(skill_lists), max(width, 1)), pad, dtype=np.int64)
+        for n, skills in enumerate(skill_lists):
+            idx[n, :len(skills)] = [vocab_index[s] for s in skills]
+        return sim[idx]
+
+
+# ------------------------------------------
+# LEADERBOARD & INDEXING
+# ------------------------------------------
+def rank_candidates(names, skill_lists, jd_skills, sim_tensor, thresholds=None, weights=None):
+    """Classify the whole batch at once and return the shortlist sorted by overall score"""
+    result = classify_similarity(sim_tensor, thresholds)
+    scores = np.atleast_1d(overall_score(result, weights))
+    labels = result["label"]
+    counts = {c: (labels == k).sum(axis=1) for k, c in enumerate(CATEGORIES)}
+    jd = np.asarray(jd_skills, dtype=object)
+    missing = [", ".join(jd[row == CATEGORIES.index("Missing")]) for row in labels]
+
+    board = pd.DataFrame({
+        "Candidate": names,
+        "Overall Score": scores,
+        "Matched": counts["Matched"],
+        "Partial": counts["Partial"],
+        "Missing": counts["Missing"],
+        "Resume Skills": [len(s) for s in skill_lists],
+        "Missing Skills": missing,
+    })
+    board = board.sort_values(["Overall Score", "Matched"], ascending=False, kind="stable")
+    board.insert(0, "Rank", np.arange(1, len(board) + 1))
+    return board.reset_index(drop=True), result
+
+
+def skill_evidence(skill_lists, vocab_index, emb, reference, reference_emb, min_score):
+    """
+    Per-candidate {skill: score} postings that do not depend on any JD: the
+    candidate's own skills at 1.0, plus each reference skill their closest
+    skill reaches semantically (>= min_score). Embeddings are unit-normalized.
+    """
+    sims = emb @ reference_emb.T if len(reference) else np.zeros((len(emb), 0), np.float32)
+    items = []
+    for skills in skill_lists:
+        entry = {s: 1.0 for s in skills}
+        rows = [vocab_index[s] for s in skills]
+        if rows:
+            best = sims[rows].max(axis=0)
+            for j in np.flatnonzero(best >= min_score):
+                entry.setdefault(reference[j], float(best[j]))
+        items.append(entry)
+    return items
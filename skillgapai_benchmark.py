@@ -0,0 +1,289 @@
+# ==========================================
+# SkillGapAI - End-to-End Benchmark
+# Synthetic resume / JD corpus + per-stage latency report
+#
+#   python skillgapai_benchmark.py --resumes 200 --jds 10 --encoder stub --spacy blank
+# ==========================================
+
+import argparse
+import hashlib
+import json
+import random
+import time
+import zipfile
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+import numpy as np
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from sklearn.metrics.pairwise import cosine_similarity
+
+from skillgapai_classify import DEFAULT_THRESHOLDS, classify_similarity, group_by_category, overall_score
+from skillgapai_core import (
+    SKILL_ALIASES, NamedBytesIO, clean_text, extract_raw_text, load_nlp_and_matcher,
+    phrase_match_skills, create_csv_bytes, create_pdf_report,
+)
+
+STAGES = [
+    "extract_text", "clean_text", "phrase_match_skills", "encode",
+    "cosine_similarity", "classification", "create_pdf_report", "csv_export",
+]
+
+# ------------------------------------------
+# SYNTHETIC CORPUS
+# ------------------------------------------
+FILLER = [
+    "Worked closely with stakeholders to deliver projects on schedule.",
+    "Responsible for maintaining documentation and internal reporting.",
+    "Participated in weekly planning meetings and design reviews.",
+    "Supported the operations team during quarterly releases.",
+    "Coordinated with vendors to resolve service incidents.",
+    "Improved onboarding material for new team members.",
+    "Prepared monthly summaries for senior management.",
+    "Reviewed requirements and estimated delivery timelines.",
+]
+SKILL_TEMPLATES = [
+    "Built production features using {}.",
+    "Hands-on experience with {} and {}.",
+    "Strong background in {}.",
+    "Applied {} to improve team outcomes.",
+    "Delivered reports combining {} with {}.",
+]
+# (label, sentences) and skill sentence ratios
+LENGTHS = [("short", 12), ("medium", 45), ("long", 160)]
+DENSITIES = [0.1, 0.3, 0.6]
+FORMATS = ("pdf", "docx", "txt")
+
+
+def _synthetic_text(rng, kind, n_sentences, density):
+    aliases = list(SKILL_ALIASES.items())
+    title = "Job Description" if kind == "jd" else "Resume"
+    lines = [f"{title} {rng.randint(1000, 9999)}", "Summary"]
+    skills = set()
+    for _ in range(n_sentences):
+        if rng.random() < density:
+            template = rng.choice(SKILL_TEMPLATES)
+            picks = [rng.choice(aliases) for _ in range(template.count("{}"))]
+            skills.update(canonical for canonical, _ in picks)
+            lines.append(template.format(*[rng.choice(alias_list) for _, alias_list in picks]))
+        else:
+            lines.append(rng.choice(FILLER))
+    return "\n".join(lines), sorted(skills)
+
+
+def _to_pdf(text):
+    bio = BytesIO()
+    # invariant=1 drops timestamps/ids so the bytes are reproducible
+    c = canvas.Canvas(bio, pagesize=letter, invariant=1)
+    _, height = letter
+    y = height - 40
+    c.setFont("Helvetica", 10)
+    for line in text.splitlines():
+        for i in range(0, max(len(line), 1), 95):
+            if y < 60:
+                c.showPage()
+                c.setFont("Helvetica", 10)
+                y = height - 40
+            c.drawString(40, y, line[i:i+95])
+            y -= 12
+    c.save()
+    return bio.getvalue()
+
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def _to_docx(text):
+    """Minimal WordprocessingML package (enough for docx2txt) with fixed zip timestamps"""
+    paragraphs = "".join(f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(line)}</w:t></w:r></w:p>"
+                         for line in text.splitlines())
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{paragraphs}</w:body></w:document>'
+    )
+    bio = BytesIO()
+    with zipfile.ZipFile(bio, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in [("[Content_Types].xml", _DOCX_CONTENT_TYPES),
+                           ("_rels/.rels", _DOCX_RELS),
+                           ("word/document.xml", document)]:
+            zf.writestr(zipfile.ZipInfo(name, date_time=(2020, 1, 1, 0, 0, 0)), data)
+    return bio.getvalue()
+
+
+WRITERS = {"pdf": _to_pdf, "docx": _to_docx, "txt": lambda text: text.encode("utf-8")}
+
+
+def generate_corpus(n_resumes=50, n_jds=5, seed=42, formats=FORMATS):
+    """Deterministic list of synthetic documents (dicts with name, kind, format, data, skills)"""
+    rng = random.Random(seed)
+    docs = []
+    for kind, count in [("resume", n_resumes), ("jd", n_jds)]:
+        for i in range(count):
+            length, n_sentences = LENGTHS[i % len(LENGTHS)]
+            density = DENSITIES[(i // len(LENGTHS)) % len(DENSITIES)]
+            fmt = formats[i % len(formats)]
+            text, skills = _synthetic_text(rng, kind, n_sentences, density)
+            docs.append({
+                "name": f"{kind}_{i:05d}_{length}.{fmt}",
+                "kind": kind,
+                "format": fmt,
+                "length": length,
+                "density": density,
+                "data": WRITERS[fmt](text),
+                "skills": skills,
+            })
+    return docs
+
+
+# ------------------------------------------
+# ENCODERS
+# ------------------------------------------
+class StubEncoder:
+    """Offline stand-in for SentenceTransformer: hashed character trigrams, L2-normalized"""
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def _vector(self, text):
+        vec = np.zeros(self.dim, dtype=np.float32)
+        padded = f"  {text.lower()} "
+        for i in range(len(padded) - 2):
+            h = int.from_bytes(hashlib.blake2b(padded[i:i+3].encode(), digest_size=4).digest(), "little")
+            vec[h % self.dim] += 1.0 if h & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def encode(self, texts):
+        if not len(texts):
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([self._vector(t) for t in texts])
+
+
+def load_encoder(name):
+    if name == "stub":
+        return StubEncoder()
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name)
+
+
+# ------------------------------------------
+# HARNESS
+# ------------------------------------------
+class StageTimer:
+    def __init__(self):
+        self.samples = {stage: [] for stage in STAGES}
+
+    def time(self, stage, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.samples[stage].append(time.perf_counter() - start)
+        return result
+
+
+def _process_document(timer, doc, nlp, matcher, encoder):
+    raw = timer.time("extract_text", extract_raw_text, NamedBytesIO(doc["data"], doc["name"]))
+    text = timer.time("clean_text", clean_text, raw)
+    skills = timer.time("phrase_match_skills", phrase_match_skills, nlp, matcher, text)
+    emb = timer.time("encode", encoder.encode, skills)
+    return text, skills, emb
+
+
+def run_benchmark(docs, nlp, matcher, encoder, thresholds=None):
+    """Process every resume against a JD (round robin) and collect per-stage timings"""
+    timer = StageTimer()
+    jds = [_process_document(timer, d, nlp, matcher, encoder) for d in docs if d["kind"] == "jd"]
+    resumes = [d for d in docs if d["kind"] == "resume"]
+    if not jds or not resumes:
+        raise ValueError("Benchmark needs at least one resume and one job description")
+
+    wall = []
+    for i, doc in enumerate(resumes):
+        start = time.perf_counter()
+        jd_text, jd_skills, jd_emb = jds[i % len(jds)]
+        text, skills, emb = _process_document(timer, doc, nlp, matcher, encoder)
+        if skills and jd_skills:
+            sim = timer.time("cosine_similarity", cosine_similarity, emb, jd_emb)
+            result = timer.time("classification", classify_similarity, sim, thresholds)
+            overall_score(result)
+            missing = [s for s, _ in group_by_category(result, jd_skills)["Missing"]]
+        else:
+            missing = list(jd_skills)
+        extra = sorted(set(skills) - set(jd_skills))
+        timer.time("create_pdf_report", create_pdf_report, text, jd_text, skills, jd_skills, missing, extra)
+        timer.time("csv_export", create_csv_bytes, skills, jd_skills, missing, extra)
+        wall.append(time.perf_counter() - start)
+    return timer.samples, wall
+
+
+def summarize(samples, wall):
+    """p50/p95/p99 in milliseconds and throughput for every stage and end-to-end"""
+    rows = []
+    for stage in STAGES + ["end_to_end"]:
+        values = np.asarray(wall if stage == "end_to_end" else samples[stage], dtype=np.float64)
+        if not values.size:
+            continue
+        p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+        rows.append({
+            "stage": stage,
+            "calls": int(values.size),
+            "p50_ms": round(p50, 3),
+            "p95_ms": round(p95, 3),
+            "p99_ms": round(p99, 3),
+            "throughput_per_s": round(values.size / values.sum(), 1) if values.sum() else None,
+        })
+    return rows
+
+
+def print_table(rows):
+    header = f"{'stage':<22}{'calls':>7}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'ops/s':>11}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['stage']:<22}{r['calls']:>7}{r['p50_ms']:>11.3f}{r['p95_ms']:>11.3f}"
+              f"{r['p99_ms']:>11.3f}{r['throughput_per_s'] or 0:>11.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SkillGapAI end-to-end benchmark")
+    parser.add_argument("--resumes", type=int, default=60)
+    parser.add_argument("--jds", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS), choices=FORMATS)
+    parser.add_argument("--encoder", default="stub", help="'stub' (offline) or a SentenceTransformer model name")
+    parser.add_argument("--spacy", default="blank", help="'blank' (offline tokenizer) or a spaCy model name")
+    parser.add_argument("--json", help="write the summary to this JSON file")
+    args = parser.parse_args(argv)
+
+    docs = generate_corpus(args.resumes, args.jds, args.seed, tuple(args.formats))
+    nlp, matcher = load_nlp_and_matcher(SKILL_ALIASES, model=None if args.spacy == "blank" else args.spacy)
+    encoder = load_encoder(args.encoder)
+
+    samples, wall = run_benchmark(docs, nlp, matcher, encoder, DEFAULT_THRESHOLDS)
+    rows = summarize(samples, wall)
+    print_table(rows)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "stages": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# ==========================================
+# SkillGapAI - Threshold Calibration
+# Similarities for the labeled gold set are computed (and cached) once;
+# every (Partial, Matched) threshold pair is then scored in one vectorized
+# sweep and the macro-F1 best pair is written to the thresholds config.
+# Only the calibration half of the gold set is fitted on; the held-out half
+# is scored with the chosen pair and left for skillgapai_eval.py
+#
+#   python skillgapai_calibrate.py --encoder all-MiniLM-L6-v2 --spacy en_core_web_sm
+# ==========================================
+
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from skillgapai_benchmark import load_encoder
+from skillgapai_classify import CATEGORIES, MATCHED, MISSING, PARTIAL, THRESHOLDS_PATH
+from skillgapai_core import DATA_DIR, SKILL_ALIASES, load_nlp_and_matcher
+from skillgapai_eval import CALIBRATION_FRACTION, GOLD_PATH, calibration_split, extract_skills, load_gold, skill_similarity
+from skillgapai_pipeline import content_hash
+from skillgapai_tracing import span
+
+# The gold set has a few dozen labels per split; a finer grid only fits their noise
+DEFAULT_STEP = 0.025
+# Part of the similarity cache key; bump when skill extraction changes so cached matrices are recomputed
+EXTRACTION_VERSION = 2
+
+
+# ------------------------------------------
+# SIMILARITY CACHE
+# ------------------------------------------
+def gold_similarities(pairs, encoder_name, spacy_model="blank", section_aware=True, skills="extracted", cache_dir=None):
+    """
+    (similarity matrices, JD skill lists) for every pair, cached on disk.
+
+    Matrices are stored flattened with their shapes in one .npz keyed by the
+    encoder, extraction settings and gold set, so re-calibrating never
+    re-runs spaCy or the encoder.
+    """
+    cache_dir = os.path.join(DATA_DIR, "calibration_cache") if cache_dir is None else cache_dir
+    key = content_hash((EXTRACTION_VERSION, encoder_name, spacy_model, section_aware, skills, [(p["id"], p["resume"], p["jd"], p["labels"]) for p in pairs]))
+    path = os.path.join(cache_dir, f"{key}.npz")
+
+    if os.path.exists(path):
+        with np.load(path) as data:
+            flat, shapes = data["sims"], data["shapes"]
+            jd_lists = json.loads(str(data["jd_skills"]))
+    else:
+        encoder = load_encoder(encoder_name)
+        nlp = matcher = None
+        if skills == "extracted":
+            nlp, matcher = load_nlp_and_matcher(SKILL_ALIASES, model=None if spacy_model == "blank" else spacy_model)
+        mats, jd_lists = [], []
+        with span("calibration_similarities", pairs=len(pairs)):
+            for pair in pairs:
+                if skills == "extracted":
+                    resume_skills = extract_skills(nlp, matcher, pair["resume"], section_aware)
+                    jd_skills = extract_skills(nlp, matcher, pair["jd"], False)
+                else:
+                    resume_skills, jd_skills = pair["resume_skills"], pair["jd_skills"]
+                mats.append(skill_similarity(encoder, resume_skills, jd_skills))
+                jd_lists.append(list(jd_skills))
+        flat = np.concatenate([m.ravel() for m in mats]).astype(np.float32) if mats else np.zeros(0, np.float32)
+        shapes = np.array([m.shape for m in mats], dtype=np.int64).reshape(-1, 2)
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(path, sims=flat, shapes=shapes, jd_skills=np.array(json.dumps(jd_lists)))
+
+    mats, offset = [], 0
+    for rows, cols in shapes:
+        mats.append(flat[offset:offset + rows * cols].reshape(rows, cols))
+        offset += rows * cols
+    return mats, jd_lists
+
+
+def best_scores(pairs, mats, jd_lists):
+    """
+    (best similarity, gold label id) for every gold JD skill.
+
+    Classification only looks at each JD column's max, so the sweep works on
+    these flat arrays. A gold JD skill the pipeline never extracted gets -inf,
+    which every threshold pair labels Missing.
+    """
+    scores, gold = [], []
+    ids = {c: i for i, c in enumerate(CATEGORIES)}
+    for pair, sim, jd_skills in zip(pairs, mats, jd_lists):
+        col = {s: i for i, s in enumerate(jd_skills)}
+        col_max = sim.max(axis=0) if sim.shape[0] else np.full(sim.shape[1], -np.inf, dtype=np.float32)
+        for skill, label in pair["labels"].items():
+            scores.append(col_max[col[skill]] if skill in col else -np.inf)
+            gold.append(ids[label])
+    return np.array(scores, dtype=np.float64), np.array(gold, dtype=np.int64)
+
+
+# ------------------------------------------
+# VECTORIZED SWEEP
+# ------------------------------------------
+def sweep(scores, gold, grid):
+    """
+    Per-category F1 for every (Partial, Matched) pair of grid values in one pass.
+
+    For each gold category the scores are sorted once; a searchsorted over
+    the whole grid gives how many of them reach each threshold. Counts for
+    every threshold pair then follow by broadcasting (partial along rows,
+    matched along columns): Matched = reach(m), Partial = reach(p) - reach(m),
+    Missing = the rest. Returns an (n_categories, len(grid), len(grid)) F1
+    array with NaN where partial > matched.
+    """
+    grid = np.asarray(grid, dtype=np.float64)
+    n = grid.size
+    # reach[c, t]: gold-c skills with score >= grid[t]
+    reach = np.stack([
+        np.count_nonzero(gold == c) - np.searchsorted(np.sort(scores[gold == c]), grid, side="left")
+        for c in range(len(CATEGORIES))
+    ]).astype(np.float64)
+    n_gold = np.bincount(gold, minlength=len(CATEGORIES)).astype(np.float64)
+
+    p, m = reach[:, :, None], reach[:, None, :]
+    tp = np.empty((len(CATEGORIES), n, n))
+    tp[MATCHED] = m[MATCHED]
+    tp[PARTIAL] = p[PARTIAL] - m[PARTIAL]
+    tp[MISSING] = n_gold[MISSING] - p[MISSING]
+
+    all_p, all_m = p.sum(axis=0), m.sum(axis=0)
+    n_pred = np.empty_like(tp)
+    n_pred[MATCHED] = all_m
+    n_pred[PARTIAL] = all_p - all_m
+    n_pred[MISSING] = gold.size - all_p
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(n_pred > 0, tp / n_pred, 0.0)
+        recall = np.where(n_gold[:, None, None] > 0, tp / n_gold[:, None, None], 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    f1[:, grid[:, None] > grid[None, :]] = np.nan
+    return f1
+
+
+def calibrate(scores, gold, step=DEFAULT_STEP):
+    """Thresholds with the best macro F1 on the grid (ties go to the lowest pair)"""
+    grid = np.round(np.arange(0.0, 1.0 + step / 2, step), 6)
+    with span("threshold_sweep", pairs=grid.size * (grid.size + 1) // 2):
+        f1 = sweep(scores, gold, grid)
+        macro = f1.mean(axis=0)
+        valid = ~np.isnan(macro)
+        i, j = np.unravel_index(np.argmax(np.where(valid, macro, -np.inf)), macro.shape)
+    return {
+        "Partial": float(grid[i]),
+        "Matched": float(grid[j]),
+        "macro_f1": round(float(macro[i, j]), 4),
+        "f1": {c: round(float(f1[k, i, j]), 4) for k, c in enumerate(CATEGORIES)},
+        "pairs_evaluated": int(valid.sum()),
+    }
+
+
+def write_thresholds(model_name, result, meta, path=THRESHOLDS_PATH):
+    """Merge one encoder's calibrated thresholds into the config file read by the apps"""
+    config = {"format": "skillgapai.thresholds/v1", "models": {}}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    config.setdefault("models", {})[model_name] = {**result, **meta}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    return config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibrate Matched/Partial thresholds on the gold set")
+    parser.add_argument("--gold", default=GOLD_PATH)
+    parser.add_argument("--encoder", default="all-MiniLM-L6-v2", help="'stub' (offline) or a SentenceTransformer model name")
+    parser.add_argument("--spacy", default="en_core_web_sm", help="'blank' (offline tokenizer) or a spaCy model name")
+    parser.add_argument("--full-text", action="store_true", help="match resumes as one body instead of by section")
+    parser.add_argument("--skills", choices=["extracted", "gold"], default="extracted",
+                        help="classify extracted skills (end to end) or the gold skill lists (classifier only)")
+    parser.add_argument("--step", type=float, default=DEFAULT_STEP)
+    parser.add_argument("--holdout", type=float, default=1 - CALIBRATION_FRACTION,
+                        help="share of gold pairs kept out of the fit for evaluation (0 fits on every pair)")
+    parser.add_argument("--output", default=THRESHOLDS_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="print the result without writing the config")
+    args = parser.parse_args(argv)
+
+    pairs = load_gold(args.gold)
+    fit_pairs, held_out = calibration_split(pairs, 1 - args.holdout)
+    if not fit_pairs:
+        parser.error("--holdout leaves no pairs to calibrate on")
+    mats, jd_lists = gold_similarities(pairs, args.encoder, args.spacy, not args.full_text, args.skills)
+    by_id = {p["id"]: (sim, jd) for p, sim, jd in zip(pairs, mats, jd_lists)}
+
+    def scores_for(subset):
+        return best_scores(subset, [by_id[p["id"]][0] for p in subset], [by_id[p["id"]][1] for p in subset])
+
+    scores, gold = scores_for(fit_pairs)
+    result = calibrate(scores, gold, args.step)
+    if held_out:
+        h_scores, h_gold = scores_for(held_out)
+        h_f1 = sweep(h_scores, h_gold, [result["Partial"], result["Matched"]])[:, 0, 1]
+        result["holdout_macro_f1"] = round(float(h_f1.mean()), 4)
+
+    print(f"{args.encoder}: Partial >= {result['Partial']:.3f}, Matched >= {result['Matched']:.3f} "
+          f"(macro F1 {result['macro_f1']:.3f} over {result['pairs_evaluated']} threshold pairs, "
+          f"{gold.size} labels from {len(fit_pairs)} pairs)")
+    print("  per-category F1: " + ", ".join(f"{c} {v:.3f}" for c, v in result["f1"].items()))
+    if held_out:
+        print(f"  held-out macro F1 {result['holdout_macro_f1']:.3f} "
+              f"({h_gold.size} labels from {len(held_out)} pairs)")
+    if not args.dry_run:
+        write_thresholds(args.encoder, result, {
+            "spacy": args.spacy,
+            "section_aware": not args.full_text,
+            "skills": args.skills,
+            "labels": int(gold.size),
+            "step": args.step,
+            "calibration_pairs": [p["id"] for p in fit_pairs],
+            "calibrated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }, args.output)
+        print(f"  wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# ==========================================
+# SkillGapAI - Open-Vocabulary Skill Candidates
+# Noun-chunk / n-gram skill spans scored against the taxonomy embeddings
+# ==========================================
+
+from skillgapai_normalize import display_name
+from skillgapai_tracing import span
+
+# Candidates must be at least this close to a taxonomy entry to count as a skill
+# (stricter than plain normalization: free-text spans are noisier than typed skills)
+DEFAULT_MIN_SCORE = 0.70
+
+MAX_WORDS = 4
+_EDGE_POS = {"DET", "PRON", "PUNCT", "NUM", "CCONJ", "ADP", "PART", "SYM", "SPACE"}
+
+
+def _trim(tokens):
+    """Drop determiners, pronouns, stop words and punctuation from both ends of a span"""
+    start, end = 0, len(tokens)
+    while start < end and (tokens[start].is_stop or tokens[start].pos_ in _EDGE_POS or not tokens[start].is_alpha):
+        start += 1
+    while end > start and (tokens[end - 1].is_stop or tokens[end - 1].pos_ in _EDGE_POS or not tokens[end - 1].is_alpha):
+        end -= 1
+    return tokens[start:end]
+
+
+def _phrase(tokens):
+    text = " ".join(t.lower_ for t in tokens)
+    return text if len(tokens) <= MAX_WORDS and len(text) >= 2 else None
+
+
+def candidate_phrases(doc, max_ngram=3):
+    """
+    Distinct lowercase skill-like spans in a doc.
+
+    Uses noun chunks when the pipeline has a dependency parser; otherwise
+    (blank pipelines) falls back to 1..max_ngram-grams over runs of
+    non-stop-word alphabetic tokens.
+    """
+    phrases = set()
+    if doc.has_annotation("DEP"):
+        for chunk in doc.noun_chunks:
+            phrase = _phrase(_trim(list(chunk)))
+            if phrase:
+                phrases.add(phrase)
+        return phrases
+
+    run = []
+    for token in list(doc) + [None]:
+        if token is not None and token.is_alpha and not token.is_stop:
+            run.append(token.lower_)
+            continue
+        for n in range(1, max_ngram + 1):
+            for i in range(len(run) - n + 1):
+                phrase = " ".join(run[i:i + n])
+                if len(phrase) >= 2:
+                    phrases.add(phrase)
+        run = []
+    return phrases
+
+
+class CandidateExtractor:
+    """
+    Open-vocabulary skill extraction on top of a SkillNormalizer.
+
+    Phrases are deduplicated across every doc in a call before scoring, and the
+    normalizer memoizes each phrase, so encoding cost follows the number of
+    distinct phrases seen rather than the number of documents.
+    """
+
+    def __init__(self, normalizer, min_score=DEFAULT_MIN_SCORE, labels=None):
+        self.normalizer = normalizer
+        self.min_score = min_score
+        self.labels = labels or {}
+
+    def label(self, canonical):
+        return self.labels.get(canonical, display_name(canonical))
+
+    def skills_for_docs(self, docs):
+        """Sorted skill labels per doc (same order as docs)"""
+        per_doc = [candidate_phrases(doc) for doc in docs]
+        unique = sorted(set().union(*per_doc)) if per_doc else []
+        with span("candidate_skills", docs=len(per_doc), phrases=len(unique)):
+            resolved = {
+                e.phrase: self.label(e.canonical)
+                for e in self.normalizer.normalize(unique)
+                if e.canonical is not None and e.score >= self.min_score
+            }
+        return [sorted({resolved[p] for p in phrases if p in resolved}) for phrases in per_doc]
+
+    def extract_many(self, nlp, texts, batch_size=32, n_process=1):
+        """Run nlp.pipe over texts and score all their candidate spans in one batch"""
+        return self.skills_for_docs(list(nlp.pipe(texts, batch_size=batch_size, n_process=n_process)))
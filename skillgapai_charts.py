@@ -0,0 +1,310 @@
+# ==========================================
+# SkillGapAI - Chart Service
+# Memoized radar / heatmap rendering + Vega-Lite specs
+# ==========================================
+
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+from matplotlib.figure import Figure
+
+from skillgapai_pipeline import content_hash
+from skillgapai_tracing import span
+
+
+# ------------------------------------------
+# FIGURE BUILDERS
+# Plain Figure objects, never pyplot: Streamlit runs scripts on concurrent
+# threads and pyplot's current-figure state is process-global.
+# ------------------------------------------
+def sweet_radar_figure(skills, scores):
+    """Compact dark radar used by Milestone 3"""
+    scores = list(scores) + list(scores[:1])
+    angles = np.linspace(0, 2*np.pi, len(skills), endpoint=False).tolist()
+    angles += angles[:1]
+
+    fig = Figure(figsize=(4.8, 4.8))
+    ax = fig.add_subplot(111, polar=True)
+
+    fig.patch.set_facecolor("#0f172a")
+    ax.set_facecolor("#020617")
+    ax.grid(color="#38bdf8", linestyle="dotted", linewidth=1, alpha=0.6)
+
+    ax.set_thetagrids(np.degrees(angles[:-1]), skills, fontsize=9, color="#e0f2fe")
+    ax.set_yticks([0.25, 0.5, 0.75, 1.0])
+    ax.set_yticklabels(["0.25","0.5","0.75","1.0"], color="#93c5fd", fontsize=8)
+    ax.set_ylim(0, 1)
+
+    ax.plot(
+        angles, scores,
+        linewidth=2.5,
+        color="#22d3ee",
+        marker="o",
+        markersize=6,
+        markerfacecolor="#facc15"
+    )
+    ax.fill(angles, scores, color="#38bdf8", alpha=0.35)
+
+    ax.set_title(
+        "Skill Match Radar",
+        size=12,
+        color="#e0f2fe",
+        pad=15,
+        fontweight="bold"
+    )
+    return fig
+
+
+def radar_figure(skills, scores):
+    """Plain radar used by the integrated app"""
+    scores = list(scores) + list(scores[:1])
+    angles = np.linspace(0, 2*np.pi, len(skills), endpoint=False).tolist()
+    angles += angles[:1]
+    fig = Figure(figsize=(4.5,4.5))
+    ax = fig.add_subplot(111, polar=True)
+    ax.plot(angles, scores, linewidth=2)
+    ax.fill(angles, scores, alpha=0.3)
+    ax.set_thetagrids(np.degrees(angles[:-1]), skills)
+    ax.set_ylim(0,1)
+    return fig
+
+
+def heatmap_figure(sim_matrix, row_labels, col_labels, figsize=(5.5, 3), fontsize=9):
+    """Resume × JD similarity heatmap"""
+    fig = Figure(figsize=figsize)
+    ax = fig.add_subplot(111)
+    im = ax.imshow(sim_matrix, cmap="viridis")
+
+    ax.set_xticks(range(len(col_labels)))
+    ax.set_xticklabels(col_labels, rotation=30, ha="right", fontsize=fontsize)
+    ax.set_yticks(range(len(row_labels)))
+    ax.set_yticklabels(row_labels, fontsize=fontsize)
+
+    fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+    fig.tight_layout()
+    return fig
+
+
+# ------------------------------------------
+# LARGE HEATMAPS: REORDER, TOP-K, TILES
+# ------------------------------------------
+# Displayed heatmaps never exceed MAX_SIDE × MAX_SIDE cells, whatever the
+# size of the underlying matrix; larger matrices are drilled into tile by tile.
+MAX_SIDE = 40
+CLUSTER_LIMIT = 600
+
+try:
+    from scipy.cluster.hierarchy import leaves_list, linkage
+except Exception:
+    linkage = None
+
+
+class HeatmapView:
+    """A bounded slice of a similarity matrix plus the original indices behind every cell"""
+
+    def __init__(self, matrix, row_labels, col_labels, row_groups, col_groups, tiled):
+        self.matrix = matrix
+        self.row_labels = row_labels
+        self.col_labels = col_labels
+        self.row_groups = row_groups
+        self.col_groups = col_groups
+        self.tiled = tiled
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+
+def heatmap_order(sim_matrix, method="max"):
+    """Row/column permutation grouping strong matches together ("max" or "cluster")"""
+    sim = np.asarray(sim_matrix, dtype=np.float32)
+    if method == "cluster" and linkage is not None and max(sim.shape) <= CLUSTER_LIMIT and min(sim.shape) > 1:
+        row_order = leaves_list(linkage(sim, method="average", metric="cosine"))
+        col_order = leaves_list(linkage(sim.T, method="average", metric="cosine"))
+        return row_order, col_order
+    # stable descending sort on the best score of each row / column
+    row_order = np.argsort(-sim.max(axis=1), kind="stable")
+    col_order = np.argsort(-sim.max(axis=0), kind="stable")
+    return row_order, col_order
+
+
+def _tile_bounds(n, max_side):
+    size = max(1, int(np.ceil(n / max_side)))
+    return np.arange(0, n, size)
+
+
+def _group_label(labels, idx):
+    first = str(labels[idx[0]])
+    return first if len(idx) == 1 else f"{first} … (+{len(idx) - 1})"
+
+
+def heatmap_view(sim_matrix, row_labels, col_labels, mode="top_k", max_side=MAX_SIDE, order="max"):
+    """
+    Reduce a similarity matrix to at most max_side × max_side cells.
+
+    mode="top_k" keeps the max_side rows and columns with the strongest matches;
+    mode="tiles" reorders the whole matrix and max-pools it into tiles. Every
+    displayed row/column carries the original indices it covers
+    (`row_groups`/`col_groups`) so the caller can drill down into one tile.
+    """
+    sim = np.asarray(sim_matrix, dtype=np.float32)
+    n_rows, n_cols = sim.shape
+    row_order, col_order = heatmap_order(sim, order)
+
+    if n_rows <= max_side and n_cols <= max_side:
+        mode = "top_k"
+
+    if mode == "top_k":
+        rows = row_order[:max_side]
+        cols = col_order[:max_side]
+        return HeatmapView(
+            sim[np.ix_(rows, cols)],
+            [row_labels[i] for i in rows],
+            [col_labels[j] for j in cols],
+            [np.array([i]) for i in rows],
+            [np.array([j]) for j in cols],
+            tiled=False,
+        )
+
+    if mode != "tiles":
+        raise ValueError(f"Unknown heatmap mode: {mode}")
+
+    ordered = sim[np.ix_(row_order, col_order)]
+    row_starts = _tile_bounds(n_rows, max_side)
+    col_starts = _tile_bounds(n_cols, max_side)
+    pooled = np.maximum.reduceat(np.maximum.reduceat(ordered, row_starts, axis=0), col_starts, axis=1)
+    row_groups = np.split(row_order, row_starts[1:])
+    col_groups = np.split(col_order, col_starts[1:])
+    return HeatmapView(
+        pooled,
+        [_group_label(row_labels, g) for g in row_groups],
+        [_group_label(col_labels, g) for g in col_groups],
+        row_groups,
+        col_groups,
+        tiled=True,
+    )
+
+
+def drill_down(sim_matrix, row_labels, col_labels, view, row_tile, col_tile, max_side=MAX_SIDE, order="max"):
+    """View of the original cells behind one tile of a tiled view (itself bounded)"""
+    rows = view.row_groups[row_tile]
+    cols = view.col_groups[col_tile]
+    sub = np.asarray(sim_matrix)[np.ix_(rows, cols)]
+    sub_rows = [row_labels[i] for i in rows]
+    sub_cols = [col_labels[j] for j in cols]
+    return heatmap_view(sub, sub_rows, sub_cols, mode="tiles", max_side=max_side, order=order), sub, sub_rows, sub_cols
+
+
+def column_drill_down(sim_matrix, row_labels, col, k=MAX_SIDE):
+    """Best k resume skills for one JD skill column, strongest first"""
+    scores = np.asarray(sim_matrix, dtype=np.float32)[:, col]
+    k = min(k, scores.shape[0])
+    top = np.argpartition(-scores, k - 1)[:k] if k else np.array([], dtype=np.int64)
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return [(row_labels[i], float(scores[i])) for i in top]
+
+
+def heatmap_figsize(n_rows, n_cols, base=(5.5, 3)):
+    """Grow the figure with the number of displayed cells (bounded by MAX_SIDE)"""
+    return (max(base[0], 1.5 + 0.22 * n_cols), max(base[1], 1.0 + 0.2 * n_rows))
+
+
+# ------------------------------------------
+# RENDER CACHE
+# ------------------------------------------
+class ChartService:
+    """
+    Renders figures to PNG/SVG bytes, memoized on a hash of the chart inputs.
+
+    Builders return standalone Figure objects that are not registered with
+    pyplot, so nothing accumulates in long-lived server processes and figures
+    are released as soon as they are serialized. The cache is an LRU bounded
+    by entry count and total bytes.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024, dpi=110):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.dpi = dpi
+        self._cache = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, builder, *args, fmt="png", **kwargs):
+        """Return the serialized chart for builder(*args, **kwargs)"""
+        key = content_hash((builder.__module__, builder.__qualname__, fmt, self.dpi, args, kwargs))
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return data
+
+        with span(f"render:{builder.__name__}"):
+            fig = builder(*args, **kwargs)
+            buf = BytesIO()
+            fig.savefig(buf, format=fmt, dpi=self.dpi, bbox_inches="tight",
+                        facecolor=fig.get_facecolor())
+            data = buf.getvalue()
+
+        with self._lock:
+            self.misses += 1
+            if key not in self._cache:
+                self._cache[key] = data
+                self._size += len(data)
+            while self._cache and (len(self._cache) > self.max_entries or self._size > self.max_bytes):
+                _, evicted = self._cache.popitem(last=False)
+                self._size -= len(evicted)
+        return data
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._cache), "bytes": self._size,
+                    "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._size = 0
+
+
+# ------------------------------------------
+# CLIENT-SIDE (VEGA-LITE) SPECS
+# ------------------------------------------
+def heatmap_vega_spec(sim_matrix, row_labels, col_labels, title=None):
+    """Vega-Lite spec for the heatmap; rendered in the browser instead of rasterized on the server"""
+    sim = np.asarray(sim_matrix, dtype=np.float32)
+    rows, cols = np.indices(sim.shape)
+    row_labels = np.asarray(row_labels, dtype=object)
+    col_labels = np.asarray(col_labels, dtype=object)
+    values = [
+        {"resume": r, "jd": c, "score": s}
+        for r, c, s in zip(row_labels[rows.ravel()].tolist(),
+                           col_labels[cols.ravel()].tolist(),
+                           np.round(sim.ravel(), 3).tolist())
+    ]
+    spec = {
+        "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        "data": {"values": values},
+        "mark": "rect",
+        "encoding": {
+            "x": {"field": "jd", "type": "nominal", "sort": list(col_labels),
+                  "title": "Job Description Skills", "axis": {"labelAngle": -30}},
+            "y": {"field": "resume", "type": "nominal", "sort": list(row_labels),
+                  "title": "Resume Skills"},
+            "color": {"field": "score", "type": "quantitative",
+                      "scale": {"scheme": "viridis", "domain": [0, 1]}},
+            "tooltip": [
+                {"field": "resume", "type": "nominal"},
+                {"field": "jd", "type": "nominal"},
+                {"field": "score", "type": "quantitative", "format": ".2f"},
+            ],
+        },
+    }
+    if title:
+        spec["title"] = title
+    return spec
@@ -0,0 +1,151 @@
+# ==========================================
+# SkillGapAI - Skill Gap Classification
+# Vectorized Matched / Partial / Missing labelling
+# ==========================================
+
+import json
+import os
+
+import numpy as np
+
+from skillgapai_tracing import traced
+
+# ------------------------------------------
+# CATEGORIES & DEFAULTS
+# ------------------------------------------
+# Ordered from lowest to highest; label ids are the indices into this tuple.
+CATEGORIES = ("Missing", "Partial", "Matched")
+MISSING, PARTIAL, MATCHED = range(len(CATEGORIES))
+
+# Lower bound (inclusive) of every category above "Missing".
+DEFAULT_THRESHOLDS = {"Partial": 0.50, "Matched": 0.75}
+
+# Contribution of each category to the overall match score.
+DEFAULT_SCORE_WEIGHTS = {"Matched": 1.0, "Partial": 0.0, "Missing": 0.0}
+
+CLASSIFICATION_DTYPE = np.dtype([
+    ("skill", np.int32),
+    ("score", np.float32),
+    ("label", np.int8),
+])
+
+
+# Per-encoder thresholds written by skillgapai_calibrate.py and read by every app
+THRESHOLDS_PATH = os.environ.get(
+    "SKILLGAPAI_THRESHOLDS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "skillgapai_thresholds.json"),
+)
+
+
+def load_calibration(model_name, path=None):
+    """An encoder's entry in the thresholds config (thresholds, scores, gold pairs used), or None"""
+    path = THRESHOLDS_PATH if path is None else path
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("models", {}).get(model_name) or None
+
+
+def load_thresholds(model_name, default=None, path=None):
+    """Calibrated {"Partial", "Matched"} thresholds for an encoder, or `default` if it was never calibrated"""
+    default = {**DEFAULT_THRESHOLDS, **(default or {})}
+    entry = load_calibration(model_name, path)
+    if not entry:
+        return default
+    thresholds = {c: float(entry[c]) for c in CATEGORIES[1:]}
+    threshold_bins(thresholds)
+    return thresholds
+
+
+def threshold_bins(thresholds=None):
+    """Return the ascending cut-points fed to np.digitize"""
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    bins = np.array([thresholds[c] for c in CATEGORIES[1:]], dtype=np.float64)
+    if np.any(np.diff(bins) < 0):
+        raise ValueError(f"Thresholds must increase with category: {thresholds}")
+    return bins
+
+
+# ------------------------------------------
+# CLASSIFICATION
+# ------------------------------------------
+@traced("classification")
+def classify_similarity(sim_matrix, thresholds=None):
+    """
+    Label every JD skill from a (..., resume_skills, jd_skills) similarity tensor.
+
+    The column max is computed once and binned with a single np.digitize call,
+    so a batch of N resumes × M JDs is classified in one pass. Padding rows or
+    columns in a batched tensor should be filled with -inf (they land in
+    "Missing"; pass a `jd_mask` to `overall_score` to exclude padded columns).
+    Returns a structured array of shape (..., jd_skills) with fields
+    `skill` (column index), `score` (best similarity) and `label`.
+    """
+    sim = np.asarray(sim_matrix, dtype=np.float32)
+    if sim.ndim < 2:
+        raise ValueError("Similarity tensor must have at least 2 dimensions")
+
+    if sim.shape[-2]:
+        col_max = sim.max(axis=-2)
+    else:
+        col_max = np.full(sim.shape[:-2] + sim.shape[-1:], -np.inf, dtype=np.float32)
+
+    result = np.empty(col_max.shape, dtype=CLASSIFICATION_DTYPE)
+    result["skill"] = np.arange(col_max.shape[-1], dtype=np.int32)
+    result["score"] = col_max
+    result["label"] = np.digitize(col_max.astype(np.float64), threshold_bins(thresholds))
+    return result
+
+
+def apply_proficiency(result, sim_matrix, resume_years, required_years):
+    """
+    Demote Matched JD skills to Partial when the best-matching resume skill has
+    fewer years of experience than the JD asks for.
+
+    `resume_years` is (..., resume_skills) and `required_years` is (..., jd_skills);
+    NaN means no duration was stated and never triggers a demotion.
+    """
+    sim = np.asarray(sim_matrix, dtype=np.float32)
+    result = result.copy()
+    if not sim.shape[-2]:
+        return result
+    best_row = sim.argmax(axis=-2)
+    have = np.take_along_axis(np.asarray(resume_years, dtype=np.float64), best_row, axis=-1)
+    need = np.broadcast_to(np.asarray(required_years, dtype=np.float64), have.shape)
+    short = (result["label"] == MATCHED) & (have < need)
+    result["label"][short] = PARTIAL
+    return result
+
+
+def overall_score(result, weights=None, jd_mask=None):
+    """Weighted share of JD skills per category, as an int percentage (array for batches)"""
+    weights = {**DEFAULT_SCORE_WEIGHTS, **(weights or {})}
+    w = np.array([weights[c] for c in CATEGORIES], dtype=np.float64)
+    per_skill = w[result["label"]]
+
+    if jd_mask is None:
+        total = np.full(per_skill.shape[:-1], per_skill.shape[-1], dtype=np.float64)
+    else:
+        jd_mask = np.asarray(jd_mask, dtype=bool)
+        per_skill = np.where(jd_mask, per_skill, 0.0)
+        total = jd_mask.sum(axis=-1).astype(np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.where(total > 0, per_skill.sum(axis=-1) / total * 100, 0.0)
+    score = score.astype(np.int64)
+    return int(score) if score.ndim == 0 else score
+
+
+def category_counts(result):
+    """Number of JD skills per category along the last axis"""
+    labels = result["label"].astype(np.int64)
+    one_hot = labels[..., None] == np.arange(len(CATEGORIES))
+    return one_hot.sum(axis=-2)
+
+
+def group_by_category(result, jd_skills):
+    """Split a single (jd_skills,) result into {category: [(skill, score), ...]} in JD order"""
+    groups = {c: [] for c in CATEGORIES}
+    for idx, score, label in zip(result["skill"], result["score"], result["label"]):
+        groups[CATEGORIES[label]].append((jd_skills[idx], float(score)))
+    return groups
@@ -0,0 +1,114 @@
+# ==========================================
+# SkillGapAI - Evidence-Based Skill Confidence
+# Confidence from mention count, section, proximity to years-of-experience
+# phrases and alias specificity, computed over all hits at once
+# ==========================================
+
+import numpy as np
+
+from skillgapai_core import SKILL_ALIASES
+from skillgapai_experience import experience_spans
+from skillgapai_sections import SECTION_WEIGHTS
+from skillgapai_tracing import traced
+
+# Weights of each evidence term; they sum to 1 so a skill with every signal maxed scores 100
+BASE = 0.30
+W_SECTION = 0.30
+W_COUNT = 0.15
+W_YEARS = 0.15
+W_SPECIFICITY = 0.10
+
+# Characters over which proximity to a "5 years" phrase decays by 1/e
+YEARS_DECAY_CHARS = 80.0
+
+
+def _alias_specificity(skill_map):
+    """Longer, multi-word and unambiguous aliases are stronger evidence than 'py' or 'lead'"""
+    owners = {}
+    for canonical, aliases in skill_map.items():
+        for alias in set([canonical] + list(aliases)):
+            owners.setdefault(alias.lower(), set()).add(canonical)
+    spec = {}
+    for alias, canon in owners.items():
+        s = min(1.0, len(alias) / 8.0) + (0.25 if " " in alias else 0.0)
+        spec[alias] = min(1.0, s) / len(canon)
+    return spec
+
+
+ALIAS_SPECIFICITY = _alias_specificity(SKILL_ALIASES)
+
+
+def years_offsets(text):
+    """Sorted char offsets (span midpoints) of years-of-experience phrases and date ranges"""
+    return np.array([(s.start + s.end) // 2 for s in experience_spans(text)], dtype=np.int64)
+
+
+def _nearest_distance(positions, anchors):
+    """Distance from each position to its nearest anchor (inf when there are none)"""
+    if not anchors.size:
+        return np.full(positions.shape, np.inf)
+    idx = np.searchsorted(anchors, positions)
+    left = anchors[np.clip(idx - 1, 0, anchors.size - 1)]
+    right = anchors[np.clip(idx, 0, anchors.size - 1)]
+    return np.minimum(np.abs(positions - left), np.abs(right - positions)).astype(np.float64)
+
+
+@traced("confidence")
+def confidence_matrix(doc_ids, skill_ids, section_weight, specificity, years_distance, n_docs, n_skills):
+    """
+    (n_docs, n_skills) confidence in 0-100 from per-hit arrays; NaN where a skill has no hits.
+
+    Every aggregate is a bincount / ufunc.at over the flat hit arrays, so the cost
+    is one pass over all hits regardless of how many documents they came from.
+    """
+    key = np.asarray(doc_ids, dtype=np.int64) * n_skills + np.asarray(skill_ids, dtype=np.int64)
+    size = n_docs * n_skills
+
+    count = np.bincount(key, minlength=size).astype(np.float64)
+    best_section = np.zeros(size)
+    np.maximum.at(best_section, key, section_weight)
+    best_spec = np.zeros(size)
+    np.maximum.at(best_spec, key, specificity)
+    best_years = np.zeros(size)
+    np.maximum.at(best_years, key, np.exp(-np.asarray(years_distance, dtype=np.float64) / YEARS_DECAY_CHARS))
+
+    conf = 100 * (
+        BASE
+        + W_SECTION * best_section
+        + W_COUNT * (1 - 1 / np.maximum(count, 1))
+        + W_YEARS * best_years
+        + W_SPECIFICITY * best_spec
+    )
+    conf[count == 0] = np.nan
+    return np.round(conf).reshape(n_docs, n_skills)
+
+
+def hit_features(text, hits, skill_index):
+    """Per-hit (skill id, section weight, specificity, distance to nearest years phrase) arrays"""
+    starts = np.fromiter((h.start for h in hits), dtype=np.int64, count=len(hits))
+    return (
+        np.fromiter((skill_index[h.skill] for h in hits), dtype=np.int64, count=len(hits)),
+        np.fromiter((SECTION_WEIGHTS.get(h.section, 0.0) for h in hits), dtype=np.float64, count=len(hits)),
+        np.fromiter((ALIAS_SPECIFICITY.get(text[h.start:h.end].lower(), 0.5) for h in hits),
+                    dtype=np.float64, count=len(hits)),
+        _nearest_distance(starts, years_offsets(text)),
+    )
+
+
+def batch_confidences(texts, hit_lists):
+    """One {skill: confidence} dict per document, scored in a single vectorized pass"""
+    skills = sorted({h.skill for hits in hit_lists for h in hits})
+    skill_index = {s: i for i, s in enumerate(skills)}
+    parts = [hit_features(text, hits, skill_index) for text, hits in zip(texts, hit_lists)]
+    doc_ids = np.concatenate([np.full(len(hits), d, dtype=np.int64) for d, hits in enumerate(hit_lists)] or [np.zeros(0, np.int64)])
+    columns = [np.concatenate([p[k] for p in parts]) if parts else np.zeros(0) for k in range(4)]
+    conf = confidence_matrix(doc_ids, *columns, n_docs=len(hit_lists), n_skills=max(len(skills), 1))
+    return [
+        {skills[j]: int(conf[d, j]) for j in np.flatnonzero(~np.isnan(conf[d, :len(skills)]))}
+        for d in range(len(hit_lists))
+    ]
+
+
+def skill_confidences(text, hits):
+    """{skill: 0-100 confidence} for one document's hits"""
+    return batch_confidences([text], [hits])[0]
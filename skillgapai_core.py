@@ -0,0 +1,365 @@
+# ==========================================
+# SkillGapAI - Core Stages
+# Streamlit-free text extraction, skill matching and report export
+# shared by the milestone apps, benchmarks and batch tools
+# ==========================================
+
+import os
+import re
+import json
+import tempfile
+from datetime import datetime
+from io import BytesIO, StringIO
+
+import pandas as pd
+
+from skillgapai_pdf import extract_pdf
+from skillgapai_tracing import traced
+
+# For PDF generation
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+# For DOCX text extraction (PDFs go through the backend chain in skillgapai_pdf)
+try:
+    import docx2txt
+except Exception:
+    docx2txt = None
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+# Where persistent artifacts (indexes, result stores, caches) are written
+DATA_DIR = os.environ.get("SKILLGAPAI_DATA_DIR", ".skillgapai")
+
+# ------------------------------------------
+# SKILL TAXONOMY
+# ------------------------------------------
+# Map canonical -> list of alias strings (lowercased)
+SKILL_ALIASES = {
+    # technical
+    "python": ["python", "py"],
+    "java": ["java"],
+    "c++": ["c++", "cpp"],
+    "sql": ["sql", "structured query language", "postgres", "postgresql", "mysql"],
+    "html": ["html", "html5"],
+    "css": ["css", "cascading style sheets"],
+    "javascript": ["javascript", "js", "node js", "node.js"],
+    "react": ["react", "reactjs", "react.js"],
+    "node.js": ["node.js", "node", "nodejs"],
+    "tensorflow": ["tensorflow", "tf"],
+    "pytorch": ["pytorch", "torch"],
+    "machine learning": ["machine learning", "ml"],
+    "data analysis": ["data analysis", "data analytics", "analytics"],
+    "data visualization": ["data visualization", "dataviz", "visualization"],
+    "aws": ["aws", "amazon web services"],
+    "azure": ["azure", "microsoft azure"],
+    "gcp": ["gcp", "google cloud", "google cloud platform"],
+    "power bi": ["power bi", "powerbi"],
+    "tableau": ["tableau"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "scikit-learn": ["scikit-learn", "scikitlearn", "sklearn"],
+    "nlp": ["nlp", "natural language processing"],
+    "pandas": ["pandas"],
+    "numpy": ["numpy", "numerical python"],
+    "deep learning": ["deep learning", "neural networks"],
+    "statistics": ["statistics", "statistical analysis", "stats"],
+    # soft skills
+    "communication": ["communication", "communicate"],
+    "leadership": ["leadership", "lead"],
+    "teamwork": ["teamwork", "team work", "team-player"],
+    "problem solving": ["problem solving", "problem-solving", "problem solving skills"],
+    "time management": ["time management", "time-management"],
+    "adaptability": ["adaptability", "adaptable"],
+    "critical thinking": ["critical thinking", "critical-thinking"],
+    "creativity": ["creativity", "creative"],
+    "collaboration": ["collaboration", "collaborate"],
+    "decision making": ["decision making", "decision-making"]
+}
+
+# Prepare lists for UI (technical vs soft canonical)
+TECH_CANONICAL = [
+    "python","java","c++","sql","html","css","javascript","react","node.js",
+    "tensorflow","pytorch","machine learning","data analysis","data visualization",
+    "aws","azure","gcp","power bi","tableau","django","flask","scikit-learn","nlp",
+    "pandas","numpy","deep learning","statistics"
+]
+SOFT_CANONICAL = [
+    "communication","leadership","teamwork","problem solving","time management",
+    "adaptability","critical thinking","creativity","collaboration","decision making"
+]
+
+# Prerequisite DAG: canonical skill -> skills worth learning first
+SKILL_PREREQUISITES = {
+    "numpy": ["python"],
+    "pandas": ["python"],
+    "data analysis": ["statistics"],
+    "machine learning": ["pandas", "numpy", "statistics"],
+    "scikit-learn": ["machine learning"],
+    "deep learning": ["machine learning"],
+    "tensorflow": ["deep learning"],
+    "pytorch": ["deep learning"],
+    "nlp": ["machine learning"],
+    "django": ["python"],
+    "flask": ["python"],
+    "css": ["html"],
+    "javascript": ["html"],
+    "react": ["javascript", "css"],
+    "node.js": ["javascript"],
+    "leadership": ["communication"],
+    "decision making": ["critical thinking"],
+}
+
+
+# ------------------------------------------
+# NLP MODEL & PHRASE MATCHER
+# ------------------------------------------
+def load_nlp_and_matcher(skill_map, model="en_core_web_sm"):
+    """Load spaCy (model=None gives a blank English tokenizer) and build the alias PhraseMatcher"""
+    # imported lazily so text extraction does not pull in spaCy
+    import spacy
+    from spacy.matcher import PhraseMatcher
+
+    if model is None:
+        nlp = spacy.blank("en")
+    else:
+        try:
+            nlp = spacy.load(model)
+        except Exception:
+            from spacy.cli import download
+            download(model)
+            nlp = spacy.load(model)
+    matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    patterns = []
+    for canonical, aliases in skill_map.items():
+        for alias in aliases:
+            patterns.append(nlp.make_doc(alias))
+        matcher.add(canonical, patterns)
+        patterns = []
+    return nlp, matcher
+
+
+# ------------------------------------------
+# TEXT EXTRACTION & CLEANING
+# ------------------------------------------
+class NamedBytesIO(BytesIO):
+    """In-memory upload with the .name attribute extract_text expects"""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+@traced("clean_text")
+def clean_text(text: str) -> str:
+    """Normalize text by removing extra spaces and line breaks"""
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def clean_lines(text: str) -> str:
+    """
+    clean_text that keeps line structure: a whitespace run holding a line
+    break becomes one newline instead of a space, so every char offset is
+    the same as in clean_text(text).
+    """
+    text = re.sub(r'\s+', lambda m: "\n" if "\n" in m.group() or "\r" in m.group() else " ", text)
+    return text.strip()
+
+
+@traced("extract_text")
+def extract_text_from_pdf(uploaded_file, max_pages=None):
+    """PdfText (text, per-page backends, timed_out, unreadable pages) for an uploaded PDF"""
+    uploaded_file.seek(0)
+    return extract_pdf(uploaded_file.read(), max_pages=max_pages)
+
+
+@traced("extract_text")
+def extract_raw_text(uploaded_file) -> str:
+    """Extract plain text from a PDF, DOCX or TXT file-like object with a .name"""
+    text = ""
+    file_name = uploaded_file.name.lower()
+
+    if file_name.endswith(".pdf"):
+        uploaded_file.seek(0)
+        text = extract_pdf(uploaded_file.read()).text
+
+    elif file_name.endswith(".docx"):
+        if docx2txt is None:
+            raise RuntimeError("docx2txt is required to read DOCX files")
+        # docx2txt.process expects a path, so write a temp file
+        uploaded_file.seek(0)
+        with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as tmp:
+            tmp.write(uploaded_file.read())
+            tmp_path = tmp.name
+        try:
+            text = docx2txt.process(tmp_path)
+        finally:
+            try:
+                os.remove(tmp_path)
+            except Exception:
+                pass
+
+    elif file_name.endswith(".txt"):
+        # reset file pointer if needed
+        uploaded_file.seek(0)
+        text = uploaded_file.read().decode("utf-8", errors="ignore")
+
+    else:
+        raise ValueError("Unsupported file format. Please upload PDF, DOCX, or TXT.")
+
+    return text
+
+
+def extract_text(uploaded_file) -> str:
+    """Extract and clean plain text from PDF, DOCX, or TXT"""
+    return clean_text(extract_raw_text(uploaded_file))
+
+
+# ------------------------------------------
+# SKILL MATCHING
+# ------------------------------------------
+# Long texts go through nlp.pipe in chunks of this size (far below spaCy's max_length);
+# chunks overlap so an alias cut at a boundary is matched whole in the next chunk
+CHUNK_CHARS = 20_000
+CHUNK_OVERLAP = 200
+
+
+def chunk_bounds(text, chunk_chars=CHUNK_CHARS, overlap=CHUNK_OVERLAP):
+    """(start, end) char ranges covering text, cut at a line, sentence or word break where possible"""
+    n = len(text)
+    bounds = []
+    start = 0
+    while start + chunk_chars < n:
+        end = start + chunk_chars
+        for sep in ("\n", ". ", " "):
+            cut = text.rfind(sep, start + chunk_chars // 2, end)
+            if cut >= 0:
+                end = cut + len(sep)
+                break
+        bounds.append((start, end))
+        # restart on a word boundary inside the overlap so no chunk begins mid-word
+        space = text.find(" ", end - overlap, end)
+        start = space + 1 if space >= 0 else end
+    bounds.append((start, n))
+    return bounds
+
+
+def match_spans(nlp, matcher, text, batch_size=8):
+    """Sorted, de-duplicated (skill, start_char, end_char) PhraseMatcher spans for text of any length"""
+    bounds = chunk_bounds(text)
+    spans = set()
+    for (offset, _), doc in zip(bounds, nlp.pipe((text[a:b] for a, b in bounds), batch_size=batch_size)):
+        for match_id, start, end in matcher(doc):
+            piece = doc[start:end]
+            # canonical name used when adding
+            spans.add((nlp.vocab.strings[match_id], offset + piece.start_char, offset + piece.end_char))
+    return sorted(spans, key=lambda s: (s[1], s[2], s[0]))
+
+
+@traced("phrase_match_skills")
+def phrase_match_skills(nlp, matcher, text, skill_map=None):
+    """Canonical skills found by the PhraseMatcher plus an alias substring fallback"""
+    skill_map = SKILL_ALIASES if skill_map is None else skill_map
+    found = {skill for skill, _, _ in match_spans(nlp, matcher, text)}
+    # also fallback substring search for things missing
+    lc = text.lower()
+    for canonical, aliases in skill_map.items():
+        for alias in aliases:
+            if alias.lower() in lc:
+                found.add(canonical)
+                break
+    return sorted(found)
+
+
+def categorize_skills(skills):
+    tech = [s.title() for s in skills if s in TECH_CANONICAL]
+    soft = [s.title() for s in skills if s in SOFT_CANONICAL]
+    # unknown go into technical by default (safe)
+    others = [s for s in skills if s not in TECH_CANONICAL + SOFT_CANONICAL]
+    tech += [s.title() for s in others]
+    # unique & sorted
+    return sorted(set(tech)), sorted(set(soft))
+
+
+# ------------------------------------------
+# REPORT EXPORT
+# ------------------------------------------
+@traced("csv_export")
+def create_csv_bytes(resume_skills, jd_skills, missing, extra):
+    df = pd.DataFrame({
+        "Resume Skills": list(resume_skills) + [""] * max(0, len(jd_skills)-len(resume_skills)),
+        "Job Description Skills": list(jd_skills) + [""] * max(0, len(resume_skills)-len(jd_skills))
+    })
+    summary = {
+        "overlap": list(sorted(set(resume_skills) & set(jd_skills))),
+        "missing_in_resume": list(missing),
+        "extra_in_resume": list(extra),
+        "generated_at": datetime.now().isoformat()
+    }
+    csv_buf = StringIO()
+    df.to_csv(csv_buf, index=False)
+    return csv_buf.getvalue(), summary
+
+
+@traced("json_export")
+def create_json_bytes(resume_skills, jd_skills, missing, extra):
+    payload = {
+        "resume_skills": list(resume_skills),
+        "jd_skills": list(jd_skills),
+        "missing_in_resume": list(missing),
+        "extra_in_resume": list(extra),
+        "generated_at": datetime.now().isoformat()
+    }
+    return json.dumps(payload, indent=2)
+
+
+@traced("create_pdf_report")
+def create_pdf_report(resume_text, jd_text, resume_skills, jd_skills, missing, extra, filename="skillgap_report.pdf"):
+    # create a simple PDF using reportlab
+    bio = BytesIO()
+    c = canvas.Canvas(bio, pagesize=letter)
+    width, height = letter
+    margin = 40
+    y = height - margin
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(margin, y, "SkillGapAI - Analysis Report")
+    c.setFont("Helvetica", 10)
+    y -= 22
+    c.drawString(margin, y, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    y -= 18
+
+    def write_block(title, lines, font_size=10):
+        nonlocal y
+        if y < 120:
+            c.showPage()
+            y = height - margin
+        c.setFont("Helvetica-Bold", 11)
+        c.drawString(margin, y, title)
+        y -= 14
+        c.setFont("Helvetica", font_size)
+        for line in lines:
+            if y < 80:
+                c.showPage()
+                y = height - margin
+            # wrap if necessary (very naive)
+            if len(line) > 95:
+                parts = [line[i:i+95] for i in range(0, len(line), 95)]
+                for p in parts:
+                    c.drawString(margin+6, y, p)
+                    y -= 12
+            else:
+                c.drawString(margin+6, y, line)
+                y -= 12
+        y -= 6
+
+    write_block("Resume (excerpt)", [l.strip() for l in resume_text.splitlines()[:8] if l.strip()])
+    write_block("Job Description (excerpt)", [l.strip() for l in jd_text.splitlines()[:8] if l.strip()])
+    write_block("Resume Skills (detected)", resume_skills or ["None"])
+    write_block("Job Description Skills (detected)", jd_skills or ["None"])
+    write_block("Missing in Resume (from JD)", missing or ["None"])
+    write_block("Extra in Resume", extra or ["None"])
+
+    c.save()
+    bio.seek(0)
+    return bio.read()
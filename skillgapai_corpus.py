@@ -0,0 +1,233 @@
+# ==========================================
+# SkillGapAI - Corpus Skill Demand Analytics
+# Sparse JD × skill counts, co-occurrence, trends and
+# demand-weighted prioritization of missing skills
+# ==========================================
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from skillgapai_snapshots import commit_version, current_version, locked, version_path
+from skillgapai_tracing import span
+
+DAY = 86400.0
+
+
+def count_skill_mentions(nlp, matcher, texts, batch_size=64):
+    """Per-document Counter of canonical skill mentions (milestone2 PhraseMatcher, nlp.pipe)"""
+    with span("phrase_match_skills", docs=len(texts)):
+        return [
+            Counter(nlp.vocab.strings[match_id] for match_id, _, _ in matcher(doc))
+            for doc in nlp.pipe(texts, batch_size=batch_size)
+        ]
+
+
+class SkillDemandCorpus:
+    """
+    Incrementally growing JD × skill count matrix (scipy.sparse CSR).
+
+    New JDs are appended as CSR blocks; document frequency and the skill
+    co-occurrence matrix are updated from each block alone, so ingesting a new
+    batch costs O(batch) rather than a rebuild over the whole corpus.
+    On disk it is a versioned snapshot that every app process merges into.
+    """
+
+    def __init__(self, skills=()):
+        self.skills = []
+        self.skill_index = {}
+        self.doc_ids = []
+        self._timestamps = []
+        self._blocks = []
+        self._matrix = None
+        self._doc_freq = np.zeros(0, dtype=np.int64)
+        self._cooc = sp.csr_matrix((0, 0), dtype=np.int64)
+        self._seen = set()
+        self._version = None
+        self._lock = threading.RLock()
+        self._intern(skills)
+
+    def _intern(self, skills):
+        for skill in skills:
+            if skill not in self.skill_index:
+                self.skill_index[skill] = len(self.skills)
+                self.skills.append(skill)
+
+    @property
+    def n_docs(self):
+        return len(self.doc_ids)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._seen
+
+    def add_documents(self, skill_counts, doc_ids=None, timestamps=None):
+        """Append JDs given as {skill: count} mappings; duplicate doc ids are skipped. Returns rows added"""
+        now = time.time()
+        doc_ids = list(doc_ids) if doc_ids is not None else [None] * len(skill_counts)
+        timestamps = list(timestamps) if timestamps is not None else [now] * len(skill_counts)
+
+        with self._lock:
+            rows, cols, vals, new_ids, new_ts = [], [], [], [], []
+            for counts, doc_id, ts in zip(skill_counts, doc_ids, timestamps):
+                doc_id = doc_id if doc_id is not None else f"doc-{self.n_docs + len(new_ids)}"
+                if doc_id in self._seen:
+                    continue
+                self._seen.add(doc_id)
+                self._intern(counts)
+                r = len(new_ids)
+                for skill, count in counts.items():
+                    rows.append(r)
+                    cols.append(self.skill_index[skill])
+                    vals.append(count)
+                new_ids.append(doc_id)
+                new_ts.append(ts)
+            if not new_ids:
+                return 0
+
+            n_skills = len(self.skills)
+            block = sp.csr_matrix((vals, (rows, cols)), shape=(len(new_ids), n_skills), dtype=np.int64)
+            self._blocks.append(block)
+            self.doc_ids.extend(new_ids)
+            self._timestamps.extend(new_ts)
+            self._matrix = None
+
+            presence = (block > 0).astype(np.int64)
+            self._doc_freq = np.pad(self._doc_freq, (0, n_skills - self._doc_freq.size))
+            self._doc_freq += np.asarray(presence.sum(axis=0)).ravel()
+            self._cooc.resize((n_skills, n_skills))
+            self._cooc = (self._cooc + presence.T @ presence).tocsr()
+            return len(new_ids)
+
+    @property
+    def matrix(self):
+        """Full JD × skill count matrix (blocks padded to the current vocabulary)"""
+        with self._lock:
+            if self._matrix is None:
+                n_skills = len(self.skills)
+                blocks = []
+                for block in self._blocks:
+                    block = block.copy()
+                    block.resize((block.shape[0], n_skills))
+                    blocks.append(block)
+                self._matrix = sp.vstack(blocks, format="csr") if blocks else sp.csr_matrix((0, n_skills), dtype=np.int64)
+            return self._matrix
+
+    # ------------------------------------------
+    # ANALYTICS
+    # ------------------------------------------
+    def frequency(self):
+        """Skills by number of JDs mentioning them, with share of the corpus"""
+        df = pd.DataFrame({
+            "Skill": self.skills,
+            "JDs": self._doc_freq,
+            "Mentions": np.asarray(self.matrix.sum(axis=0)).ravel() if self.skills else [],
+        })
+        df["Demand"] = df["JDs"] / max(self.n_docs, 1)
+        return df.sort_values(["JDs", "Mentions"], ascending=False, kind="stable").reset_index(drop=True)
+
+    def cooccurrence(self, top=20):
+        """Most frequent skill pairs appearing in the same JD"""
+        upper = sp.triu(self._cooc, k=1).tocoo()
+        order = np.argsort(-upper.data, kind="stable")[:top]
+        return pd.DataFrame({
+            "Skill A": [self.skills[i] for i in upper.row[order]],
+            "Skill B": [self.skills[j] for j in upper.col[order]],
+            "JDs": upper.data[order],
+        })
+
+    def trending(self, window_days=30, now=None, smoothing=1.0, top=20):
+        """Skills whose share of JDs in the recent window grew most versus earlier JDs"""
+        now = time.time() if now is None else now
+        ts = np.asarray(self._timestamps, dtype=np.float64)
+        recent = ts >= now - window_days * DAY
+        presence = (self.matrix > 0).astype(np.int64)
+        n_recent, n_past = int(recent.sum()), int((~recent).sum())
+        recent_share = (np.asarray(presence[recent].sum(axis=0)).ravel() + smoothing) / (n_recent + 2 * smoothing)
+        past_share = (np.asarray(presence[~recent].sum(axis=0)).ravel() + smoothing) / (n_past + 2 * smoothing)
+        df = pd.DataFrame({
+            "Skill": self.skills,
+            "Recent Share": recent_share,
+            "Past Share": past_share,
+            "Lift": recent_share / past_share,
+        })
+        return df.sort_values("Lift", ascending=False, kind="stable").head(top).reset_index(drop=True)
+
+    def demand(self, skills):
+        """Share of JDs mentioning each skill (case-insensitive; 0 for unseen skills)"""
+        lookup = {s.lower(): i for i, s in enumerate(self.skills)}
+        share = self._doc_freq / max(self.n_docs, 1)
+        return np.array([share[lookup[s.lower()]] if s.lower() in lookup else 0.0 for s in skills])
+
+    def prioritize_missing(self, missing, similarity=None):
+        """Order missing skills by corpus demand (ties: lower similarity first)"""
+        similarity = np.zeros(len(missing)) if similarity is None else np.asarray(similarity, dtype=np.float64)
+        df = pd.DataFrame({"Skill": list(missing), "Demand": self.demand(missing), "Similarity": similarity})
+        return df.sort_values(["Demand", "Similarity"], ascending=[False, True], kind="stable").reset_index(drop=True)
+
+    # ------------------------------------------
+    # PERSISTENCE
+    # ------------------------------------------
+    def sync(self, directory):
+        """Merge in JDs other processes saved to directory since this corpus last read or wrote it"""
+        version = current_version(directory)
+        if version is None or version == self._version:
+            return 0
+        _, skill_counts, doc_ids, timestamps = _read_snapshot(version_path(directory, version))
+        with self._lock:
+            added = self.add_documents(skill_counts, doc_ids, timestamps)
+            self._version = version
+        return added
+
+    def save(self, directory):
+        """
+        Merge in what other processes saved, then write counts and metadata as
+        one new version, so a reader never pairs new counts with old metadata
+        """
+        with locked(directory), self._lock:
+            self.sync(directory)
+            matrix = self.matrix
+            meta = {"skills": list(self.skills), "doc_ids": list(self.doc_ids), "timestamps": list(self._timestamps)}
+
+            def write(path):
+                with open(os.path.join(path, "counts.npz"), "wb") as f:
+                    sp.save_npz(f, matrix)
+                with open(os.path.join(path, "meta.json"), "w") as f:
+                    json.dump(meta, f)
+
+            self._version = commit_version(directory, write)
+
+    @classmethod
+    def load(cls, directory):
+        version = current_version(directory)
+        skills, skill_counts, doc_ids, timestamps = _read_snapshot(version_path(directory, version))
+        corpus = cls(skills)
+        corpus.add_documents(skill_counts, doc_ids, timestamps)
+        corpus._version = version
+        return corpus
+
+    @classmethod
+    def open(cls, directory, skills=()):
+        """Load a corpus from directory, or start an empty one over `skills`"""
+        if current_version(directory) or os.path.exists(os.path.join(directory, "meta.json")):
+            return cls.load(directory)
+        return cls(skills)
+
+
+def _read_snapshot(path):
+    """(skills, per-JD {skill: count}, doc ids, timestamps) from one saved version"""
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    counts = sp.load_npz(os.path.join(path, "counts.npz")).tocsr()
+    skills = meta["skills"]
+    skill_counts = [
+        {skills[j]: int(v) for j, v in zip(counts.indices[counts.indptr[r]:counts.indptr[r + 1]],
+                                           counts.data[counts.indptr[r]:counts.indptr[r + 1]])}
+        for r in range(counts.shape[0])
+    ]
+    return skills, skill_counts, meta["doc_ids"], meta["timestamps"]
@@ -0,0 +1,310 @@
+# ==========================================
+# SkillGapAI - Matching Quality Regression Harness
+# Runs milestone2 extraction + milestone3 classification over a labeled
+# gold set for several configurations and reports accuracy, label flips
+# and latency side by side (Pareto table of quality vs speed)
+#
+#   python skillgapai_eval.py --config fast:encoder=stub,spacy=blank \
+#       --config full-text:encoder=stub,spacy=blank,sections=0
+# ==========================================
+
+import argparse
+import json
+import os
+import time
+from collections import Counter, namedtuple
+
+import numpy as np
+
+from skillgapai_benchmark import load_encoder
+from skillgapai_classify import CATEGORIES, DEFAULT_THRESHOLDS, classify_similarity, load_calibration
+from skillgapai_core import SKILL_ALIASES, load_nlp_and_matcher
+from skillgapai_pipeline import content_hash
+from skillgapai_sections import document_sections, section_skill_hits
+
+GOLD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skillgapai_gold.json")
+# Label recorded for a gold JD skill the pipeline never extracted
+NOT_EXTRACTED = "Not extracted"
+# Share of gold pairs skillgapai_calibrate.py fits thresholds on; the rest are held out for evaluation
+CALIBRATION_FRACTION = 0.5
+
+EvalConfig = namedtuple("EvalConfig", [
+    "name", "encoder", "spacy", "section_aware", "thresholds", "threshold_source", "calibration_pairs",
+])
+
+
+def load_gold(path=GOLD_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["pairs"]
+
+
+def calibration_split(pairs, fraction=CALIBRATION_FRACTION):
+    """
+    (calibration pairs, held-out pairs): a fixed split by hash of the pair id,
+    so calibration and evaluation agree on it without sharing any state.
+    """
+    ordered = sorted(pairs, key=lambda p: content_hash(p["id"]))
+    n = int(round(len(ordered) * fraction))
+    return ordered[:n], ordered[n:]
+
+
+def parse_config(spec):
+    """
+    EvalConfig from 'name:encoder=...,spacy=...,sections=0|1,partial=0.5,matched=0.75'.
+
+    Thresholds not given default to the encoder's calibrated ones (skillgapai_calibrate.py),
+    then to DEFAULT_THRESHOLDS; threshold_source says which were used. Gold pairs the
+    calibration was fitted on are recorded so evaluation can leave them out.
+    """
+    name, _, options = spec.partition(":")
+    opts = dict(item.split("=", 1) for item in options.split(",") if item)
+    encoder = opts.get("encoder", "stub")
+    calibration = load_calibration(encoder)
+    base = {c: float(calibration[c]) for c in DEFAULT_THRESHOLDS} if calibration else DEFAULT_THRESHOLDS
+    given = [c for c in DEFAULT_THRESHOLDS if c.lower() in opts]
+    calibration_pairs = ()
+    if len(given) == len(DEFAULT_THRESHOLDS):
+        source = "given"
+    elif calibration:
+        # entries written before the held-out split were fitted on every pair (None)
+        calibration_pairs = calibration.get("calibration_pairs")
+        fitted_on = "all" if calibration_pairs is None else len(calibration_pairs)
+        source = f"calibrated on {fitted_on} gold pairs" + (" + given" if given else "")
+        calibration_pairs = None if calibration_pairs is None else tuple(calibration_pairs)
+    else:
+        source = "default" + (" + given" if given else "")
+    return EvalConfig(
+        name=name,
+        encoder=encoder,
+        spacy=opts.get("spacy", "blank"),
+        section_aware=opts.get("sections", "1") not in ("0", "false", "no"),
+        thresholds={c: float(opts.get(c.lower(), base[c])) for c in DEFAULT_THRESHOLDS},
+        threshold_source=source,
+        calibration_pairs=calibration_pairs,
+    )
+
+
+def evaluation_pairs(configs, pairs):
+    """Gold pairs none of the configs' thresholds were calibrated on"""
+    if any(c.calibration_pairs is None for c in configs):
+        return []
+    used = {pid for c in configs for pid in c.calibration_pairs}
+    return [p for p in pairs if p["id"] not in used]
+
+
+# ------------------------------------------
+# PIPELINE (milestone2 extraction and milestone3 classification)
+# ------------------------------------------
+def extract_skills(nlp, matcher, text, section_aware):
+    """Skills found the way milestone 2 finds them: document_sections, then section_skill_hits"""
+    clean, sections = document_sections(text, section_aware)
+    return sorted(set(h.skill for h in section_skill_hits(nlp, matcher, clean, sections, SKILL_ALIASES)))
+
+
+def _unit(rows):
+    rows = np.asarray(rows, dtype=np.float32)
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    return rows / np.where(norms == 0, 1, norms)
+
+
+def skill_similarity(encoder, resume_skills, jd_skills):
+    """(resume skills, JD skills) cosine similarity of the skill labels, encoded in one batch"""
+    if not resume_skills or not jd_skills:
+        return np.zeros((len(resume_skills), len(jd_skills)), dtype=np.float32)
+    emb = _unit(encoder.encode(list(resume_skills) + list(jd_skills)))
+    return emb[:len(resume_skills)] @ emb[len(resume_skills):].T
+
+
+def classify_skills(encoder, resume_skills, jd_skills, thresholds):
+    """{jd skill: label} from cosine similarity of the extracted skill labels"""
+    if not jd_skills:
+        return {}
+    if not resume_skills:
+        return {s: CATEGORIES[0] for s in jd_skills}
+    result = classify_similarity(skill_similarity(encoder, resume_skills, jd_skills), thresholds)
+    return {s: CATEGORIES[label] for s, label in zip(jd_skills, result["label"])}
+
+
+def run_config(config, pairs):
+    """Predictions and per-pair stage latencies (seconds) for one configuration"""
+    start = time.perf_counter()
+    nlp, matcher = load_nlp_and_matcher(SKILL_ALIASES, model=None if config.spacy == "blank" else config.spacy)
+    encoder = load_encoder(config.encoder)
+    load_s = time.perf_counter() - start
+
+    predictions, extract_s, classify_s = {}, [], []
+    for pair in pairs:
+        t0 = time.perf_counter()
+        resume_skills = extract_skills(nlp, matcher, pair["resume"], config.section_aware)
+        # milestone2 matches the JD as one body of text
+        jd_skills = extract_skills(nlp, matcher, pair["jd"], False)
+        t1 = time.perf_counter()
+        labels = classify_skills(encoder, resume_skills, jd_skills, config.thresholds)
+        t2 = time.perf_counter()
+        predictions[pair["id"]] = {"resume_skills": resume_skills, "jd_skills": jd_skills, "labels": labels}
+        extract_s.append(t1 - t0)
+        classify_s.append(t2 - t1)
+    return {"predictions": predictions, "load_s": load_s,
+            "extract_s": np.array(extract_s), "classify_s": np.array(classify_s)}
+
+
+# ------------------------------------------
+# METRICS
+# ------------------------------------------
+def _prf(tp, n_pred, n_gold):
+    precision = tp / n_pred if n_pred else 0.0
+    recall = tp / n_gold if n_gold else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def extraction_scores(pairs, predictions):
+    """Micro precision/recall/F1 of extracted skills, for resumes and JDs"""
+    out = {}
+    for side in ("resume_skills", "jd_skills"):
+        tp = n_pred = n_gold = 0
+        for pair in pairs:
+            gold, pred = set(pair[side]), set(predictions[pair["id"]][side])
+            tp += len(gold & pred)
+            n_pred += len(pred)
+            n_gold += len(gold)
+        out[side] = _prf(tp, n_pred, n_gold)
+    return out
+
+
+def category_scores(pairs, predictions):
+    """
+    {category: (precision, recall, f1, support)} over JD skill labels.
+
+    A gold JD skill that was never extracted counts against recall of its gold
+    category; an extracted JD skill that is not in the gold set counts against
+    precision of whatever it was labelled.
+    """
+    out = {}
+    for category in CATEGORIES:
+        tp = n_pred = n_gold = 0
+        for pair in pairs:
+            gold = pair["labels"]
+            pred = predictions[pair["id"]]["labels"]
+            tp += sum(1 for s, c in gold.items() if c == category and pred.get(s) == category)
+            n_pred += sum(1 for c in pred.values() if c == category)
+            n_gold += sum(1 for c in gold.values() if c == category)
+        out[category] = (*_prf(tp, n_pred, n_gold), n_gold)
+    return out
+
+
+def label_flips(pairs, reference, predictions):
+    """Counter of (reference label, new label) for every gold JD skill whose label changed"""
+    flips = Counter()
+    for pair in pairs:
+        before = reference[pair["id"]]["labels"]
+        after = predictions[pair["id"]]["labels"]
+        for skill in pair["labels"]:
+            a, b = before.get(skill, NOT_EXTRACTED), after.get(skill, NOT_EXTRACTED)
+            if a != b:
+                flips[(a, b)] += 1
+    return flips
+
+
+def pareto_front(rows, quality="macro_f1", cost="p50_ms"):
+    """Flag rows no other row beats on both quality (higher) and cost (lower)"""
+    for r in rows:
+        r["pareto"] = not any(
+            o is not r and o[quality] >= r[quality] and o[cost] <= r[cost]
+            and (o[quality] > r[quality] or o[cost] < r[cost])
+            for o in rows
+        )
+    return rows
+
+
+def evaluate(configs, pairs):
+    """Summary rows (first config is the reference for label flips) and raw runs"""
+    runs = {c.name: run_config(c, pairs) for c in configs}
+    reference = runs[configs[0].name]["predictions"]
+    rows = []
+    for c in configs:
+        run = runs[c.name]
+        cats = category_scores(pairs, run["predictions"])
+        ext = extraction_scores(pairs, run["predictions"])
+        total_ms = (run["extract_s"] + run["classify_s"]) * 1000
+        flips = label_flips(pairs, reference, run["predictions"])
+        rows.append({
+            "config": c.name,
+            **{f"{cat.lower()}_p": round(cats[cat][0], 3) for cat in CATEGORIES},
+            **{f"{cat.lower()}_r": round(cats[cat][1], 3) for cat in CATEGORIES},
+            "macro_f1": round(float(np.mean([cats[cat][2] for cat in CATEGORIES])), 3),
+            "resume_extract_f1": round(ext["resume_skills"][2], 3),
+            "jd_extract_f1": round(ext["jd_skills"][2], 3),
+            "flips": sum(flips.values()),
+            "flip_detail": {f"{a} → {b}": n for (a, b), n in flips.most_common()},
+            "extract_p50_ms": round(float(np.percentile(run["extract_s"] * 1000, 50)), 3),
+            "classify_p50_ms": round(float(np.percentile(run["classify_s"] * 1000, 50)), 3),
+            "p50_ms": round(float(np.percentile(total_ms, 50)), 3),
+            "p95_ms": round(float(np.percentile(total_ms, 95)), 3),
+            "load_s": round(run["load_s"], 2),
+        })
+    return pareto_front(rows), runs
+
+
+def print_report(rows, configs=()):
+    for c in configs:
+        print(f"{c.name}: Partial >= {c.thresholds['Partial']:.3f}, Matched >= {c.thresholds['Matched']:.3f} "
+              f"({c.threshold_source})")
+    header = (f"{'config':<18}{'Mat P/R':>13}{'Par P/R':>13}{'Mis P/R':>13}{'macroF1':>9}"
+              f"{'extrF1 r/j':>13}{'flips':>7}{'p50 ms':>9}{'p95 ms':>9}  pareto")
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['config']:<18}"
+              f"{r['matched_p']:>7.2f}/{r['matched_r']:<5.2f}"
+              f"{r['partial_p']:>7.2f}/{r['partial_r']:<5.2f}"
+              f"{r['missing_p']:>7.2f}/{r['missing_r']:<5.2f}"
+              f"{r['macro_f1']:>9.3f}"
+              f"{r['resume_extract_f1']:>7.2f}/{r['jd_extract_f1']:<5.2f}"
+              f"{r['flips']:>7}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}  {'*' if r['pareto'] else ''}")
+    for r in rows[1:]:
+        if r["flip_detail"]:
+            detail = ", ".join(f"{k}: {n}" for k, n in r["flip_detail"].items())
+            print(f"  {r['config']} vs {rows[0]['config']}: {detail}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SkillGapAI matching quality vs speed harness")
+    parser.add_argument("--gold", default=GOLD_PATH)
+    parser.add_argument("--config", action="append", metavar="NAME:key=value,...",
+                        help="encoder=, spacy=, sections=0|1, partial=, matched= (repeatable; the first is the reference)")
+    parser.add_argument("--json", help="write the summary rows and predictions to this JSON file")
+    parser.add_argument("--all-pairs", action="store_true",
+                        help="also score the pairs the thresholds were calibrated on")
+    args = parser.parse_args(argv)
+
+    specs = args.config or ["sections:encoder=stub,spacy=blank", "full-text:encoder=stub,spacy=blank,sections=0"]
+    configs = [parse_config(s) for s in specs]
+    if len({c.name for c in configs}) != len(configs):
+        parser.error("configuration names must be unique")
+
+    pairs = load_gold(args.gold)
+    held_out = evaluation_pairs(configs, pairs)
+    if args.all_pairs or not held_out:
+        if len(held_out) < len(pairs):
+            print(f"note: {len(pairs) - len(held_out)} of {len(pairs)} pairs were used to calibrate thresholds; "
+                  "their scores are optimistic")
+    else:
+        if len(held_out) < len(pairs):
+            print(f"Evaluating on {len(held_out)} of {len(pairs)} pairs "
+                  f"(the other {len(pairs) - len(held_out)} calibrated the thresholds; --all-pairs to include them)")
+        pairs = held_out
+    rows, runs = evaluate(configs, pairs)
+    print_report(rows, configs)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "configs": [c._asdict() for c in configs],
+                "rows": rows,
+                "predictions": {name: run["predictions"] for name, run in runs.items()},
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
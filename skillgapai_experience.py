@@ -0,0 +1,142 @@
+# ==========================================
+# SkillGapAI - Experience & Recency Extraction
+# A precompiled pattern bank (N+ years, months, date ranges) scanned in
+# one pass, with durations attached to the nearest skill mentions
+# (PhraseMatcher hits, or label mentions found in the same scan)
+# ==========================================
+
+import re
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+
+from skillgapai_sections import SkillHit
+from skillgapai_tracing import traced
+
+ExperienceSpan = namedtuple("ExperienceSpan", ["start", "end", "years", "last_year"])
+SkillExperience = namedtuple("SkillExperience", ["years", "last_year"])
+
+# A skill mention picks up the nearest experience phrase within this many characters
+ATTACH_WINDOW = 120
+
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_NOW = r"(?:present|current|now|date|today)"
+
+# One alternation with named groups: every pattern is matched in a single left-to-right scan
+PATTERN_BANK = re.compile(
+    r"(?P<range>(?:(?P<m1>" + _MONTH + r")\s+)?(?P<y1>(?:19|20)\d{2})\s*(?:-|–|—|to|until)\s*"
+    r"(?:(?:(?P<m2>" + _MONTH + r")\s+)?(?P<y2>(?:19|20)\d{2})|(?P<now>" + _NOW + r")))"
+    r"|(?P<years>\b(?P<n>\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\b)"
+    r"|(?P<months>\b(?P<mo>\d{1,2})\s*\+?\s*months?\b)",
+    re.IGNORECASE,
+)
+_MONTH_INDEX = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+
+
+def _month(token, default):
+    return _MONTH_INDEX.get(token[:3].lower(), default) if token else default
+
+
+def _span(m, today):
+    if m.group("range"):
+        y1, mo1 = int(m.group("y1")), _month(m.group("m1"), 1)
+        if m.group("now"):
+            y2, mo2 = today.year, today.month
+        else:
+            y2, mo2 = int(m.group("y2")), _month(m.group("m2"), 12)
+        years = max(0.0, (y2 - y1) + (mo2 - mo1 + 1) / 12.0)
+        return ExperienceSpan(m.start(), m.end(), round(years, 1), y2)
+    if m.group("years"):
+        return ExperienceSpan(m.start(), m.end(), float(m.group("n")), None)
+    return ExperienceSpan(m.start(), m.end(), round(int(m.group("mo")) / 12.0, 1), None)
+
+
+@lru_cache(maxsize=256)
+@traced("experience_spans")
+def experience_spans(text, today=None):
+    """
+    Durations (in years) and last-active year for every experience phrase (cached per text).
+
+    Skill positions come from the matcher's hits, so this is the only extra
+    work per document: one linear regex scan of text that limit_text already
+    bounds, shared with the confidence model through the cache.
+    """
+    today = today or date.today()
+    return tuple(_span(m, today) for m in PATTERN_BANK.finditer(text))
+
+
+def attach_experience(hits, spans, window=ATTACH_WINDOW):
+    """
+    {skill: SkillExperience(max years, latest year)} from hits and experience spans.
+
+    Each hit takes the nearest span (by char distance) within the window, found
+    with one searchsorted over the span midpoints for all hits at once.
+    """
+    if not hits or not spans:
+        return {}
+    mids = np.array([(s.start + s.end) // 2 for s in spans], dtype=np.int64)
+    order = np.argsort(mids, kind="stable")
+    mids = mids[order]
+    pos = np.array([(h.start + h.end) // 2 for h in hits], dtype=np.int64)
+
+    idx = np.searchsorted(mids, pos)
+    left = np.clip(idx - 1, 0, mids.size - 1)
+    right = np.clip(idx, 0, mids.size - 1)
+    nearest = np.where(np.abs(pos - mids[left]) <= np.abs(mids[right] - pos), left, right)
+    close = np.abs(mids[nearest] - pos) <= window
+
+    out = {}
+    for hit, k, ok in zip(hits, order[nearest], close):
+        if not ok:
+            continue
+        span = spans[k]
+        prev = out.get(hit.skill, SkillExperience(0.0, None))
+        lasts = [y for y in (span.last_year, prev.last_year) if y is not None]
+        out[hit.skill] = SkillExperience(max(span.years, prev.years), max(lasts) if lasts else None)
+    return out
+
+
+@lru_cache(maxsize=64)
+def _bank_with_skills(skills):
+    # the skill labels become one more alternative of the pattern bank
+    alternatives = "|".join(re.escape(s) for s in sorted(skills, key=len, reverse=True))
+    return re.compile(PATTERN_BANK.pattern + r"|(?P<skill>(?<!\w)(?:" + alternatives + r")(?!\w))", re.IGNORECASE)
+
+
+@traced("experience_spans")
+def scan_experience(text, skills, today=None):
+    """
+    (experience spans, skill mentions) in one scan, for apps that have skill
+    labels but no PhraseMatcher hits: mentions are word-boundary matches of
+    the labels, found by the same finditer as the experience phrases.
+    """
+    if not text or not skills:
+        return experience_spans(text or "", today), []
+    today = today or date.today()
+    by_lower = {s.lower(): s for s in skills}
+    spans, hits = [], []
+    for m in _bank_with_skills(tuple(sorted(by_lower))).finditer(text):
+        if m.group("skill"):
+            hits.append(SkillHit(by_lower[m.group("skill").lower()], "Body", m.start(), m.end()))
+        else:
+            spans.append(_span(m, today))
+    return tuple(spans), hits
+
+
+def years_for(skills, experience):
+    """Years per skill label as a float array (NaN where the text gave no duration)"""
+    return np.array([experience[s].years if s in experience else np.nan for s in skills], dtype=np.float64)
+
+
+def skill_experience(text, hits, today=None):
+    """Experience per matched skill for one document (hits from section_skill_hits)"""
+    return attach_experience(hits, experience_spans(text, today))
+
+
+def labeled_skill_experience(text, skills, today=None):
+    """Experience per skill label for a document that was never run through the matcher"""
+    spans, hits = scan_experience(text, skills, today)
+    return attach_experience(hits, spans)
@@ -0,0 +1,262 @@
+# ==========================================
+# SkillGapAI - Skill → Candidate Inverted Index
+# Posting lists of (candidate id, match score) per canonical skill,
+# boolean and weighted queries, incremental insertion, on-disk persistence
+# ==========================================
+
+import json
+import os
+import threading
+
+import numpy as np
+
+from skillgapai_snapshots import commit_version, current_version, locked, version_path
+from skillgapai_tracing import span
+
+# Scores are stored as uint8 (1/255 resolution) next to uint32 candidate ids.
+SCORE_SCALE = 255
+
+
+def quantize(scores):
+    return np.clip(np.rint(np.asarray(scores, dtype=np.float32) * SCORE_SCALE), 0, SCORE_SCALE).astype(np.uint8)
+
+
+class SkillIndex:
+    """
+    Inverted index from canonical skill to candidates.
+
+    Internal candidate ids only ever increase, so new postings are appended to
+    a per-skill buffer and merged into the sorted arrays with a concatenate -
+    no re-sort. Re-ingesting a candidate tombstones the old id. On disk, ids
+    are delta-encoded before compression, which keeps posting lists small.
+    Candidate ids are opaque keys (the apps use resume content hashes);
+    `labels` keeps a display name for each of them. On disk the index is a
+    versioned snapshot that every app process merges into.
+    """
+
+    def __init__(self):
+        self.skills = {}
+        self.candidates = []
+        self.labels = {}
+        self._internal = {}
+        self._deleted = np.zeros(0, dtype=bool)
+        self._ids = {}
+        self._scores = {}
+        self._buffer = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._internal)
+
+    def __contains__(self, candidate_id):
+        return candidate_id in self._internal
+
+    # ------------------------------------------
+    # INSERTION
+    # ------------------------------------------
+    def add(self, candidate_id, skill_scores, label=None):
+        """Index one candidate given {canonical skill: match score in [0, 1]}"""
+        self.add_many([(candidate_id, skill_scores)], None if label is None else {candidate_id: label})
+
+    def add_many(self, items, labels=None):
+        """
+        Index several candidates at once. A candidate id seen earlier - in the
+        index or in the same batch - is tombstoned and the last entry wins.
+        `labels` optionally maps candidate ids to display names.
+        """
+        # materialize first so a bad item fails before the index is touched
+        items = [(candidate_id, dict(skill_scores)) for candidate_id, skill_scores in items]
+        with self._lock:
+            tombstones = []
+            for candidate_id, skill_scores in items:
+                old = self._internal.get(candidate_id)
+                if old is not None:
+                    tombstones.append(old)
+                doc = len(self.candidates)
+                self.candidates.append(candidate_id)
+                self._internal[candidate_id] = doc
+                for skill, score in skill_scores.items():
+                    self.skills.setdefault(skill, len(self.skills))
+                    self._buffer.setdefault(skill, []).append((doc, score))
+            if len(self._deleted) < len(self.candidates):
+                self._deleted = np.pad(self._deleted, (0, len(self.candidates) - len(self._deleted)))
+            self._deleted[tombstones] = True
+            self.labels.update(labels or {})
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        for skill, entries in self._buffer.items():
+            docs = np.fromiter((d for d, _ in entries), dtype=np.uint32, count=len(entries))
+            scores = quantize([s for _, s in entries])
+            if skill in self._ids:
+                self._ids[skill] = np.concatenate([self._ids[skill], docs])
+                self._scores[skill] = np.concatenate([self._scores[skill], scores])
+            else:
+                self._ids[skill] = docs
+                self._scores[skill] = scores
+        self._buffer = {}
+
+    # ------------------------------------------
+    # QUERIES
+    # ------------------------------------------
+    def postings(self, skill, min_score=0.0):
+        """Sorted live candidate ids with score >= min_score for one skill"""
+        with self._lock:
+            self._flush()
+            ids = self._ids.get(skill)
+            if ids is None:
+                return np.zeros(0, dtype=np.uint32)
+            keep = self._scores[skill] >= quantize(min_score)
+            ids = ids[keep]
+            return ids[~self._deleted[ids]]
+
+    def boolean(self, must=(), should=(), must_not=()):
+        """
+        Candidate ids satisfying every `must` term, at least one `should` term
+        (if any are given) and no `must_not` term. Terms are skill names or
+        (skill, min_score) pairs, e.g. ("kubernetes", 0.5) for "at least partial".
+        """
+        def ids_for(term):
+            skill, min_score = (term, 0.0) if isinstance(term, str) else term
+            return self.postings(skill, min_score)
+
+        with span("index_query"):
+            result = None
+            # intersect smallest lists first
+            for ids in sorted((ids_for(t) for t in must), key=len):
+                result = ids if result is None else np.intersect1d(result, ids, assume_unique=True)
+                if not result.size:
+                    return result
+            if should:
+                any_ids = np.unique(np.concatenate([ids_for(t) for t in should]))
+                result = any_ids if result is None else np.intersect1d(result, any_ids, assume_unique=True)
+            if result is None:
+                with self._lock:
+                    result = np.flatnonzero(~self._deleted).astype(np.uint32)
+            for term in must_not:
+                result = np.setdiff1d(result, ids_for(term), assume_unique=True)
+            return result
+
+    def weighted(self, weights, top_k=20, min_score=0.0, candidates=None):
+        """Top-k candidates by sum(weight × score) over the weighted skills"""
+        with span("index_query"):
+            n = len(self.candidates)
+            totals = np.zeros(n, dtype=np.float64)
+            with self._lock:
+                self._flush()
+                for skill, weight in weights.items():
+                    ids = self._ids.get(skill)
+                    if ids is None:
+                        continue
+                    scores = self._scores[skill].astype(np.float64) / SCORE_SCALE
+                    keep = scores >= min_score
+                    totals += np.bincount(ids[keep], weights=weight * scores[keep], minlength=n)
+                totals[self._deleted] = 0.0
+            if candidates is not None:
+                mask = np.zeros(n, dtype=bool)
+                mask[candidates] = True
+                totals[~mask] = 0.0
+            k = min(top_k, int((totals > 0).sum()))
+            if not k:
+                return []
+            top = np.argpartition(-totals, k - 1)[:k]
+            top = top[np.argsort(-totals[top], kind="stable")]
+            return [(self.candidates[i], float(totals[i])) for i in top]
+
+    def names(self, ids):
+        return [self.candidates[i] for i in ids]
+
+    def label(self, candidate_id):
+        return self.labels.get(candidate_id, candidate_id)
+
+    def entries(self):
+        """(candidate id, {skill: score}) for every live candidate, as they were added (scores quantized)"""
+        with self._lock:
+            self._flush()
+            rows = {doc: {} for doc in self._internal.values()}
+            for skill, ids in self._ids.items():
+                for doc, score in zip(ids.tolist(), self._scores[skill].tolist()):
+                    if doc in rows:
+                        rows[doc][skill] = score / SCORE_SCALE
+            return [(self.candidates[doc], rows[doc]) for doc in sorted(rows)]
+
+    # ------------------------------------------
+    # PERSISTENCE
+    # ------------------------------------------
+    def sync(self, directory):
+        """Merge in candidates other processes saved to directory since this index last read or wrote it"""
+        version = current_version(directory)
+        if version is None or version == self._version:
+            return 0
+        other = self._read(version_path(directory, version))
+        items = [(c, scores) for c, scores in other.entries() if c not in self]
+        self.add_many(items, {c: other.labels[c] for c, _ in items if c in other.labels})
+        self._version = version
+        return len(items)
+
+    def save(self, directory):
+        """
+        Merge in what other processes saved, then write delta-encoded,
+        compressed posting lists plus metadata as one new version
+        """
+        with locked(directory):
+            self.sync(directory)
+            with self._lock:
+                self._flush()
+                skills = sorted(self._ids, key=self.skills.get)
+                lengths = np.array([self._ids[s].size for s in skills], dtype=np.int64)
+                offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+                ids = np.concatenate([self._ids[s] for s in skills]) if skills else np.zeros(0, np.uint32)
+                scores = np.concatenate([self._scores[s] for s in skills]) if skills else np.zeros(0, np.uint8)
+                # delta-encode within each posting list (first entry kept absolute)
+                deltas = ids.astype(np.int64).copy()
+                if ids.size:
+                    deltas[1:] -= ids[:-1].astype(np.int64)
+                    deltas[offsets[:-1][lengths > 0]] = ids[offsets[:-1][lengths > 0]]
+                deleted = self._deleted.copy()
+                meta = {"skills": skills, "candidates": list(self.candidates), "labels": dict(self.labels)}
+
+            def write(path):
+                np.savez_compressed(
+                    os.path.join(path, "postings.npz"),
+                    offsets=offsets, deltas=deltas.astype(np.uint32), scores=scores, deleted=deleted,
+                )
+                with open(os.path.join(path, "meta.json"), "w") as f:
+                    json.dump(meta, f)
+
+            self._version = commit_version(directory, write)
+
+    @classmethod
+    def load(cls, directory):
+        version = current_version(directory)
+        index = cls._read(version_path(directory, version))
+        index._version = version
+        return index
+
+    @classmethod
+    def _read(cls, path):
+        index = cls()
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        data = np.load(os.path.join(path, "postings.npz"))
+        offsets, deltas, scores = data["offsets"], data["deltas"].astype(np.int64), data["scores"]
+
+        index.candidates = meta["candidates"]
+        index.labels = meta.get("labels", {})
+        index._deleted = data["deleted"].astype(bool)
+        index._internal = {c: i for i, c in enumerate(index.candidates) if not index._deleted[i]}
+        for k, skill in enumerate(meta["skills"]):
+            start, end = offsets[k], offsets[k + 1]
+            index.skills[skill] = k
+            index._ids[skill] = np.cumsum(deltas[start:end]).astype(np.uint32)
+            index._scores[skill] = scores[start:end]
+        return index
+
+    @classmethod
+    def open(cls, directory):
+        """Load an index from directory, or start an empty one"""
+        if current_version(directory) or os.path.exists(os.path.join(directory, "meta.json")):
+            return cls.load(directory)
+        return cls()
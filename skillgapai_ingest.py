@@ -0,0 +1,209 @@
+# ==========================================
+# SkillGapAI - Guarded Ingestion
+# Byte, page and character limits for pasted text and uploads; oversized
+# inputs keep their first pages / characters plus the Skills section.
+# Parsed uploads are kept on disk (capped) for every app to reuse
+# ==========================================
+
+import json
+import os
+import threading
+import zlib
+from collections import namedtuple
+from itertools import chain
+
+from skillgapai_core import DATA_DIR, clean_text, extract_raw_text, extract_text_from_pdf
+from skillgapai_sections import skills_sections
+from skillgapai_tracing import span
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+MAX_PDF_PAGES = 30
+MAX_CHARS = 200_000
+# Budget reserved (out of MAX_CHARS) for a Skills section found beyond the kept head
+MAX_SKILLS_SECTION_CHARS = 20_000
+# How far into an oversized text a Skills heading is looked for
+MAX_SKILLS_SCAN_CHARS = 2_000_000
+
+PARSED_DIR = os.path.join(DATA_DIR, "parsed")
+# Disk budget for parsed upload text; least recently used documents are removed first
+MAX_PARSED_BYTES = 256 * 1024 * 1024
+
+Ingested = namedtuple("Ingested", ["text", "chars", "kept_chars", "pages", "kept_pages", "truncated", "note"])
+
+
+class InputTooLarge(ValueError):
+    """An upload over the byte limit in a format that cannot be read partially"""
+
+
+def limit_text(text, max_chars=MAX_CHARS):
+    """
+    Ingested text within max_chars.
+
+    Oversized text keeps its first characters (cut at a line or word break)
+    plus the Skills sections that start after the cut (within the first
+    MAX_SKILLS_SCAN_CHARS), so the part that matters most for matching
+    survives truncation.
+    """
+    if len(text) <= max_chars:
+        return Ingested(text, len(text), len(text), None, None, False, "")
+
+    with span("limit_text", chars=len(text)):
+        # only Skills headings past the head are looked for; the full text is never segmented
+        def head_at(limit):
+            cut = max(text.rfind("\n", 0, limit), text.rfind(" ", 0, limit))
+            return text[:cut if cut > limit // 2 else limit]
+
+        head = head_at(max_chars - MAX_SKILLS_SECTION_CHARS)
+        skills = skills_sections(text, len(head), MAX_SKILLS_SCAN_CHARS, MAX_SKILLS_SECTION_CHARS)
+        first = next(skills, None)
+        if first is None:
+            head = head_at(max_chars)
+
+        tail = []
+        budget = max_chars - len(head)
+        for s in chain([first], skills) if first else ():
+            if budget <= 0:
+                break
+            piece = text[s.start:min(s.end, s.start + budget)]
+            tail.append(piece)
+            budget -= len(piece)
+
+    kept = "\n".join([head] + tail)
+    note = f"kept the first {len(head):,} of {len(text):,} characters"
+    if tail:
+        note += " plus the Skills section"
+    return Ingested(kept, len(text), len(kept), None, None, True, note)
+
+
+def _size(uploaded_file):
+    size = getattr(uploaded_file, "size", None)
+    if size is None:
+        uploaded_file.seek(0, 2)
+        size = uploaded_file.tell()
+    uploaded_file.seek(0)
+    return size
+
+
+def read_upload(uploaded_file, max_bytes=MAX_UPLOAD_BYTES, max_pages=MAX_PDF_PAGES, max_chars=MAX_CHARS):
+    """
+    Ingested raw text of an uploaded PDF, DOCX or TXT file within the limits.
+
+    TXT files over max_bytes are read up to the limit; PDFs read only their
+    first max_pages pages. PDF and DOCX files over max_bytes cannot be read
+    partially and raise InputTooLarge.
+    """
+    name = uploaded_file.name.lower()
+    size = _size(uploaded_file)
+    notes = []
+    pages = kept_pages = None
+
+    if name.endswith(".txt"):
+        raw = uploaded_file.read(max_bytes).decode("utf-8", errors="ignore")
+        if size > max_bytes:
+            notes.append(f"read the first {max_bytes // (1024 * 1024)} MB of {size / (1024 * 1024):.1f} MB")
+    elif size > max_bytes:
+        raise InputTooLarge(f"{uploaded_file.name} is {size / (1024 * 1024):.1f} MB; the limit is {max_bytes // (1024 * 1024)} MB")
+    elif name.endswith(".pdf"):
+        result = extract_text_from_pdf(uploaded_file, max_pages=max_pages)
+        raw, pages, kept_pages = result.text, result.total_pages, len(result.pages)
+        if pages > kept_pages:
+            notes.append(f"read the first {kept_pages} of {pages} pages")
+        if result.timed_out:
+            notes.append("stopped at the PDF time limit")
+    else:
+        raw = extract_raw_text(uploaded_file)
+
+    limited = limit_text(raw, max_chars)
+    if limited.truncated:
+        notes.append(limited.note)
+    return limited._replace(
+        chars=len(raw), pages=pages, kept_pages=kept_pages,
+        truncated=bool(notes), note="; ".join(notes),
+    )
+
+
+def ingest_upload(uploaded_file, **limits):
+    """read_upload with the text cleaned for matching"""
+    ingested = read_upload(uploaded_file, **limits)
+    return ingested._replace(text=clean_text(ingested.text))
+
+
+def truncation_message(label, ingested):
+    """One-line UI notice for a truncated input, or "" when nothing was cut"""
+    return f"{label} is very large: {ingested.note}." if ingested.truncated else ""
+
+
+# ------------------------------------------
+# PARSED DOCUMENTS (SHARED, ON DISK)
+# ------------------------------------------
+class ParsedDocuments:
+    """
+    Cleaned text of parsed uploads keyed by content hash, shared by every app.
+
+    Milestone 1 fills it and batch parsing reads it first, so a file parsed
+    once is never parsed again by a later stage. One zlib-compressed JSON file
+    per document, written atomically; once the directory outgrows max_bytes
+    the least recently used documents (by mtime) are deleted.
+    """
+
+    def __init__(self, directory=PARSED_DIR, max_bytes=MAX_PARSED_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._bytes = sum(size for _, _, size in self._files())
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json.z")
+
+    def _files(self):
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json.z"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue  # removed by another process
+                    files.append((stat.st_mtime, entry.path, stat.st_size))
+        return files
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """{"name", "text", "note"} for a content hash, or None"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                doc = json.loads(zlib.decompress(f.read()))
+            os.utime(path)
+        except (OSError, ValueError, zlib.error):
+            return None
+        return doc
+
+    def put(self, key, name, text, note=""):
+        data = zlib.compress(json.dumps({"name": name, "text": text, "note": note}).encode("utf-8"), 6)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._bytes += len(data)
+            if self._bytes > self.max_bytes:
+                self._trim()
+
+    def _trim(self):
+        # other processes write here too, so the directory is re-read rather than trusted
+        files = sorted(self._files())
+        total = sum(size for _, _, size in files)
+        for _, path, size in files:
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._bytes = total
@@ -0,0 +1,108 @@
+# ==========================================
+# SkillGapAI - Learning Path Planner
+# Orders missing skills along the prerequisite DAG, learning the
+# cheapest reachable skill first and never a skill before its prerequisites
+# ==========================================
+
+import heapq
+import threading
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+
+from skillgapai_core import SKILL_PREREQUISITES
+from skillgapai_tracing import span
+
+PathStep = namedtuple("PathStep", ["skill", "prerequisite", "unlocks", "cost"])
+
+
+class LearningPathPlanner:
+    """
+    Learning paths over a prerequisite DAG.
+
+    The prerequisite closure of each skill and the cost of reaching it are
+    memoized, and whole plans are cached per (missing, known) set, so thousands
+    of candidates sharing one JD mostly hit the cache. Costs default to one unit
+    per skill (fewest skills to learn); pass `effort` for hours or similar.
+    """
+
+    def __init__(self, prerequisites=None, effort=None, max_plans=4096):
+        graph = SKILL_PREREQUISITES if prerequisites is None else prerequisites
+        self.prerequisites = {k.lower(): tuple(p.lower() for p in v) for k, v in graph.items()}
+        self.effort = {k.lower(): float(v) for k, v in (effort or {}).items()}
+        self.max_plans = max_plans
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+        self._closure = lru_cache(maxsize=None)(self._closure_of)
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        state = {}
+
+        def visit(skill, trail):
+            if state.get(skill) == 2:
+                return
+            if state.get(skill) == 1:
+                raise ValueError(f"Prerequisite cycle: {' → '.join(trail + [skill])}")
+            state[skill] = 1
+            for pre in self.prerequisites.get(skill, ()):
+                visit(pre, trail + [skill])
+            state[skill] = 2
+
+        for skill in self.prerequisites:
+            visit(skill, [])
+
+    def _closure_of(self, skill):
+        """Skill plus all of its transitive prerequisites"""
+        out = {skill}
+        for pre in self.prerequisites.get(skill, ()):
+            out |= self._closure(pre)
+        return frozenset(out)
+
+    def cost(self, skill):
+        return self.effort.get(skill, 1.0)
+
+    def cost_to_reach(self, skill, known=frozenset()):
+        """Cheapest total effort to be able to learn and finish `skill` given known skills"""
+        return sum(self.cost(s) for s in self._closure(skill.lower()) - known)
+
+    def plan(self, missing, known=()):
+        """Ordered PathSteps covering every missing skill and its unknown prerequisites"""
+        missing_key = frozenset(s.lower() for s in missing)
+        known_key = frozenset(s.lower() for s in known) - missing_key
+        cache_key = (missing_key, known_key)
+        with self._lock:
+            cached = self._plans.get(cache_key)
+            if cached is not None:
+                self._plans.move_to_end(cache_key)
+                return cached
+
+        with span("learning_path", skills=len(missing_key)):
+            required = set()
+            for skill in missing_key:
+                required |= self._closure(skill) - known_key
+
+            pending = {s: {p for p in self.prerequisites.get(s, ()) if p in required} for s in required}
+            unlocks = {s: [] for s in required}
+            for s, pres in pending.items():
+                for p in pres:
+                    unlocks[p].append(s)
+
+            # Kahn's algorithm; among ready skills take the cheapest to reach first
+            reach = {s: self.cost_to_reach(s, known_key) for s in required}
+            ready = [(reach[s], s) for s, pres in pending.items() if not pres]
+            heapq.heapify(ready)
+            steps = []
+            while ready:
+                _, skill = heapq.heappop(ready)
+                steps.append(PathStep(skill, skill not in missing_key, tuple(sorted(unlocks[skill])), self.cost(skill)))
+                for nxt in unlocks[skill]:
+                    pending[nxt].discard(skill)
+                    if not pending[nxt]:
+                        heapq.heappush(ready, (reach[nxt], nxt))
+            steps = tuple(steps)
+
+        with self._lock:
+            self._plans[cache_key] = steps
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+        return steps
@@ -3,19 +3,30 @@
 # Weeks 1–2
 # ==========================================
 
-import streamlit as st
-import docx2txt
-import PyPDF2
-import re
-from io import BytesIO
-import tempfile
+import multiprocessing as mp
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import streamlit as st
+
+from skillgapai_batch import parse_uploads
+from skillgapai_core import clean_text
+from skillgapai_ingest import ParsedDocuments, limit_text, truncation_message
+from skillgapai_pipeline import content_hash
+from skillgapai_tracing import debug_panel, metrics_server_from_env, start_trace
 
 # ------------------------------------------
 # PAGE CONFIGURATION
 # ------------------------------------------
 st.set_page_config(page_title="SkillGapAI - Milestone 1", layout="wide")
 
+# ------------------------------------------
+# TRACING (?debug=1 for the stage waterfall, &profile=cprofile|pyinstrument)
+# ------------------------------------------
+metrics_server_from_env()
+tracer = start_trace("milestone1", profile=st.query_params.get("profile"))
+
 st.markdown(
     """
     <h2 style='color:white; background-color:#1E3D59; padding:15px; border-radius:10px'>
@@ -27,60 +38,50 @@ st.markdown(
 )
 
 # ------------------------------------------
-# FUNCTIONS
+# PARSING POOL & SESSION CORPUS
 # ------------------------------------------
-
-def clean_text(text: str) -> str:
-    """Normalize text by removing extra spaces and line breaks"""
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
-
-
-def extract_text(uploaded_file) -> str:
-    """Extract plain text from PDF, DOCX, or TXT"""
-    text = ""
-    try:
-        file_name = uploaded_file.name.lower()
-
-        if file_name.endswith(".pdf"):
-            # ensure pointer at start
-            uploaded_file.seek(0)
-            reader = PyPDF2.PdfReader(uploaded_file)
-            for page in reader.pages:
-                content = page.extract_text()
-                if content:
-                    text += content + "\n"
-
-        elif file_name.endswith(".docx"):
-            # docx2txt.process expects a path, so write a temp file
-            uploaded_file.seek(0)
-            with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as tmp:
-                tmp.write(uploaded_file.read())
-                tmp_path = tmp.name
-            try:
-                text = docx2txt.process(tmp_path)
-            finally:
-                try:
-                    os.remove(tmp_path)
-                except Exception:
-                    pass
-
-        elif file_name.endswith(".txt"):
-            # reset file pointer if needed
-            uploaded_file.seek(0)
-            text = uploaded_file.read().decode("utf-8", errors="ignore")
-
+@st.cache_resource
+def load_parse_pool():
+    # processes rather than threads: the PDF backends are pure Python and hold the GIL
+    return ProcessPoolExecutor(max_workers=os.cpu_count() or 4, mp_context=mp.get_context("spawn"))
+
+@st.cache_resource
+def load_parsed_documents():
+    # on disk and capped; batch parsing in the later apps reads it before parsing a file again
+    return ParsedDocuments()
+
+parsed_docs = load_parsed_documents()
+
+# Documents listed per session; only their metadata lives here, the text is in parsed_docs
+MAX_SESSION_DOCS = 200
+
+# content hash -> {"name", "chars", "error", "note"}, oldest first
+if "corpus" not in st.session_state:
+    st.session_state["corpus"] = {}
+corpus = st.session_state["corpus"]
+
+
+def parse_into_corpus(files, status):
+    """Parse files not yet in the session corpus in parallel, updating a per-file status table"""
+    names = [f.name for f in files]
+    rows = ["⏳ Parsing"] * len(files)
+    table = status.empty()
+    progress = status.progress(0.0, text=f"Parsing {len(files)} files…")
+    table.dataframe(pd.DataFrame({"File": names, "Status": rows}), hide_index=True, use_container_width=True)
+    hashes = [content_hash(f.getvalue()) for f in files]
+
+    for done, (i, name, text, error, note) in enumerate(parse_uploads(files, pool=load_parse_pool(), cache=parsed_docs), 1):
+        corpus[hashes[i]] = {"name": name, "chars": len(text), "error": error, "note": note}
+        if error:
+            rows[i] = f"⚠ {error}"
+        elif not text:
+            rows[i] = "⚠ No text"
         else:
-            st.error("❌ Unsupported file format. Please upload PDF, DOCX, or TXT.")
-            return ""
-
-        return clean_text(text)
-
-    except Exception as e:
-        st.error(f"⚠ Error extracting text: {e}")
-        return ""
-    
-
+            rows[i] = "✂️ Truncated" if note else "✅ Parsed"
+        progress.progress(done / len(files), text=f"Parsed {done}/{len(files)} files…")
+        table.dataframe(pd.DataFrame({"File": names, "Status": rows}), hide_index=True, use_container_width=True)
+    while len(corpus) > MAX_SESSION_DOCS:
+        corpus.pop(next(iter(corpus)))
 
 
 # ------------------------------------------
@@ -89,37 +90,68 @@ def extract_text(uploaded_file) -> str:
 col1, col2 = st.columns([1, 2])
 
 with col1:
-    st.markdown("### 📤 Upload Resume or Job Description File")
-    uploaded_file = st.file_uploader(
-        "Choose a file (PDF, DOCX, TXT)",
-        type=["pdf", "docx", "txt"]
+    st.markdown("### 📤 Upload Resumes or Job Descriptions")
+    uploaded_files = st.file_uploader(
+        "Choose files (PDF, DOCX, TXT)",
+        type=["pdf", "docx", "txt"],
+        accept_multiple_files=True
     )
     st.info("Supported formats: PDF • DOCX • TXT")
 
+    if uploaded_files:
+        # identical uploads (same bytes under any name) are parsed once
+        unique = {}
+        for f in uploaded_files:
+            unique.setdefault(content_hash(f.getvalue()), f)
+        fresh = [f for h, f in unique.items() if h not in corpus]
+        if len(unique) < len(uploaded_files):
+            st.caption(f"Skipped {len(uploaded_files) - len(unique)} duplicate upload(s).")
+        if fresh:
+            parse_into_corpus(fresh, st.container())
+
+    if corpus:
+        st.caption(f"Session corpus: {len(corpus)} document(s), up to {MAX_SESSION_DOCS}")
+        if st.button("🗑️ Clear session corpus"):
+            corpus.clear()
+            st.rerun()
+
 with col2:
     st.markdown("### 🧾 Parsed Document Preview")
 
-    if uploaded_file:
-        with st.spinner("🔍 Extracting and cleaning text..."):
-            extracted_text = extract_text(uploaded_file)
-
-        if extracted_text:
-            st.success(f"✅ Successfully parsed: {uploaded_file.name}")
-            st.text_area("Extracted & Cleaned Text", extracted_text[:4000], height=350)
-            st.caption(f"Characters: {len(extracted_text)} | Words: {len(extracted_text.split())}")
-
-            # --- Download Parsed Data ---
-            st.download_button(
-                label="💾 Download Parsed Text",
-                data=extracted_text,
-                file_name=f"parsed_{uploaded_file.name.rsplit('.', 1)[0]}.txt",
-                mime="text/plain"
-            )
-        else:
-            st.warning("⚠ No text extracted from the file. Try another format or ensure it contains readable text.")
-
-    else:
-        st.warning("Upload a file to see and download the parsed text preview here.")
+    parsed = {h: doc for h, doc in corpus.items() if doc["chars"] and not doc["error"]}
+    for doc in corpus.values():
+        if doc["error"]:
+            st.error(f"❌ {doc['name']}: {doc['error']}")
+
+    stored = None
+    if parsed:
+        key = st.selectbox("Document", list(parsed), format_func=lambda h: parsed[h]["name"])
+        doc = parsed[key]
+        stored = parsed_docs.get(key)
+        if stored is None:
+            # dropped from the shared store to stay under its disk cap
+            st.warning(f"⚠ {doc['name']} is no longer stored; upload it again to preview it.")
+            corpus.pop(key)
+
+    if stored is not None:
+        extracted_text = stored["text"]
+        st.success(f"✅ Successfully parsed: {doc['name']}")
+        if doc["note"]:
+            st.warning(f"✂️ {doc['name']} is very large: {doc['note']}.")
+        st.text_area("Extracted & Cleaned Text", extracted_text[:4000], height=350)
+        st.caption(f"Characters: {len(extracted_text)} | Words: {len(extracted_text.split())}")
+
+        # --- Download Parsed Data ---
+        st.download_button(
+            label="💾 Download Parsed Text",
+            data=extracted_text,
+            file_name=f"parsed_{doc['name'].rsplit('.', 1)[0]}.txt",
+            mime="text/plain"
+        )
+    elif corpus and not parsed:
+        st.warning("⚠ No text extracted from the uploaded files. Try another format or ensure they contain readable text.")
+    elif not corpus:
+        st.warning("Upload files to see and download the parsed text preview here.")
 
 
 # ------------------------------------------
@@ -131,7 +163,10 @@ st.subheader("📋 Paste Job Description (Optional)")
 jd_text = st.text_area("Paste Job Description here:", "", height=200)
 
 if jd_text.strip():
-    cleaned_jd = clean_text(jd_text)
+    limited = limit_text(jd_text)
+    if limited.truncated:
+        st.warning(f"✂️ {truncation_message('Job description', limited)}")
+    cleaned_jd = clean_text(limited.text)
     st.text_area("Cleaned Job Description Output", cleaned_jd, height=200)
     st.caption(f"Characters: {len(cleaned_jd)} | Words: {len(cleaned_jd.split())}")
 
@@ -150,3 +185,6 @@ st.markdown(
     "<p style='text-align:center; color:gray;'>Milestone 1 • Data Ingestion & Parsing • SkillGapAI Project • Developed by P K RAVI </p>",
     unsafe_allow_html=True
 )
+
+if st.query_params.get("debug") == "1":
+    debug_panel(tracer)
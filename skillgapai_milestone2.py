@@ -11,26 +11,28 @@ New features:
 """
 
 import streamlit as st
-import spacy
-from spacy.matcher import PhraseMatcher
 import re
 import matplotlib.pyplot as plt
 from datetime import datetime
-from io import BytesIO, StringIO
 import pandas as pd
 import json
-import base64
-import tempfile
-
-# For PDF generation
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-
-# For PDF text extraction (basic)
-try:
-    import PyPDF2
-except Exception:
-    PyPDF2 = None
+import uuid
+
+from skillgapai_core import (
+    SKILL_ALIASES, TECH_CANONICAL, SOFT_CANONICAL,
+    extract_text_from_pdf, categorize_skills,
+    create_csv_bytes, create_json_bytes, create_pdf_report,
+)
+from skillgapai_core import load_nlp_and_matcher as build_nlp_and_matcher
+from skillgapai_pipeline import content_hash
+from skillgapai_results_db import AnalysisStore, candidate_label, record_from_skill_sets
+from skillgapai_confidence import batch_confidences
+from skillgapai_experience import skill_experience
+from skillgapai_ingest import MAX_PDF_PAGES, MAX_UPLOAD_BYTES, limit_text, read_upload, truncation_message
+from skillgapai_model_server import model_client_from_env
+from skillgapai_sections import SECTION_WEIGHTS, document_sections, section_skill_hits
+from skillgapai_session_store import SessionResultStore, CompactResult, session_panel
+from skillgapai_tracing import debug_panel, metrics_server_from_env, start_trace
 
 # ----------------------------
 # Page config
@@ -39,6 +41,12 @@ st.set_page_config(page_title="SkillGapAI — Milestone 2 ",
                    page_icon="🧭",
                    layout="wide")
 
+# ----------------------------
+# Tracing (?debug=1 for the stage waterfall, &profile=cprofile|pyinstrument)
+# ----------------------------
+metrics_server_from_env()
+tracer = start_trace("milestone2", profile=st.query_params.get("profile"))
+
 # ----------------------------
 # Utilities & CSS
 # ----------------------------
@@ -63,131 +71,26 @@ local_css()
 # ----------------------------
 @st.cache_resource
 def load_nlp_and_matcher(skill_map):
-    try:
-        nlp = spacy.load("en_core_web_sm")
-    except Exception:
-        from spacy.cli import download
-        download("en_core_web_sm")
-        nlp = spacy.load("en_core_web_sm")
-    matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-    patterns = []
-    for canonical, aliases in skill_map.items():
-        for alias in aliases:
-            patterns.append(nlp.make_doc(alias))
-        matcher.add(canonical, patterns)
-        patterns = []
-    return nlp, matcher
+    return build_nlp_and_matcher(skill_map)
 
-# ----------------------------
-# Skill lists + alias mapping (add synonyms/abbrev here)
-# ----------------------------
-# Map canonical -> list of alias strings (lowercased)
-SKILL_ALIASES = {
-    # technical
-    "python": ["python", "py"],
-    "java": ["java"],
-    "c++": ["c++", "cpp"],
-    "sql": ["sql", "structured query language", "postgres", "postgresql", "mysql"],
-    "html": ["html", "html5"],
-    "css": ["css", "cascading style sheets"],
-    "javascript": ["javascript", "js", "node js", "node.js"],
-    "react": ["react", "reactjs", "react.js"],
-    "node.js": ["node.js", "node", "nodejs"],
-    "tensorflow": ["tensorflow", "tf"],
-    "pytorch": ["pytorch", "torch"],
-    "machine learning": ["machine learning", "ml"],
-    "data analysis": ["data analysis", "data analytics", "analytics"],
-    "data visualization": ["data visualization", "dataviz", "visualization"],
-    "aws": ["aws", "amazon web services"],
-    "azure": ["azure", "microsoft azure"],
-    "gcp": ["gcp", "google cloud", "google cloud platform"],
-    "power bi": ["power bi", "powerbi"],
-    "tableau": ["tableau"],
-    "django": ["django"],
-    "flask": ["flask"],
-    "scikit-learn": ["scikit-learn", "scikitlearn", "sklearn"],
-    "nlp": ["nlp", "natural language processing"],
-    # soft skills
-    "communication": ["communication", "communicate"],
-    "leadership": ["leadership", "lead"],
-    "teamwork": ["teamwork", "team work", "team-player"],
-    "problem solving": ["problem solving", "problem-solving", "problem solving skills"],
-    "time management": ["time management", "time-management"],
-    "adaptability": ["adaptability", "adaptable"],
-    "critical thinking": ["critical thinking", "critical-thinking"],
-    "creativity": ["creativity", "creative"],
-    "collaboration": ["collaboration", "collaborate"],
-    "decision making": ["decision making", "decision-making"]
-}
-
-# Prepare lists for UI (technical vs soft canonical)
-TECH_CANONICAL = [
-    "python","java","c++","sql","html","css","javascript","react","node.js",
-    "tensorflow","pytorch","machine learning","data analysis","data visualization",
-    "aws","azure","gcp","power bi","tableau","django","flask","scikit-learn","nlp"
-]
-SOFT_CANONICAL = [
-    "communication","leadership","teamwork","problem solving","time management",
-    "adaptability","critical thinking","creativity","collaboration","decision making"
-]
-
-nlp, matcher = load_nlp_and_matcher(SKILL_ALIASES)
+@st.cache_resource
+def load_model_client():
+    return model_client_from_env()
+
+# SKILLGAPAI_MODEL_SOCKET set: matching runs in the shared model server instead of loading spaCy here
+model_client = load_model_client()
+
+def skill_hits(text, sections):
+    if not text:
+        return []
+    if model_client is not None:
+        return model_client.section_skill_hits(text, sections)
+    nlp, matcher = load_nlp_and_matcher(SKILL_ALIASES)
+    return section_skill_hits(nlp, matcher, text, sections, SKILL_ALIASES)
 
 # ----------------------------
 # Helper functions
 # ----------------------------
-def extract_text_from_pdf(uploaded_file):
-    if PyPDF2 is None:
-        return ""
-    reader = PyPDF2.PdfReader(uploaded_file)
-    pages = []
-    for page in reader.pages:
-        try:
-            pages.append(page.extract_text())
-        except Exception:
-            pages.append("")
-    return "\n".join([p for p in pages if p])
-
-def clean_text(text):
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
-
-def phrase_match_skills(text):
-    doc = nlp(text)
-    matches = matcher(doc)
-    found = set()
-    for match_id, start, end in matches:
-        label = nlp.vocab.strings[match_id]  # canonical name used when adding
-        found.add(label)
-    # also fallback substring search for things missing
-    lc = text.lower()
-    for canonical, aliases in SKILL_ALIASES.items():
-        for alias in aliases:
-            if alias.lower() in lc:
-                found.add(canonical)
-                break
-    return sorted(found)
-
-def categorize_skills(skills):
-    tech = [s.title() for s in skills if s in TECH_CANONICAL]
-    soft = [s.title() for s in skills if s in SOFT_CANONICAL]
-    # unknown go into technical by default (safe)
-    others = [s for s in skills if s not in TECH_CANONICAL + SOFT_CANONICAL]
-    tech += [s.title() for s in others]
-    # unique & sorted
-    return sorted(set(tech)), sorted(set(soft))
-
-def confidences_for(skills):
-    # synthetic confidence: longer-known skills get higher score, just for UI
-    if not skills:
-        return {}
-    base = 96
-    step = 10 / max(len(skills)-1, 1)
-    conf = {}
-    for i, s in enumerate(sorted(skills, key=str.lower)):
-        conf[s] = max(70, round(base - i*step))
-    return conf
-
 def highlight_text_html(text, skills):
     if not text:
         return ""
@@ -202,79 +105,51 @@ def highlight_text_html(text, skills):
     highlighted = highlighted.replace("\n", "<br>")
     return highlighted
 
-def create_csv_bytes(resume_skills, jd_skills, missing, extra):
-    df = pd.DataFrame({
-        "Resume Skills": list(resume_skills) + [""] * max(0, len(jd_skills)-len(resume_skills)),
-        "Job Description Skills": list(jd_skills) + [""] * max(0, len(resume_skills)-len(jd_skills))
-    })
-    summary = {
-        "overlap": list(sorted(set(resume_skills) & set(jd_skills))),
-        "missing_in_resume": list(missing),
-        "extra_in_resume": list(extra),
-        "generated_at": datetime.now().isoformat()
-    }
-    csv_buf = StringIO()
-    df.to_csv(csv_buf, index=False)
-    return csv_buf.getvalue(), summary
-
-def create_json_bytes(resume_skills, jd_skills, missing, extra):
-    payload = {
-        "resume_skills": list(resume_skills),
-        "jd_skills": list(jd_skills),
-        "missing_in_resume": list(missing),
-        "extra_in_resume": list(extra),
-        "generated_at": datetime.now().isoformat()
-    }
-    return json.dumps(payload, indent=2)
-
-def create_pdf_report(resume_text, jd_text, resume_skills, jd_skills, missing, extra, filename="skillgap_report.pdf"):
-    # create a simple PDF using reportlab
-    bio = BytesIO()
-    c = canvas.Canvas(bio, pagesize=letter)
-    width, height = letter
-    margin = 40
-    y = height - margin
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(margin, y, "SkillGapAI - Analysis Report")
-    c.setFont("Helvetica", 10)
-    y -= 22
-    c.drawString(margin, y, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    y -= 18
-
-    def write_block(title, lines, font_size=10):
-        nonlocal y
-        if y < 120:
-            c.showPage()
-            y = height - margin
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(margin, y, title)
-        y -= 14
-        c.setFont("Helvetica", font_size)
-        for line in lines:
-            if y < 80:
-                c.showPage()
-                y = height - margin
-            # wrap if necessary (very naive)
-            if len(line) > 95:
-                parts = [line[i:i+95] for i in range(0, len(line), 95)]
-                for p in parts:
-                    c.drawString(margin+6, y, p)
-                    y -= 12
-            else:
-                c.drawString(margin+6, y, line)
-                y -= 12
-        y -= 6
-
-    write_block("Resume (excerpt)", [l.strip() for l in resume_text.splitlines()[:8] if l.strip()])
-    write_block("Job Description (excerpt)", [l.strip() for l in jd_text.splitlines()[:8] if l.strip()])
-    write_block("Resume Skills (detected)", resume_skills or ["None"])
-    write_block("Job Description Skills (detected)", jd_skills or ["None"])
-    write_block("Missing in Resume (from JD)", missing or ["None"])
-    write_block("Extra in Resume", extra or ["None"])
-
-    c.save()
-    bio.seek(0)
-    return bio.read()
+# ----------------------------
+# Session result store (compact, LRU-bounded)
+# ----------------------------
+@st.cache_resource
+def load_result_store():
+    return SessionResultStore()
+
+result_store = load_result_store()
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex[:12]
+session_id = st.session_state["session_id"]
+
+def pdf_upload_text(uploaded, label):
+    """Text of an uploaded PDF, reporting timeouts and unreadable pages instead of hiding them"""
+    if uploaded.size > MAX_UPLOAD_BYTES:
+        st.error(f"{label} PDF is {uploaded.size / (1024 * 1024):.1f} MB; the limit is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.")
+        return None
+    # extracted once per file and session: reruns read the compressed text back from the store
+    key = ("pdf", content_hash(uploaded.getvalue()))
+    stored = result_store.get(session_id, key)
+    if stored is None:
+        try:
+            result = extract_text_from_pdf(uploaded, max_pages=MAX_PDF_PAGES)
+        except Exception as e:
+            st.error(f"Failed to extract {label} PDF text: {e}")
+            return None
+        notes = []
+        if result.total_pages > len(result.pages):
+            notes.append(("warning", f"{label} PDF has {result.total_pages} pages; only the first {len(result.pages)} were read."))
+        if result.timed_out:
+            notes.append(("warning", f"{label} PDF hit the extraction time limit; using the {len(result.pages) - len(result.unreadable)} pages read so far."))
+        elif result.unreadable:
+            pages = ", ".join(str(i + 1) for i in result.unreadable)
+            notes.append(("warning", f"Could not read page(s) {pages} of the {label} PDF (scanned or image-only?)."))
+        if result.text.strip():
+            backends = ", ".join(sorted(set(b for b in result.backends if b)))
+            notes.append(("success", f"Extracted text from {label} PDF ({backends})."))
+        else:
+            notes.append(("warning", f"{label} PDF uploaded but no text could be extracted. Try a .txt file."))
+        stored = (result.text, tuple(notes))
+        result_store.put_text(session_id, key, *stored)
+    text, notes = stored
+    for level, message in notes:
+        getattr(st, level)(message)
+    return text if text.strip() else None
 
 # ----------------------------
 # Inputs: Paste or Upload
@@ -287,47 +162,60 @@ with st.expander("Input: Paste Resume & Job Description or Upload Files", expand
         resume_text = st.text_area("Paste Resume content here", value="", height=220)
         uploaded_resume = st.file_uploader("Or upload resume (.txt or .pdf)", type=['txt','pdf'], key="resume_upload")
         if uploaded_resume is not None:
-            if uploaded_resume.type == "application/pdf" and PyPDF2 is not None:
-                try:
-                    extracted = extract_text_from_pdf(uploaded_resume)
-                    if extracted.strip():
-                        resume_text = extracted
-                        st.success("Extracted text from PDF (basic).")
-                    else:
-                        st.warning("PDF uploaded but could not extract text. Try a .txt file.")
-                except Exception:
-                    st.error("Failed to extract PDF text. Ensure PyPDF2 is installed.")
+            if uploaded_resume.type == "application/pdf":
+                resume_text = pdf_upload_text(uploaded_resume, "Resume") or resume_text
             elif uploaded_resume.type.startswith("text"):
-                resume_text = uploaded_resume.getvalue().decode('utf-8', errors='ignore')
+                try:
+                    ingested = read_upload(uploaded_resume)
+                except Exception as e:
+                    st.warning(f"Could not read the Resume file: {e}")
+                else:
+                    resume_text = ingested.text
+                    if ingested.truncated:
+                        st.warning(truncation_message("Resume file", ingested))
     with col2:
         st.subheader("Job Description Text")
         jd_text = st.text_area("Paste Job Description content here", value="", height=220)
         uploaded_jd = st.file_uploader("Or upload JD (.txt or .pdf)", type=['txt','pdf'], key="jd_upload")
         if uploaded_jd is not None:
-            if uploaded_jd.type == "application/pdf" and PyPDF2 is not None:
-                try:
-                    extracted_jd = extract_text_from_pdf(uploaded_jd)
-                    if extracted_jd.strip():
-                        jd_text = extracted_jd
-                        st.success("Extracted text from JD PDF (basic).")
-                except Exception:
-                    st.error("Failed to extract JD PDF text.")
+            if uploaded_jd.type == "application/pdf":
+                jd_text = pdf_upload_text(uploaded_jd, "JD") or jd_text
             elif uploaded_jd.type.startswith("text"):
-                jd_text = uploaded_jd.getvalue().decode('utf-8', errors='ignore')
+                try:
+                    ingested = read_upload(uploaded_jd)
+                except Exception as e:
+                    st.warning(f"Could not read the JD file: {e}")
+                else:
+                    jd_text = ingested.text
+                    if ingested.truncated:
+                        st.warning(truncation_message("JD file", ingested))
 
 # If no text at all, show info
 if not resume_text and not jd_text:
     st.info("Paste or upload a resume or job description to begin skill extraction.")
     st.stop()
 
+# Guarded ingestion: oversized inputs keep their first part plus the Skills section
+resume_ingest, jd_ingest = limit_text(resume_text), limit_text(jd_text)
+resume_text, jd_text = resume_ingest.text, jd_ingest.text
+for label, ingested in (("Resume", resume_ingest), ("Job description", jd_ingest)):
+    if ingested.truncated:
+        st.warning(truncation_message(label, ingested))
+
 # ----------------------------
 # Skill extraction using PhraseMatcher + alias mapping
 # ----------------------------
-resume_text_clean = clean_text(resume_text or "")
-jd_text_clean = clean_text(jd_text or "")
-
-resume_matches = phrase_match_skills(resume_text_clean) if resume_text_clean else []
-jd_matches = phrase_match_skills(jd_text_clean) if jd_text_clean else []
+# resumes: match only inside relevant sections (skills, experience, projects...)
+section_aware = st.checkbox("Section-aware resume matching", value=True,
+                            help="Skip publications, references and hobbies; weight mentions by section")
+resume_text_clean, resume_sections = document_sections(resume_text, section_aware)
+jd_text_clean, jd_sections = document_sections(jd_text, section_aware=False)
+
+# every mention with its offsets and section, for the confidence model below
+resume_hits = skill_hits(resume_text_clean, resume_sections)
+jd_hits = skill_hits(jd_text_clean, jd_sections)
+resume_matches = sorted(set(h.skill for h in resume_hits))
+jd_matches = sorted(set(h.skill for h in jd_hits))
 
 tech_resume, soft_resume = categorize_skills(resume_matches)
 tech_jd, soft_jd = categorize_skills(jd_matches)
@@ -339,9 +227,35 @@ common_skills = sorted(resume_skills_set & jd_skills_set)
 missing_in_resume = sorted(jd_skills_set - resume_skills_set)
 extra_in_resume = sorted(resume_skills_set - jd_skills_set)
 
-# synthetic confidences
-conf_resume = confidences_for(list(resume_skills_set))
-conf_jd = confidences_for(list(jd_skills_set))
+# Session and persistent analysis history (only once both documents are present)
+MODEL_VERSION = f"phrase-matcher|{'sections' if section_aware else 'full-text'}"
+
+@st.cache_resource
+def load_analysis_store():
+    return AnalysisStore()
+
+if resume_text_clean and jd_text_clean:
+    analysis_key = (content_hash(resume_text_clean), content_hash(jd_text_clean), MODEL_VERSION)
+    if not result_store.has(session_id, analysis_key):
+        result_store.put(session_id, analysis_key, CompactResult.from_skill_sets(
+            result_store.vocab, sorted(resume_skills_set), sorted(jd_skills_set)
+        ))
+    # a pair analysed before (by any session) is already stored; only new pairs are written
+    analysis_store = load_analysis_store()
+    if not analysis_store.has(*analysis_key):
+        analysis_store.put(record_from_skill_sets(
+            uploaded_resume.name if uploaded_resume is not None else candidate_label(analysis_key[0], "Pasted resume"),
+            *analysis_key, sorted(resume_skills_set), sorted(jd_skills_set), app="milestone2"
+        ))
+
+# evidence-based confidences: mention count, section, nearby "N years", alias specificity
+conf_resume, conf_jd = (
+    {s.title(): c for s, c in conf.items()}
+    for conf in batch_confidences([resume_text_clean, jd_text_clean], [resume_hits, jd_hits])
+)
+
+# years of experience / last used, attached to the same hits
+resume_experience = skill_experience(resume_text_clean, resume_hits)
 
 # ----------------------------
 # UI: top summary & chart options
@@ -380,6 +294,17 @@ with colB:
         ax.bar(labels, sizes, color=colors)
         ax.set_ylabel("Count")
     st.pyplot(fig, use_container_width=True)
+    plt.close(fig)
+
+if section_aware and resume_sections:
+    with st.expander("Resume sections", expanded=False):
+        st.dataframe(pd.DataFrame({
+            "Section": [sec.name for sec in resume_sections],
+            "Characters": [sec.end - sec.start for sec in resume_sections],
+            "Weight": [SECTION_WEIGHTS.get(sec.name, 0.0) for sec in resume_sections],
+            "Skills": [", ".join(sorted(set(h.skill for h in resume_hits if h.section == sec.name and sec.start <= h.start < sec.end)))
+                       for sec in resume_sections],
+        }), use_container_width=True, hide_index=True)
 
 # ----------------------------
 # Highlighted text and download
@@ -404,7 +329,11 @@ with left_col:
         for s in sorted(resume_matches, key=str.lower):
             score = conf_resume.get(s.title(), 82)
             is_tech = s in TECH_CANONICAL
-            st.markdown(f"**{s.title()}** — {'Technical' if is_tech else 'Soft'} • {score}%")
+            exp = resume_experience.get(s)
+            exp_note = ""
+            if exp:
+                exp_note = f" • {exp.years:g} yrs" + (f" (last used {exp.last_year})" if exp.last_year else "")
+            st.markdown(f"**{s.title()}** — {'Technical' if is_tech else 'Soft'} • {score}%{exp_note}")
             st.progress(int(score))
     else:
         st.info("No detected skills to display progress bars.")
@@ -441,13 +370,19 @@ with col3:
 with st.expander("Show JSON summary", expanded=False):
     st.json(json.loads(json_str))
 
+# ----------------------------
+# Session history; memory view with ?admin=<SKILLGAPAI_ADMIN_TOKEN>
+# ----------------------------
+session_panel(result_store, session_id, st.query_params.get("admin"))
+
 # ----------------------------
 # Footer & tweak options
 # ----------------------------
 st.markdown("---")
 st.caption(f"App Version: 1.0.1 • Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-st.info("Notes: Skill matching uses a PhraseMatcher + alias dictionary. For improved detection you can add more aliases to SKILL_ALIASES at the top of the script.")
+st.info("Notes: Skill matching uses a PhraseMatcher + alias dictionary. For improved detection you can add more aliases to SKILL_ALIASES in skillgapai_core.py.")
 
 # End of file
 
-
+if st.query_params.get("debug") == "1":
+    debug_panel(tracer)
@@ -5,13 +5,25 @@
 # ==========================================
 
 import streamlit as st
+import uuid
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
 from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 from datetime import datetime
 
+from skillgapai_classify import classify_similarity, group_by_category, apply_proficiency, load_thresholds
+from skillgapai_classify import overall_score as overall_score_for
+from skillgapai_charts import ChartService, sweet_radar_figure, heatmap_figure, heatmap_vega_spec
+from skillgapai_experience import labeled_skill_experience, years_for
+from skillgapai_learning_path import LearningPathPlanner
+from skillgapai_model_server import model_client_from_env
+from skillgapai_normalize import SkillNormalizer, display_name, normalized_labels
+from skillgapai_pipeline import content_hash
+from skillgapai_results_db import AnalysisStore, candidate_label, classification_from_record, record_from_classification, records_to_json
+from skillgapai_session_store import SessionResultStore, CompactResult, session_panel
+from skillgapai_charts import MAX_SIDE, heatmap_view, drill_down, column_drill_down, heatmap_figsize
+from skillgapai_tracing import debug_panel, metrics_server_from_env, start_trace, span
+
 # ------------------------------------------
 # PAGE CONFIG
 # ------------------------------------------
@@ -21,6 +33,12 @@ st.set_page_config(
     layout="wide"
 )
 
+# ------------------------------------------
+# TRACING (?debug=1 for the stage waterfall, &profile=cprofile|pyinstrument)
+# ------------------------------------------
+metrics_server_from_env()
+tracer = start_trace("milestone3", profile=st.query_params.get("profile"))
+
 # ------------------------------------------
 # CUSTOM CSS (SKY BLUE THEME)
 # ------------------------------------------
@@ -70,12 +88,33 @@ job description skills using Sentence-BERT embeddings and cosine similarity.
 # ------------------------------------------
 # LOAD MODEL
 # ------------------------------------------
+MODEL_VERSION = "all-MiniLM-L6-v2"
+
 @st.cache_resource
 def load_model():
-    return SentenceTransformer("all-MiniLM-L6-v2")
+    # SKILLGAPAI_MODEL_SOCKET set: share one model-server process across workers
+    return model_client_from_env() or SentenceTransformer(MODEL_VERSION)
 
 model = load_model()
 
+@st.cache_resource
+def load_normalizer():
+    return SkillNormalizer(model, model_name="all-MiniLM-L6-v2")
+
+normalizer = load_normalizer()
+
+# ------------------------------------------
+# SESSION RESULT STORE (COMPACT, LRU-BOUNDED)
+# ------------------------------------------
+@st.cache_resource
+def load_result_store():
+    return SessionResultStore()
+
+result_store = load_result_store()
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex[:12]
+session_id = st.session_state["session_id"]
+
 # ------------------------------------------
 # INPUT SECTION
 # ------------------------------------------
@@ -100,30 +139,97 @@ if not resume_skills or not jd_skills:
     st.stop()
 
 # ------------------------------------------
-# EMBEDDINGS & SIMILARITY
+# TAXONOMY NORMALIZATION
 # ------------------------------------------
-resume_emb = model.encode(resume_skills)
-jd_emb = model.encode(jd_skills)
-sim_matrix = cosine_similarity(resume_emb, jd_emb)
+if st.checkbox("Normalize skills to taxonomy", value=True,
+               help="Map free-text phrases (e.g. 'ML', 'Neural Networks') to canonical skills"):
+    resume_norm = normalizer.normalize(resume_skills)
+    jd_norm = normalizer.normalize(jd_skills)
+    resume_skills, jd_skills = normalized_labels(resume_norm), normalized_labels(jd_norm)
+
+    with st.expander("🔁 Normalization mapping"):
+        st.dataframe(pd.DataFrame(
+            [(e.phrase, e.label, e.method, round(e.score, 2)) for e in resume_norm + jd_norm],
+            columns=["Phrase", "Canonical", "Method", "Score"]
+        ), use_container_width=True)
+
+# calibrated per encoder by skillgapai_calibrate.py; these are the uncalibrated defaults
+THRESHOLDS = load_thresholds(MODEL_VERSION, {"Partial": 0.50, "Matched": 0.75})
+SCORE_WEIGHTS = {"Matched": 1.0, "Partial": 0.0}
 
 # ------------------------------------------
-# SKILL GAP LOGIC
+# PROFICIENCY (YEARS OF EXPERIENCE)
 # ------------------------------------------
-MATCH_T = 0.75
-PARTIAL_T = 0.50
+with st.expander("📅 Experience evidence (optional)"):
+    st.caption("Paste the resume / JD text to weigh years of experience: a Matched skill "
+               "becomes Partial when the resume shows fewer years than the JD asks for.")
+    e1, e2 = st.columns(2)
+    resume_exp_text = e1.text_area("Resume text", height=120, key="resume_exp_text")
+    jd_exp_text = e2.text_area("Job description text", height=120, key="jd_exp_text")
 
-matched, partial, missing = [], [], []
+# ------------------------------------------
+# PERSISTENT ANALYSIS HISTORY
+# A pair analysed before (by any session) is served from the store.
+# Stored labels depend on the thresholds, so they are part of the model key.
+# ------------------------------------------
+@st.cache_resource
+def load_analysis_store():
+    return AnalysisStore()
 
-for j, skill in enumerate(jd_skills):
-    score = sim_matrix[:, j].max()
-    if score >= MATCH_T:
-        matched.append((skill, score))
-    elif score >= PARTIAL_T:
-        partial.append((skill, score))
-    else:
-        missing.append((skill, score))
+analysis_store = load_analysis_store()
+analysis_key = (
+    content_hash((resume_skills, resume_exp_text)), content_hash((jd_skills, jd_exp_text)),
+    f"{MODEL_VERSION}|{THRESHOLDS['Partial']:g}-{THRESHOLDS['Matched']:g}",
+)
+stored_record = analysis_store.get(*analysis_key)
 
-overall_score = int((len(matched) / len(jd_skills)) * 100)
+# ------------------------------------------
+# EMBEDDINGS, SIMILARITY & SKILL GAP LOGIC
+# Reruns with the same skills (widget changes) read the compact
+# result back from the session store instead of re-encoding.
+# ------------------------------------------
+result_key = content_hash((resume_skills, jd_skills, THRESHOLDS, MODEL_VERSION))
+stored = result_store.get(session_id, result_key)
+if stored is None:
+    # phrase embeddings are cached in the normalizer, so repeated skills are encoded once
+    resume_emb = normalizer.embed(resume_skills)
+    jd_emb = normalizer.embed(jd_skills)
+    with span("cosine_similarity"):
+        sim_matrix = cosine_similarity(resume_emb, jd_emb)
+    classification = classify_similarity(sim_matrix, THRESHOLDS)
+    result_store.put(session_id, result_key, CompactResult.from_classification(
+        result_store.vocab, resume_skills, jd_skills, classification,
+        overall_score_for(classification, SCORE_WEIGHTS), sim_matrix
+    ))
+else:
+    sim_matrix, classification = stored.similarity, stored.classification
+
+if stored_record is not None:
+    # the stored labels already include the proficiency adjustment
+    classification = classification_from_record(stored_record)[1]
+elif resume_exp_text and jd_exp_text:
+    resume_exp = labeled_skill_experience(resume_exp_text, resume_skills)
+    jd_exp = labeled_skill_experience(jd_exp_text, jd_skills)
+    resume_years, required_years = years_for(resume_skills, resume_exp), years_for(jd_skills, jd_exp)
+    weighted = apply_proficiency(classification, sim_matrix, resume_years, required_years)
+    demoted = int((weighted["label"] != classification["label"]).sum())
+    classification = weighted
+    if demoted:
+        st.caption(f"{demoted} skill(s) moved from Matched to Partial for insufficient years of experience")
+groups = group_by_category(classification, jd_skills)
+matched, partial, missing = groups["Matched"], groups["Partial"], groups["Missing"]
+
+overall_score = overall_score_for(classification, SCORE_WEIGHTS)
+
+if stored_record is None:
+    analysis_record = record_from_classification(
+        candidate_label(analysis_key[0], "Resume skills"), *analysis_key, resume_skills, jd_skills,
+        classification, overall_score, app="milestone3"
+    )
+    analysis_store.put(analysis_record)
+else:
+    analysis_record = stored_record
+    st.caption("Served from the analysis store")
 
 # ------------------------------------------
 # SUMMARY METRICS
@@ -160,43 +266,13 @@ with z:
         st.markdown(f"<span class='tag missing'>{s}</span>", unsafe_allow_html=True)
 
 # ------------------------------------------
-# SWEET RADAR CHART (COMPACT)
+# CHART SERVICE (MEMOIZED, FIGURES CLOSED AFTER RENDER)
 # ------------------------------------------
-def plot_sweet_radar(skills, scores):
-    scores = scores + scores[:1]
-    angles = np.linspace(0, 2*np.pi, len(skills), endpoint=False).tolist()
-    angles += angles[:1]
-
-    fig = plt.figure(figsize=(4.8, 4.8))
-    ax = plt.subplot(111, polar=True)
-
-    fig.patch.set_facecolor("#0f172a")
-    ax.set_facecolor("#020617")
-    ax.grid(color="#38bdf8", linestyle="dotted", linewidth=1, alpha=0.6)
+@st.cache_resource
+def load_chart_service():
+    return ChartService()
 
-    ax.set_thetagrids(np.degrees(angles[:-1]), skills, fontsize=9, color="#e0f2fe")
-    ax.set_yticks([0.25, 0.5, 0.75, 1.0])
-    ax.set_yticklabels(["0.25","0.5","0.75","1.0"], color="#93c5fd", fontsize=8)
-    ax.set_ylim(0, 1)
-
-    ax.plot(
-        angles, scores,
-        linewidth=2.5,
-        color="#22d3ee",
-        marker="o",
-        markersize=6,
-        markerfacecolor="#facc15"
-    )
-    ax.fill(angles, scores, color="#38bdf8", alpha=0.35)
-
-    ax.set_title(
-        "Skill Match Radar",
-        size=12,
-        color="#e0f2fe",
-        pad=15,
-        fontweight="bold"
-    )
-    return fig
+charts = load_chart_service()
 
 # ------------------------------------------
 # VISUAL DISTRIBUTION (SIDE BY SIDE)
@@ -207,33 +283,68 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.markdown("#### 🕸️ Radar View")
-    radar_scores = [sim_matrix[:, j].max() for j in range(len(jd_skills))]
-    st.pyplot(plot_sweet_radar(jd_skills, radar_scores))
+    radar_scores = classification["score"].tolist()
+    st.image(charts.render(sweet_radar_figure, jd_skills, radar_scores), use_container_width=True)
 
 with col2:
     st.markdown("#### 🔥 Heatmap View")
-
-    fig, ax = plt.subplots(figsize=(5.5, 3))
-    im = ax.imshow(sim_matrix, cmap="viridis")
-
-    ax.set_xticks(range(len(jd_skills)))
-    ax.set_xticklabels(jd_skills, rotation=30, ha="right", fontsize=9)
-    ax.set_yticks(range(len(resume_skills)))
-    ax.set_yticklabels(resume_skills, fontsize=9)
-
-    fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
-    plt.tight_layout()
-    st.pyplot(fig)
+    renderer = st.radio("Heatmap renderer", ["Server (PNG)", "Browser (Vega-Lite)"],
+                        horizontal=True, label_visibility="collapsed")
+
+    heat, heat_rows, heat_cols = sim_matrix, resume_skills, jd_skills
+    if max(sim_matrix.shape) > MAX_SIDE:
+        # large matrices: bounded top-k or tiled overview with drill-down
+        h1, h2 = st.columns(2)
+        heat_mode = h1.selectbox("Heatmap mode", ["Top-k", "Tiles"])
+        heat_order = h2.selectbox("Ordering", ["max", "cluster"])
+        view = heatmap_view(sim_matrix, resume_skills, jd_skills,
+                            mode="tiles" if heat_mode == "Tiles" else "top_k", order=heat_order)
+        if view.tiled:
+            d1, d2 = st.columns(2)
+            row_tile = d1.selectbox("Drill into resume tile", ["Overview"] + view.row_labels)
+            col_tile = d2.selectbox("Drill into JD tile", ["Overview"] + view.col_labels)
+            if row_tile != "Overview" and col_tile != "Overview":
+                view, *_ = drill_down(sim_matrix, resume_skills, jd_skills, view,
+                                      view.row_labels.index(row_tile), view.col_labels.index(col_tile),
+                                      order=heat_order)
+        else:
+            focus = st.selectbox("Drill into JD skill", ["—"] + jd_skills)
+            if focus != "—":
+                st.dataframe(pd.DataFrame(
+                    column_drill_down(sim_matrix, resume_skills, jd_skills.index(focus)),
+                    columns=["Resume Skill", "Similarity"]
+                ), use_container_width=True)
+        heat, heat_rows, heat_cols = view.matrix, view.row_labels, view.col_labels
+        st.caption(f"Showing {heat.shape[0]}×{heat.shape[1]} of {sim_matrix.shape[0]}×{sim_matrix.shape[1]} cells")
+
+    if renderer == "Server (PNG)":
+        st.image(charts.render(heatmap_figure, heat, heat_rows, heat_cols,
+                               figsize=heatmap_figsize(*heat.shape)), use_container_width=True)
+    else:
+        st.vega_lite_chart(heatmap_vega_spec(heat, heat_rows, heat_cols), use_container_width=True)
 
 # ------------------------------------------
 # PRIORITY RANKING
 # ------------------------------------------
 st.subheader("🎯 Missing Skill Priority")
 
+@st.cache_resource
+def load_planner():
+    return LearningPathPlanner()
+
 if missing:
-    ranked = sorted(missing, key=lambda x: x[1])
-    for i, (s, sc) in enumerate(ranked, 1):
-        st.write(f"{i}. **{s}** (Similarity: {sc:.2f})")
+    # learning path: prerequisites first, cheapest reachable skill next
+    known = resume_skills + [s for s, _ in matched + partial]
+    labels = {s.lower(): s for s, _ in missing}
+    similarity = {s.lower(): sc for s, sc in missing}
+    plan = load_planner().plan([s for s, _ in missing], known)
+    for i, step in enumerate(plan, 1):
+        name = labels.get(step.skill, display_name(step.skill))
+        unlocks = ", ".join(labels.get(u, display_name(u)) for u in step.unlocks)
+        if step.prerequisite:
+            st.write(f"{i}. **{name}** (prerequisite for {unlocks})")
+        else:
+            st.write(f"{i}. **{name}** (Similarity: {similarity[step.skill]:.2f})" + (f" → unlocks {unlocks}" if unlocks else ""))
 else:
     st.success("No critical skill gaps detected!")
 
@@ -254,6 +365,17 @@ st.download_button(
     file_name="skillgap_milestone3_report.csv",
     mime="text/csv"
 )
+st.download_button(
+    "⬇️ Download Analysis (JSON for Milestone 4)",
+    records_to_json([analysis_record]),
+    file_name="skillgap_milestone3_analysis.json",
+    mime="application/json"
+)
+
+# ------------------------------------------
+# SESSION HISTORY (MEMORY VIEW WITH ?admin=<SKILLGAPAI_ADMIN_TOKEN>)
+# ------------------------------------------
+session_panel(result_store, session_id, st.query_params.get("admin"))
 
 # ------------------------------------------
 # FOOTER
@@ -263,3 +385,5 @@ st.caption(
     f"Milestone 3 • Sentence-BERT • Cosine Similarity • Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
 )
 
+if st.query_params.get("debug") == "1":
+    debug_panel(tracer)
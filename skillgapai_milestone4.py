@@ -4,9 +4,22 @@
 # ==========================================
 
 import streamlit as st
+import os
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from sentence_transformers import SentenceTransformer
+
+from skillgapai_core import DATA_DIR, SKILL_ALIASES, load_nlp_and_matcher
+from skillgapai_corpus import SkillDemandCorpus, count_skill_mentions
+from skillgapai_ingest import ingest_upload, truncation_message
+from skillgapai_model_server import model_client_from_env
+from skillgapai_pipeline import content_hash
+from skillgapai_recommend import ResourceCatalog
+from skillgapai_results_db import (
+    AnalysisStore, read_results, latest_per_candidate, skill_status_shares, majority_status, gap_matrix,
+)
+from skillgapai_tracing import debug_panel, metrics_server_from_env, start_trace
 
 # ------------------------------------------
 # PAGE CONFIG
@@ -17,6 +30,12 @@ st.set_page_config(
     layout="wide"
 )
 
+# ------------------------------------------
+# TRACING (?debug=1 for the stage waterfall, &profile=cprofile|pyinstrument)
+# ------------------------------------------
+metrics_server_from_env()
+tracer = start_trace("milestone4", profile=st.query_params.get("profile"))
+
 # ------------------------------------------
 # CUSTOM CSS
 # ------------------------------------------
@@ -67,29 +86,70 @@ recommendations based on earlier milestones.
 # ------------------------------------------
 st.subheader("📥 Skill Gap Summary Input")
 
-col1, col2, col3 = st.columns(3)
+@st.cache_resource
+def load_analysis_store():
+    return AnalysisStore()
 
-with col1:
-    matched_skills = st.text_area(
-        "✅ Matched Skills",
-        "Python, SQL, Data Analysis"
-    )
+@st.cache_data(ttl=30)
+def stored_skill_rows():
+    return load_analysis_store().skill_rows()
 
-with col2:
-    partial_skills = st.text_area(
-        "⚠️ Partially Matched Skills",
-        "Data Visualization"
-    )
+source = st.radio(
+    "Source",
+    ["Stored analyses", "Upload results (JSON / Arrow / Parquet)", "Enter manually"],
+    horizontal=True
+)
+
+results = None
+if source == "Stored analyses":
+    results = stored_skill_rows()
+    if results.empty:
+        st.info("No stored analyses yet – run Milestone 2/3 or the integrated app first, or enter skills manually.")
+        results = None
+elif source.startswith("Upload"):
+    results_file = st.file_uploader("Analysis results", type=["json", "arrow", "feather", "parquet"])
+    if results_file is not None:
+        try:
+            results = read_results(results_file.name, results_file.getvalue())
+        except Exception as e:
+            st.error(f"Could not read results: {e}")
 
-with col3:
-    missing_skills = st.text_area(
-        "❌ Missing Skills",
-        "Machine Learning, Deep Learning, Statistics"
+team_view = False
+if results is not None:
+    results = latest_per_candidate(results)
+    candidates = sorted(results["candidate"].unique())
+    choice = st.selectbox(
+        f"Candidate ({len(candidates)} with results)",
+        ["All candidates (aggregate)"] + candidates
     )
+    team_view = choice.startswith("All candidates")
+    view = results if team_view else results[results["candidate"] == choice]
+    shares = skill_status_shares(view)
+    matched, partial, missing = majority_status(shares)
+else:
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        matched_skills = st.text_area(
+            "✅ Matched Skills",
+            "Python, SQL, Data Analysis"
+        )
+
+    with col2:
+        partial_skills = st.text_area(
+            "⚠️ Partially Matched Skills",
+            "Data Visualization"
+        )
 
-matched = [s.strip() for s in matched_skills.split(",") if s.strip()]
-partial = [s.strip() for s in partial_skills.split(",") if s.strip()]
-missing = [s.strip() for s in missing_skills.split(",") if s.strip()]
+    with col3:
+        missing_skills = st.text_area(
+            "❌ Missing Skills",
+            "Machine Learning, Deep Learning, Statistics"
+        )
+
+    matched = [s.strip() for s in matched_skills.split(",") if s.strip()]
+    partial = [s.strip() for s in partial_skills.split(",") if s.strip()]
+    missing = [s.strip() for s in missing_skills.split(",") if s.strip()]
 
 total_skills = len(matched) + len(partial) + len(missing)
 match_percentage = int((len(matched) / total_skills) * 100) if total_skills else 0
@@ -130,22 +190,132 @@ with colC:
     for s in missing:
         st.markdown(f"<span class='tag bad'>{s}</span>", unsafe_allow_html=True)
 
+# ------------------------------------------
+# TEAM-WIDE GAP VIEW (AGGREGATED RESULTS)
+# ------------------------------------------
+if team_view:
+    st.subheader("👥 Team-Wide Skill Gaps")
+    st.caption(f"{results['analysis_id'].nunique()} analyses • {len(candidates)} candidates • "
+               "skills grouped by their most common status")
+
+    t1, t2 = st.columns([2, 3])
+    with t1:
+        st.markdown("#### ❌ Most Missing Skills")
+        st.bar_chart(shares.head(15).set_index("skill")["Missing"])
+    with t2:
+        st.markdown("#### 🔥 Gap Heatmap (Missing=0 • Partial=1 • Matched=2)")
+        st.dataframe(
+            gap_matrix(results).style.background_gradient(cmap="RdYlGn", vmin=0, vmax=2).format("{:.0f}", na_rep=""),
+            use_container_width=True
+        )
+
+    st.dataframe(
+        shares.style.format({f"{c} %": "{:.0%}" for c in ("Missing", "Partial", "Matched")}),
+        use_container_width=True, hide_index=True
+    )
+
+# ------------------------------------------
+# CORPUS SKILL DEMAND ANALYTICS
+# ------------------------------------------
+st.subheader("📈 Job Market Skill Demand")
+
+CORPUS_DIR = os.path.join(DATA_DIR, "demand_corpus")
+
+@st.cache_resource
+def load_demand_corpus():
+    # persisted after every ingest, so the corpus survives restarts and is shared by all app processes
+    return SkillDemandCorpus.open(CORPUS_DIR, SKILL_ALIASES)
+
+@st.cache_resource
+def load_skill_matcher():
+    return load_nlp_and_matcher(SKILL_ALIASES)
+
+corpus = load_demand_corpus()
+# JDs ingested by other app processes since this one loaded (or last saved) the corpus
+corpus.sync(CORPUS_DIR)
+
+with st.expander("Ingest Job Descriptions (PDF, DOCX, TXT)", expanded=corpus.n_docs == 0):
+    jd_files = st.file_uploader(
+        "Upload job descriptions to add to the demand corpus",
+        type=["pdf", "docx", "txt"],
+        accept_multiple_files=True
+    )
+    if jd_files:
+        new_files = [f for f in jd_files if content_hash(f.getvalue()) not in corpus]
+        if new_files:
+            with st.spinner(f"Extracting skills from {len(new_files)} new job descriptions..."):
+                nlp, matcher = load_skill_matcher()
+                # like batch parsing: an oversized or unreadable file is reported, the rest are ingested
+                parsed, errors = [], []
+                for f in new_files:
+                    try:
+                        parsed.append((f, ingest_upload(f)))
+                    except Exception as e:
+                        errors.append(f"{f.name}: {e}")
+                added = 0
+                if parsed:
+                    added = corpus.add_documents(
+                        count_skill_mentions(nlp, matcher, [i.text for _, i in parsed]),
+                        doc_ids=[content_hash(f.getvalue()) for f, _ in parsed]
+                    )
+                if added:
+                    corpus.save(CORPUS_DIR)
+            st.success(f"Added {added} job descriptions to the corpus.")
+            for e in errors:
+                st.warning(f"⚠ Could not read {e}")
+            for f, i in parsed:
+                if i.truncated:
+                    st.warning(f"✂️ {truncation_message(f.name, i)}")
+
+if corpus.n_docs:
+    freq = corpus.frequency()
+    st.caption(f"Corpus: {corpus.n_docs} job descriptions • {int((freq['JDs'] > 0).sum())} distinct skills in demand")
+
+    m1, m2 = st.columns([3, 2])
+    with m1:
+        st.markdown("#### 🔝 Most Demanded Skills")
+        st.bar_chart(freq[freq["JDs"] > 0].head(15).set_index("Skill")["JDs"])
+    with m2:
+        st.markdown("#### 🔗 Skills Asked Together")
+        st.dataframe(corpus.cooccurrence(top=10), use_container_width=True, hide_index=True)
+
+    st.markdown("#### 🚀 Trending Skills (last 30 days vs earlier)")
+    st.dataframe(corpus.trending(window_days=30, top=10), use_container_width=True, hide_index=True)
+
+    if missing:
+        st.markdown("#### 🎯 Missing Skills Ranked by Market Demand")
+        priority = corpus.prioritize_missing(missing)
+        missing = priority["Skill"].tolist()
+        st.dataframe(priority[["Skill", "Demand"]].style.format({"Demand": "{:.0%}"}), use_container_width=True, hide_index=True)
+else:
+    st.info("Upload job descriptions to rank skill gaps by market demand.")
+
 # ------------------------------------------
 # LEARNING RECOMMENDATIONS
 # ------------------------------------------
 st.subheader("📚 Learning Recommendations")
 
-if missing:
-    for s in missing:
+@st.cache_resource
+def load_resource_catalog():
+    encoder = model_client_from_env() or SentenceTransformer("all-MiniLM-L6-v2")
+    return ResourceCatalog(encoder=encoder, model_name="all-MiniLM-L6-v2")
+
+def resource_item(resource, score):
+    title = f"<a href='{resource['url']}' target='_blank'>{resource['title']}</a>" if resource.get("url") else resource["title"]
+    return (f"<li>{title} — {resource['provider']} • {resource['level'].title()} • "
+            f"{resource['format']} • ~{resource['hours']}h • ⭐ {resource['rating']}</li>")
+
+gaps = [(s, "Missing") for s in missing] + [(s, "Partial") for s in partial]
+if gaps:
+    recommendations = load_resource_catalog().recommend_many(gaps, k=3)
+    for (s, status), ranked in recommendations.items():
+        items = "".join(resource_item(r, sc) for r, sc in ranked) or \
+            "<li>No catalog match yet – practice with a hands-on project</li>"
         st.markdown(f"""
         <div class='card'>
-        <b>{s}</b><br>
-        Recommended Action:
-        <ul>
-            <li>Enroll in beginner-to-advanced online courses</li>
-            <li>Practice with hands-on projects</li>
-            <li>Apply concepts in real-world scenarios</li>
-        </ul>
+        <b>{s}</b> <span class='tag {"bad" if status == "Missing" else "warn"}'>{status}</span><br>
+        Recommended Resources:
+        <ul>{items}</ul>
         </div>
         """, unsafe_allow_html=True)
 else:
@@ -200,3 +370,5 @@ st.caption(
     f"Milestone 4 • Final Dashboard • Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
 )
 
+if st.query_params.get("debug") == "1":
+    debug_panel(tracer)
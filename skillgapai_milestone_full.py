@@ -4,15 +4,35 @@
 # ==========================================
 
 import streamlit as st
+import os
+import uuid
+import re
+from io import BytesIO
 import spacy
 from spacy.matcher import PhraseMatcher
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 from datetime import datetime
 
+from skillgapai_core import DATA_DIR, chunk_bounds
+from skillgapai_classify import classify_similarity, group_by_category, load_thresholds
+from skillgapai_classify import overall_score as overall_score_for
+from skillgapai_batch import parse_uploads, extract_skill_lists, encode_union, stacked_similarity, rank_candidates
+from skillgapai_batch import skill_evidence
+from skillgapai_candidates import CandidateExtractor
+from skillgapai_charts import ChartService, radar_figure, heatmap_figure, heatmap_vega_spec
+from skillgapai_charts import MAX_SIDE, heatmap_view, heatmap_figsize
+from skillgapai_index import SkillIndex
+from skillgapai_ingest import ParsedDocuments, limit_text, truncation_message
+from skillgapai_model_server import model_client_from_env
+from skillgapai_normalize import SkillNormalizer
+from skillgapai_pipeline import StageGraph, content_hash
+from skillgapai_results_db import AnalysisStore, candidate_label, record_from_classification, records_to_frame, records_to_json
+from skillgapai_session_store import SessionResultStore, CompactResult, session_panel
+from skillgapai_tracing import debug_panel, metrics_server_from_env, start_trace
+
 # ------------------------------------------
 # PAGE CONFIG
 # ------------------------------------------
@@ -22,6 +42,12 @@ st.set_page_config(
     layout="wide"
 )
 
+# ------------------------------------------
+# TRACING (?debug=1 for the stage waterfall, &profile=cprofile|pyinstrument)
+# ------------------------------------------
+metrics_server_from_env()
+tracer = start_trace("milestone_full", profile=st.query_params.get("profile"))
+
 # ------------------------------------------
 # UI THEME
 # ------------------------------------------
@@ -66,18 +92,46 @@ st.markdown("""
 </p>
 """, unsafe_allow_html=True)
 
+# ------------------------------------------
+# SESSION RESULT STORE (COMPACT, LRU-BOUNDED)
+# ------------------------------------------
+@st.cache_resource
+def load_result_store():
+    return SessionResultStore()
+
+result_store = load_result_store()
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex[:12]
+session_id = st.session_state["session_id"]
+
 # =====================================================
 # MILESTONE 1 – INPUT
 # =====================================================
 st.subheader("📥 Milestone 1: Resume & Job Description Input")
 
+mode = st.radio("Mode", ["Single resume", "Batch (many resumes vs one JD)"], horizontal=True)
+batch_mode = mode.startswith("Batch")
+open_vocabulary = st.checkbox(
+    "Discover skills beyond the built-in list (open vocabulary)",
+    value=True,
+    help="Score noun phrases from the text against the full skill taxonomy"
+)
+
 col1, col2 = st.columns(2)
 with col1:
-    resume_text = st.text_area(
-        "📄 Resume Text",
-        height=220,
-        placeholder="Paste resume content here"
-    )
+    if batch_mode:
+        resume_files = st.file_uploader(
+            "📄 Resumes (PDF, DOCX, TXT)",
+            type=["pdf", "docx", "txt"],
+            accept_multiple_files=True
+        )
+        resume_text = ""
+    else:
+        resume_text = st.text_area(
+            "📄 Resume Text",
+            height=220,
+            placeholder="Paste resume content here"
+        )
 
 with col2:
     jd_text = st.text_area(
@@ -86,37 +140,317 @@ with col2:
         placeholder="Paste job description here"
     )
 
-if not resume_text or not jd_text:
+if batch_mode and (not resume_files or not jd_text):
+    st.info("Upload resumes and enter a Job Description to proceed.")
+    st.stop()
+
+if not batch_mode and (not resume_text or not jd_text):
     st.info("Enter both Resume and Job Description to proceed.")
     st.stop()
 
+# oversized pastes keep their first part plus the Skills section
+for label, pasted in (("Resume", resume_text), ("Job Description", jd_text)):
+    limited = limit_text(pasted)
+    if limited.truncated:
+        st.warning(f"✂️ {truncation_message(label, limited)}")
+        if label == "Resume":
+            resume_text = limited.text
+        else:
+            jd_text = limited.text
+
 # =====================================================
 # MILESTONE 2 – SKILL EXTRACTION
 # =====================================================
-st.subheader("🧠 Milestone 2: Skill Extraction")
 
 @st.cache_resource
 def load_nlp():
     return spacy.load("en_core_web_sm")
 
-nlp = load_nlp()
-
 SKILLS = [
     "Python", "SQL", "Machine Learning", "Data Analysis", "Deep Learning",
     "Statistics", "Power BI", "Tableau", "Communication", "Teamwork"
 ]
 
-matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-for skill in SKILLS:
-    matcher.add(skill, [nlp(skill)])
+@st.cache_resource
+def load_matcher():
+    nlp = load_nlp()
+    matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    for skill in SKILLS:
+        matcher.add(skill, [nlp.make_doc(skill)])
+    return matcher
+
+ENCODER_NAME = "all-MiniLM-L6-v2"
+
+@st.cache_resource
+def load_model():
+    # SKILLGAPAI_MODEL_SOCKET set: share one model-server process across workers
+    return model_client_from_env() or SentenceTransformer(ENCODER_NAME)
+
+@st.cache_resource
+def load_candidate_extractor():
+    # taxonomy canonicals are lowercase; keep this app's own spelling for its SKILLS
+    normalizer = SkillNormalizer(load_model(), model_name=ENCODER_NAME)
+    return CandidateExtractor(normalizer, labels={s.lower(): s for s in SKILLS})
+
+def clean_text(text):
+    return re.sub(r'\s+', ' ', text).strip()
+
+def extract_skills(text, open_vocabulary):
+    nlp = load_nlp()
+    # long texts are matched chunk by chunk with nlp.pipe instead of one nlp(text) call
+    docs = list(nlp.pipe(text[a:b] for a, b in chunk_bounds(text)))
+    matcher = load_matcher()
+    skills = set(nlp.vocab.strings[m[0]] for doc in docs for m in matcher(doc))
+    if open_vocabulary:
+        skills.update(*load_candidate_extractor().skills_for_docs(docs))
+    return sorted(skills)
+
+def embed_skills(skills, encoder_name):
+    # encoder_name is a graph input so switching models never serves stale embeddings;
+    # stage outputs are cached, so own the buffer (a model-server result is a shared-memory view)
+    return np.array(load_model().encode(skills)) if skills else np.zeros((0, 0))
+
+# calibrated per encoder by skillgapai_calibrate.py (re-read every run); these are the uncalibrated defaults
+THRESHOLDS = load_thresholds(ENCODER_NAME, {"Partial": 0.50, "Matched": 0.70})
+SCORE_WEIGHTS = {"Matched": 1.0, "Partial": 1.0}
+
+def classify_skills(sim_matrix, thresholds):
+    return classify_similarity(sim_matrix, thresholds)
+
+@st.cache_resource
+def load_chart_service():
+    return ChartService()
+
+def bounded_heatmap(sim_matrix, resume_skills, jd_skills):
+    # open-vocabulary matrices can be large: show the strongest MAX_SIDE rows/columns
+    view = heatmap_view(sim_matrix, resume_skills, jd_skills)
+    return view.matrix, view.row_labels, view.col_labels
+
+def render_charts(resume_skills, jd_skills, sim_matrix, classification):
+    charts = load_chart_service()
+    radar_scores = classification["score"].tolist()
+    radar_png = charts.render(radar_figure, jd_skills, radar_scores)
+    heat, heat_rows, heat_cols = bounded_heatmap(sim_matrix, resume_skills, jd_skills)
+    heatmap_png = charts.render(heatmap_figure, heat, heat_rows, heat_cols,
+                                figsize=heatmap_figsize(*heat.shape, base=(5, 3)), fontsize=10)
+    return radar_png, heatmap_png
 
-def extract_skills(text):
-    doc = nlp(text)
-    matches = matcher(doc)
-    return sorted(set(nlp.vocab.strings[m[0]] for m in matches))
+# ------------------------------------------
+# INCREMENTAL STAGE GRAPH
+# Resume and JD chains are keyed independently, so editing one
+# document reuses every stage computed for the other. Thresholds and
+# the encoder are inputs too: the graph outlives this script run, so
+# stages must not read module globals that can change between runs.
+# ------------------------------------------
+@st.cache_resource
+def load_pipeline():
+    graph = StageGraph()
+    graph.add_stage("resume_clean", clean_text, ["resume_text"])
+    graph.add_stage("jd_clean", clean_text, ["jd_text"])
+    graph.add_stage("resume_skills", extract_skills, ["resume_clean", "open_vocabulary"])
+    graph.add_stage("jd_skills", extract_skills, ["jd_clean", "open_vocabulary"])
+    graph.add_stage("resume_emb", embed_skills, ["resume_skills", "encoder"])
+    graph.add_stage("jd_emb", embed_skills, ["jd_skills", "encoder"])
+    graph.add_stage("sim_matrix", cosine_similarity, ["resume_emb", "jd_emb"])
+    graph.add_stage("classification", classify_skills, ["sim_matrix", "thresholds"])
+    graph.add_stage("charts", render_charts, ["resume_skills", "jd_skills", "sim_matrix", "classification"], hash_output=False)
+    return graph
+
+pipeline = load_pipeline()
+
+INDEX_DIR = os.path.join(DATA_DIR, "skill_index")
+
+# stored analyses are keyed by model, extraction mode, thresholds and score weights, which all
+# change results (a recalibration must not serve labels computed with the old thresholds)
+MODEL_VERSION = (
+    f"{ENCODER_NAME}|{'open' if open_vocabulary else 'fixed'}-vocab"
+    f"|{THRESHOLDS['Partial']:g}-{THRESHOLDS['Matched']:g}"
+    f"|w{SCORE_WEIGHTS['Matched']:g}-{SCORE_WEIGHTS['Partial']:g}"
+)
 
-resume_skills = extract_skills(resume_text)
-jd_skills = extract_skills(jd_text)
+@st.cache_resource
+def load_analysis_store():
+    return AnalysisStore()
+
+analysis_store = load_analysis_store()
+
+@st.cache_resource
+def load_skill_index():
+    return SkillIndex.open(INDEX_DIR)
+
+@st.cache_resource
+def load_parsed_documents():
+    # shared with Milestone 1: files parsed there are not parsed again here
+    return ParsedDocuments()
+
+@st.cache_resource
+def load_reference_embeddings():
+    # the index scores candidates against this fixed skill list, never against a JD
+    _, emb = encode_union(load_model(), [], SKILLS)
+    return emb
+
+# ------------------------------------------
+# BATCH MODE: RANKED SHORTLIST
+# ------------------------------------------
+if batch_mode:
+    st.subheader("🏁 Batch Comparison: Ranked Shortlist")
+
+    jd_skills = pipeline.run({"jd_text": jd_text, "open_vocabulary": open_vocabulary}, targets=["jd_skills"])["jd_skills"]
+    if not jd_skills:
+        st.warning("No skills detected in the Job Description. Try richer text.")
+        st.stop()
+
+    total = len(resume_files)
+    progress = st.progress(0.0, text=f"Parsing 0/{total} resumes…")
+    live = st.empty()
+    names, texts, errors, failed, truncated = [f.name for f in resume_files], [""] * total, [], set(), []
+    skill_lists = [[] for _ in range(total)]
+
+    # resumes already analysed against this JD with this model skip parsing and extraction
+    jd_hash = content_hash(jd_text)
+    resume_hashes = [content_hash(f.getvalue()) for f in resume_files]
+    stored = analysis_store.get_many(resume_hashes, jd_hash, MODEL_VERSION)
+    fresh = [i for i, h in enumerate(resume_hashes) if h not in stored]
+    for i, h in enumerate(resume_hashes):
+        if h in stored:
+            skill_lists[i] = stored[h]["resume_skills"]
+
+    for done, (k, name, text, error, note) in enumerate(parse_uploads([resume_files[i] for i in fresh], cache=load_parsed_documents()), 1):
+        texts[fresh[k]] = text
+        if error or not text.strip():
+            # failed or empty resumes are reported below instead of ranking with a score of 0
+            errors.append(f"{name}: {error or 'no text could be extracted'}")
+            failed.add(fresh[k])
+        elif note:
+            truncated.append(f"{name}: {note}")
+        progress.progress(done / (2 * len(fresh)), text=f"Parsed {done}/{len(fresh)} new resumes…")
+
+    rows = []
+    candidates = load_candidate_extractor() if open_vocabulary else None
+    to_extract = [i for i in fresh if i not in failed]
+    extracted = extract_skill_lists(load_nlp(), load_matcher(), [texts[i] for i in to_extract], candidates=candidates)
+    for done, (k, skills) in enumerate(extracted, 1):
+        skill_lists[to_extract[k]] = skills
+        rows.append({"Candidate": names[to_extract[k]], "Skills Found": len(skills)})
+        progress.progress(0.5 + done / (2 * len(to_extract)), text=f"Extracted skills for {done}/{len(to_extract)} new resumes…")
+        if done % 10 == 0 or done == len(to_extract):
+            live.dataframe(pd.DataFrame(rows), use_container_width=True, height=200)
+
+    # only resumes that parsed are ranked; batch_result rows follow `ranked`
+    ranked = [i for i in range(total) if i not in failed]
+    ranked_skills = [skill_lists[i] for i in ranked]
+    vocab_index, union_emb = encode_union(load_model(), ranked_skills, jd_skills)
+    sim_tensor = stacked_similarity(ranked_skills, jd_skills, vocab_index, union_emb)
+    leaderboard, batch_result = rank_candidates(
+        [names[i] for i in ranked], ranked_skills, jd_skills, sim_tensor, THRESHOLDS, SCORE_WEIGHTS
+    )
+    progress.progress(1.0, text=f"Ranked {len(ranked)} of {total} resumes ({len(stored)} from storage) • "
+                                f"{len(vocab_index)} distinct skills encoded once")
+
+    # persist newly analysed resumes; stored ones are already there
+    overall = np.atleast_1d(overall_score_for(batch_result, SCORE_WEIGHTS))
+    batch_records = [
+        record_from_classification(
+            names[i], resume_hashes[i], jd_hash, MODEL_VERSION, skill_lists[i], jd_skills,
+            batch_result[k], overall[k], app="milestone_full:batch"
+        )
+        for k, i in enumerate(ranked)
+    ]
+    analysis_store.put_many(r for i, r in zip(ranked, batch_records) if resume_hashes[i] not in stored)
+
+    live.dataframe(leaderboard, use_container_width=True, hide_index=True)
+    if errors:
+        st.caption(f"{len(errors)} resume(s) could not be parsed and are not ranked")
+    for e in errors:
+        st.warning(f"⚠ Could not parse {e}")
+    for t in truncated:
+        st.info(f"✂️ Truncated {t}")
+
+    st.download_button(
+        "⬇️ Download Shortlist (CSV)",
+        leaderboard.to_csv(index=False),
+        file_name="SkillGapAI_Batch_Shortlist.csv",
+        mime="text/csv"
+    )
+    # columnar results for the Milestone 4 team dashboard
+    arrow_buf = BytesIO()
+    try:
+        records_to_frame(batch_records).to_feather(arrow_buf)
+    except ImportError:
+        # Arrow export needs pyarrow; the JSON export works everywhere
+        st.download_button(
+            "⬇️ Download Analyses (JSON)",
+            records_to_json(batch_records),
+            file_name="SkillGapAI_Batch_Analyses.json",
+            mime="application/json"
+        )
+    else:
+        st.download_button(
+            "⬇️ Download Analyses (Arrow)",
+            arrow_buf.getvalue(),
+            file_name="SkillGapAI_Batch_Analyses.arrow",
+            mime="application/vnd.apache.arrow.file"
+        )
+
+    # ------------------------------------------
+    # REVERSE SEARCH OVER ALL INGESTED CANDIDATES
+    # ------------------------------------------
+    skill_index = load_skill_index()
+    # candidates other app processes indexed since this one loaded (or last saved) the index
+    skill_index.sync(INDEX_DIR)
+    # keyed by resume content, so a renamed or re-uploaded file is one candidate
+    new_ids = {resume_hashes[i]: k for k, i in enumerate(ranked) if resume_hashes[i] not in skill_index}
+    if new_ids:
+        evidence = skill_evidence(
+            [ranked_skills[k] for k in new_ids.values()], vocab_index, union_emb,
+            sorted(SKILLS), load_reference_embeddings(), THRESHOLDS["Partial"]
+        )
+        skill_index.add_many(zip(new_ids, evidence), {h: names[ranked[k]] for h, k in new_ids.items()})
+        skill_index.save(INDEX_DIR)
+
+    st.subheader("🔎 Reverse Search: Who Has These Skills?")
+    st.caption(f"{len(skill_index)} candidates indexed across all batches")
+    known_skills = sorted(skill_index.skills)
+    r1, r2, r3 = st.columns(3)
+    must_have = r1.multiselect("Must have (matched)", known_skills)
+    at_least_partial = r2.multiselect("At least a partial match", known_skills)
+    must_not = r3.multiselect("Must not have", known_skills)
+
+    if must_have or at_least_partial or must_not:
+        terms = [(s, THRESHOLDS["Matched"]) for s in must_have] + [(s, THRESHOLDS["Partial"]) for s in at_least_partial]
+        hits = skill_index.boolean(must=terms, must_not=must_not)
+        ranked = skill_index.weighted({s: 1.0 for s in must_have + at_least_partial}, top_k=200, candidates=hits) \
+            if must_have or at_least_partial else [(c, 0.0) for c in skill_index.names(hits[:200])]
+        st.write(f"**{len(hits)}** candidates match")
+        st.dataframe(pd.DataFrame([(skill_index.label(c), score) for c, score in ranked],
+                                  columns=["Candidate", "Weighted Score"]),
+                     use_container_width=True, hide_index=True)
+    if st.query_params.get("debug") == "1":
+        debug_panel(tracer)
+    st.stop()
+
+st.subheader("🧠 Milestone 2: Skill Extraction")
+
+pipeline_inputs = {
+    "resume_text": resume_text, "jd_text": jd_text, "open_vocabulary": open_vocabulary,
+    "encoder": ENCODER_NAME, "thresholds": THRESHOLDS,
+}
+
+# reruns with the same inputs in this session read the compact result back instead of running the graph;
+# a pair analysed before (any session, any app run) reuses its stored skills and skips extraction
+result_key = content_hash((resume_text, jd_text, MODEL_VERSION, THRESHOLDS))
+stored = result_store.get(session_id, result_key)
+analysis_key = (content_hash(resume_text), content_hash(jd_text), MODEL_VERSION)
+stored_record = analysis_store.get(*analysis_key)
+if stored_record is not None:
+    pipeline_inputs["resume_skills"] = stored_record["resume_skills"]
+    pipeline_inputs["jd_skills"] = [s for s, _, _ in stored_record["skills"]]
+if stored is None:
+    extraction_run = pipeline.run(pipeline_inputs, targets=["resume_skills", "jd_skills"])
+    resume_skills = extraction_run["resume_skills"]
+    jd_skills = extraction_run["jd_skills"]
+else:
+    resume_skills, jd_skills = stored.resume_skills, stored.jd_skills
 
 c1, c2 = st.columns(2)
 with c1:
@@ -138,31 +472,27 @@ if not resume_skills or not jd_skills:
 # =====================================================
 st.subheader("📊 Milestone 3: Semantic Skill Gap Analysis")
 
-@st.cache_resource
-def load_model():
-    return SentenceTransformer("all-MiniLM-L6-v2")
-
-model = load_model()
-
-res_emb = model.encode(resume_skills)
-jd_emb = model.encode(jd_skills)
-sim_matrix = cosine_similarity(res_emb, jd_emb)
-
-MATCH_T = 0.70
-PARTIAL_T = 0.50
-
-matched, partial, missing = [], [], []
-
-for j, skill in enumerate(jd_skills):
-    score = sim_matrix[:, j].max()
-    if score >= MATCH_T:
-        matched.append((skill, score))
-    elif score >= PARTIAL_T:
-        partial.append((skill, score))
-    else:
-        missing.append((skill, score))
-
-overall_score = int(((len(matched) + len(partial)) / len(jd_skills)) * 100)
+if stored is None:
+    run = pipeline.run(pipeline_inputs)
+    sim_matrix = run["sim_matrix"]
+    classification = run["classification"]
+    radar_png, heatmap_png = run["charts"]
+    result_store.put(session_id, result_key, CompactResult.from_classification(
+        result_store.vocab, resume_skills, jd_skills, classification,
+        overall_score_for(classification, SCORE_WEIGHTS), sim_matrix
+    ))
+else:
+    sim_matrix, classification = stored.similarity, stored.classification
+    radar_png, heatmap_png = render_charts(resume_skills, jd_skills, sim_matrix, classification)
+groups = group_by_category(classification, jd_skills)
+matched, partial, missing = groups["Matched"], groups["Partial"], groups["Missing"]
+overall_score = overall_score_for(classification, SCORE_WEIGHTS)
+analysis_record = record_from_classification(
+    candidate_label(analysis_key[0], "Pasted resume"), *analysis_key, resume_skills, jd_skills,
+    classification, overall_score, app="milestone_full"
+)
+if stored_record is None:
+    analysis_store.put(analysis_record)
 
 # ------------------------------------------
 # SKILL TAG VIEW
@@ -195,30 +525,24 @@ st.subheader("📈 Skill Distribution Visuals")
 col1, col2 = st.columns(2)
 
 with col1:
-    def radar_chart(skills, scores):
-        scores = scores + scores[:1]
-        angles = np.linspace(0, 2*np.pi, len(skills), endpoint=False).tolist()
-        angles += angles[:1]
-        fig = plt.figure(figsize=(4.5,4.5))
-        ax = plt.subplot(111, polar=True)
-        ax.plot(angles, scores, linewidth=2)
-        ax.fill(angles, scores, alpha=0.3)
-        ax.set_thetagrids(np.degrees(angles[:-1]), skills)
-        ax.set_ylim(0,1)
-        return fig
-
-    radar_scores = [sim_matrix[:, j].max() for j in range(len(jd_skills))]
-    st.pyplot(radar_chart(jd_skills, radar_scores))
+    st.image(radar_png, use_container_width=True)
 
 with col2:
-    fig, ax = plt.subplots(figsize=(5,3))
-    im = ax.imshow(sim_matrix, cmap="viridis")
-    ax.set_xticks(range(len(jd_skills)))
-    ax.set_xticklabels(jd_skills, rotation=30, ha="right")
-    ax.set_yticks(range(len(resume_skills)))
-    ax.set_yticklabels(resume_skills)
-    fig.colorbar(im, ax=ax)
-    st.pyplot(fig)
+    if st.toggle("Render heatmap in browser (Vega-Lite)"):
+        heat, heat_rows, heat_cols = bounded_heatmap(sim_matrix, resume_skills, jd_skills)
+        st.vega_lite_chart(heatmap_vega_spec(heat, heat_rows, heat_cols), use_container_width=True)
+    else:
+        st.image(heatmap_png, use_container_width=True)
+    if max(sim_matrix.shape) > MAX_SIDE:
+        st.caption(f"Heatmap shows the strongest {min(sim_matrix.shape[0], MAX_SIDE)}×{min(sim_matrix.shape[1], MAX_SIDE)} "
+                   f"of {sim_matrix.shape[0]}×{sim_matrix.shape[1]} cells")
+
+if stored is None:
+    recomputed = extraction_run.recomputed + run.recomputed
+    st.caption(f"Re-ran stages: {', '.join(recomputed) or 'none'} • Reused: {', '.join(run.reused) or 'none'}"
+               + (" • Skills read back from the analysis store" if stored_record is not None else ""))
+else:
+    st.caption("Served from this session's stored result")
 
 # =====================================================
 # MILESTONE 4 – DASHBOARD & RECOMMENDATIONS
@@ -266,7 +590,20 @@ st.download_button(
     file_name="SkillGapAI_Final_Report.csv",
     mime="text/csv"
 )
+st.download_button(
+    "⬇️ Download Analysis (JSON for Milestone 4)",
+    records_to_json([analysis_record]),
+    file_name="SkillGapAI_Analysis.json",
+    mime="application/json"
+)
+
+# ------------------------------------------
+# SESSION HISTORY (MEMORY VIEW WITH ?admin=<SKILLGAPAI_ADMIN_TOKEN>)
+# ------------------------------------------
+session_panel(result_store, session_id, st.query_params.get("admin"))
 
 st.markdown("---")
 st.caption(f"SkillGapAI Integrated System • Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
+if st.query_params.get("debug") == "1":
+    debug_panel(tracer)
@@ -0,0 +1,356 @@
+# ==========================================
+# SkillGapAI - Shared Model Server
+# One local process hosts spaCy + the PhraseMatcher and the sentence
+# encoder for every Streamlit worker; requests go over a Unix socket and
+# embeddings come back through shared memory
+#
+#   python skillgapai_model_server.py serve --encoder all-MiniLM-L6-v2 --spacy en_core_web_sm
+#   SKILLGAPAI_MODEL_SOCKET=.skillgapai/models.sock streamlit run skillgapai_milestone3.py
+#   python skillgapai_model_server.py bench --workers 4 --encoder stub --spacy blank
+# ==========================================
+
+import argparse
+import multiprocessing as mp
+import os
+import secrets
+import statistics
+import threading
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Client, Listener
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from skillgapai_core import DATA_DIR, SKILL_ALIASES, load_nlp_and_matcher
+from skillgapai_sections import SkillHit, section_skill_hits
+from skillgapai_tracing import span
+
+SOCKET_ENV = "SKILLGAPAI_MODEL_SOCKET"
+DEFAULT_SOCKET = os.path.join(DATA_DIR, "models.sock")
+# Shared-memory arenas start here and double when a batch does not fit
+MIN_ARENA_BYTES = 1 << 20
+
+
+def _key_path(socket_path):
+    return socket_path + ".key"
+
+
+def load_encoder(name):
+    if name == "stub":
+        from skillgapai_benchmark import StubEncoder
+        return StubEncoder()
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name)
+
+
+def _attach(name):
+    """Map an existing shared-memory block without letting this process's tracker unlink it"""
+    shm = SharedMemory(name=name)
+    # Python < 3.13 registers every attach with the resource tracker, which would
+    # unlink the server's block when this worker exits
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+# ------------------------------------------
+# SERVER
+# ------------------------------------------
+class ModelServer:
+    """
+    Hosts the encoder and spaCy matcher for many app processes.
+
+    Each client connection is served on its own thread with its own
+    shared-memory arena: an encode writes the embeddings into the arena and
+    replies with (name, shape, dtype) only, so the vectors never travel over
+    the socket. Model calls are serialized with a lock; the models are loaded
+    once, so resident memory does not grow with the number of workers.
+    """
+
+    def __init__(self, encoder, nlp, matcher, socket_path=DEFAULT_SOCKET, skill_map=None):
+        self.encoder = encoder
+        self.nlp = nlp
+        self.matcher = matcher
+        self.socket_path = socket_path
+        self.skill_map = SKILL_ALIASES if skill_map is None else skill_map
+        self._model_lock = threading.Lock()
+        self._listener = None
+
+    def _authkey(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+        key = secrets.token_bytes(32)
+        fd = os.open(_key_path(self.socket_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+        return key
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._listener = Listener(self.socket_path, family="AF_UNIX", authkey=self._authkey())
+        os.chmod(self.socket_path, 0o600)
+        try:
+            while True:
+                try:
+                    conn = self._listener.accept()
+                except OSError:
+                    break
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        for path in (self.socket_path, _key_path(self.socket_path)):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def _handle(self, conn):
+        arena = None
+        try:
+            while True:
+                try:
+                    op, payload = conn.recv()
+                except (EOFError, OSError):
+                    break
+                try:
+                    if op == "encode":
+                        arena, reply = self._encode(payload, arena)
+                    elif op == "section_hits":
+                        reply = self._section_hits(payload)
+                    elif op == "stats":
+                        reply = {"pid": os.getpid(), **memory_usage()}
+                    else:
+                        raise ValueError(f"Unknown op: {op!r}")
+                    conn.send(("ok", reply))
+                except Exception as e:
+                    conn.send(("error", f"{type(e).__name__}: {e}"))
+        finally:
+            conn.close()
+            if arena is not None:
+                arena.close()
+                arena.unlink()
+
+    def _encode(self, texts, arena):
+        with self._model_lock, span("encode", texts=len(texts)):
+            emb = np.ascontiguousarray(self.encoder.encode(list(texts)), dtype=np.float32)
+        if arena is None or arena.size < emb.nbytes:
+            if arena is not None:
+                arena.close()
+                arena.unlink()
+            size = MIN_ARENA_BYTES if arena is None else arena.size
+            while size < emb.nbytes:
+                size *= 2
+            arena = SharedMemory(create=True, size=size)
+        np.ndarray(emb.shape, dtype=emb.dtype, buffer=arena.buf)[...] = emb
+        return arena, (arena.name, emb.shape, emb.dtype.str)
+
+    def _section_hits(self, payload):
+        text, sections = payload
+        with self._model_lock:
+            hits = section_skill_hits(self.nlp, self.matcher, text, sections, self.skill_map)
+        return [tuple(h) for h in hits]
+
+
+# ------------------------------------------
+# CLIENT
+# ------------------------------------------
+class ModelClient:
+    """
+    Drop-in for SentenceTransformer.encode and section_skill_hits backed by a ModelServer.
+
+    Each thread gets its own connection and arena, so concurrent Streamlit
+    sessions never overwrite each other's results. `encode` returns a
+    read-only view into the arena (no copy); it stays valid until the same
+    thread's next encode, so keep a copy if you hold on to it longer.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET):
+        self.socket_path = socket_path
+        with open(_key_path(socket_path), "rb") as f:
+            self._authkey = f.read()
+        self._local = threading.local()
+
+    def _call(self, op, payload=None):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = Client(self.socket_path, family="AF_UNIX", authkey=self._authkey)
+        conn.send((op, payload))
+        status, reply = conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"Model server: {reply}")
+        return reply
+
+    def encode(self, sentences, **kwargs):
+        if isinstance(sentences, str):
+            return self.encode([sentences])[0]
+        name, shape, dtype = self._call("encode", list(sentences))
+        arena = getattr(self._local, "arena", None)
+        if arena is None or arena.name != name:
+            # the server grew the arena; unmap old ones once no caller holds a view into them
+            retired = self._local.__dict__.setdefault("retired", [])
+            if arena is not None:
+                retired.append(arena)
+            for old in list(retired):
+                try:
+                    old.close()
+                    retired.remove(old)
+                except BufferError:
+                    pass
+            arena = self._local.arena = _attach(name)
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=arena.buf)
+        view.flags.writeable = False
+        return view
+
+    def section_skill_hits(self, text, sections=None):
+        return [SkillHit(*h) for h in self._call("section_hits", (text, sections))]
+
+    def stats(self):
+        return self._call("stats")
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+        arena = getattr(self._local, "arena", None)
+        if arena is not None:
+            try:
+                arena.close()
+            except BufferError:
+                pass  # a caller still holds a view; the mapping is released with it
+            self._local.arena = None
+
+
+def model_client_from_env():
+    """A ModelClient when SKILLGAPAI_MODEL_SOCKET points at a running server, else None"""
+    path = os.environ.get(SOCKET_ENV)
+    if path and os.path.exists(path):
+        return ModelClient(path)
+    return None
+
+
+# ------------------------------------------
+# BENCHMARK
+# ------------------------------------------
+def memory_usage():
+    """Resident and proportional set size (MB) of this process; PSS splits shared pages fairly"""
+    out = {}
+    for path, field, key in (("/proc/self/status", "VmRSS:", "rss_mb"), ("/proc/self/smaps_rollup", "Pss:", "pss_mb")):
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.startswith(field):
+                        out[key] = int(line.split()[1]) / 1024
+                        break
+        except OSError:
+            pass
+    return out
+
+
+def _bench_worker(mode, socket_path, encoder_name, spacy_model, batches, batch_size, results):
+    skills = list(SKILL_ALIASES)
+    texts = [skills[i % len(skills)] for i in range(batch_size)]
+    if mode == "shared":
+        client = ModelClient(socket_path)
+        encode = client.encode
+    else:
+        encoder = load_encoder(encoder_name)
+        load_nlp_and_matcher(SKILL_ALIASES, model=None if spacy_model == "blank" else spacy_model)
+        encode = encoder.encode
+
+    latencies = []
+    for _ in range(batches):
+        start = time.perf_counter()
+        emb = encode(texts)
+        float(np.asarray(emb).sum())
+        latencies.append(time.perf_counter() - start)
+    results.put({"mode": mode, "latencies": latencies, **memory_usage()})
+
+
+def run_model_server_benchmark(workers=4, encoder_name="stub", spacy_model="blank", batches=50, batch_size=32,
+                               socket_path=None):
+    """Per-worker memory and encode latency, each worker loading its own models vs sharing one server"""
+    ctx = mp.get_context("spawn")
+    socket_path = socket_path or os.path.join(DATA_DIR, f"bench-{os.getpid()}.sock")
+    server = ctx.Process(target=serve, args=(socket_path, encoder_name, spacy_model), daemon=True)
+    server.start()
+    deadline = time.time() + 300
+    while not os.path.exists(socket_path):
+        if time.time() > deadline or not server.is_alive():
+            raise RuntimeError("Model server did not start")
+        time.sleep(0.1)
+
+    rows = []
+    try:
+        for mode in ("local", "shared"):
+            results = ctx.Queue()
+            procs = [
+                ctx.Process(target=_bench_worker,
+                            args=(mode, socket_path, encoder_name, spacy_model, batches, batch_size, results))
+                for _ in range(workers)
+            ]
+            for p in procs:
+                p.start()
+            samples = [results.get() for _ in procs]
+            for p in procs:
+                p.join()
+            lat = sorted(x for s in samples for x in s["latencies"])
+            rows.append({
+                "mode": mode,
+                "workers": workers,
+                "rss_mb": statistics.mean(s.get("rss_mb", 0.0) for s in samples),
+                "pss_mb": statistics.mean(s.get("pss_mb", 0.0) for s in samples),
+                "p50_ms": 1000 * lat[len(lat) // 2],
+                "p95_ms": 1000 * lat[min(len(lat) - 1, int(0.95 * len(lat)))],
+            })
+        server_mem = ModelClient(socket_path).stats()
+        rows.append({"mode": "server", "workers": 1, "rss_mb": server_mem.get("rss_mb", 0.0),
+                     "pss_mb": server_mem.get("pss_mb", 0.0), "p50_ms": float("nan"), "p95_ms": float("nan")})
+    finally:
+        server.terminate()
+        server.join()
+        for path in (socket_path, _key_path(socket_path)):
+            if os.path.exists(path):
+                os.unlink(path)
+    return rows
+
+
+def print_rows(rows):
+    print(f"{'mode':<8} {'workers':>7} {'rss MB/worker':>14} {'pss MB/worker':>14} {'p50 ms':>8} {'p95 ms':>8}")
+    for r in rows:
+        print(f"{r['mode']:<8} {r['workers']:>7} {r['rss_mb']:>14.1f} {r['pss_mb']:>14.1f} "
+              f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f}")
+
+
+# ------------------------------------------
+# CLI
+# ------------------------------------------
+def serve(socket_path=DEFAULT_SOCKET, encoder_name="all-MiniLM-L6-v2", spacy_model="en_core_web_sm"):
+    nlp, matcher = load_nlp_and_matcher(SKILL_ALIASES, model=None if spacy_model == "blank" else spacy_model)
+    ModelServer(load_encoder(encoder_name), nlp, matcher, socket_path).serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SkillGapAI shared model server")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("serve", "bench"):
+        p = sub.add_parser(name)
+        p.add_argument("--encoder", default="all-MiniLM-L6-v2", help="'stub' (offline) or a SentenceTransformer model name")
+        p.add_argument("--spacy", default="en_core_web_sm", help="'blank' (offline tokenizer) or a spaCy model name")
+    sub.choices["serve"].add_argument("--socket", default=os.environ.get(SOCKET_ENV, DEFAULT_SOCKET))
+    sub.choices["bench"].add_argument("--workers", type=int, default=4)
+    sub.choices["bench"].add_argument("--batches", type=int, default=50)
+    sub.choices["bench"].add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.socket, args.encoder, args.spacy)
+    else:
+        print_rows(run_model_server_benchmark(args.workers, args.encoder, args.spacy, args.batches, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
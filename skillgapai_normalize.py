@@ -0,0 +1,156 @@
+# ==========================================
+# SkillGapAI - Semantic Skill Normalization
+# Maps free-text skill phrases to the nearest canonical taxonomy entry
+# ==========================================
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from skillgapai_core import DATA_DIR, SKILL_ALIASES
+from skillgapai_pipeline import content_hash
+from skillgapai_tracing import span
+
+# Minimum cosine similarity for a phrase to adopt a canonical label
+DEFAULT_CUTOFF = 0.62
+
+# Very short aliases ("py", "tf", "ml") embed poorly; they are only used for exact lookup
+MIN_SEMANTIC_ALIAS_LEN = 3
+
+
+def _unit(rows):
+    rows = np.asarray(rows, dtype=np.float32)
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    return rows / np.where(norms == 0, 1, norms)
+
+
+def display_name(skill):
+    """Canonical skills are lowercase; show them title-cased like Milestone 2"""
+    return skill.title() if skill == skill.lower() else skill
+
+
+class Normalized:
+    __slots__ = ("phrase", "canonical", "score", "method")
+
+    def __init__(self, phrase, canonical, score, method):
+        self.phrase = phrase
+        self.canonical = canonical
+        self.score = score
+        self.method = method
+
+    @property
+    def label(self):
+        """Canonical display name when matched, the original phrase otherwise"""
+        return display_name(self.canonical) if self.canonical else self.phrase
+
+
+class SkillNormalizer:
+    """
+    Exact alias lookup first, then nearest taxonomy entry by embedding.
+
+    Taxonomy embeddings are computed once per (model, taxonomy) and cached on
+    disk; every phrase result and every phrase embedding is memoized, so each
+    distinct phrase is encoded at most once no matter how many documents use it.
+    """
+
+    def __init__(self, encoder, model_name="", taxonomy=None, cutoff=DEFAULT_CUTOFF,
+                 cache_dir=None, max_memo=100_000):
+        self.encoder = encoder
+        self.cutoff = cutoff
+        self.max_memo = max_memo
+        taxonomy = SKILL_ALIASES if taxonomy is None else taxonomy
+
+        self._exact = {}
+        rows, labels = [], []
+        for canonical, aliases in taxonomy.items():
+            for name in [canonical] + list(aliases):
+                self._exact.setdefault(name.lower(), canonical)
+                if len(name) >= MIN_SEMANTIC_ALIAS_LEN and name not in rows:
+                    rows.append(name)
+                    labels.append(canonical)
+        self._labels = np.asarray(labels, dtype=object)
+
+        self._memo = OrderedDict()
+        self._embeddings = OrderedDict()
+        self._lock = threading.Lock()
+
+        cache_dir = os.path.join(DATA_DIR, "taxonomy_cache") if cache_dir is None else cache_dir
+        cache_path = os.path.join(cache_dir, f"{content_hash((model_name, rows))}.npy") if model_name else None
+        if cache_path and os.path.exists(cache_path):
+            self._taxonomy = np.load(cache_path)
+        else:
+            with span("encode", skills=len(rows)):
+                self._taxonomy = _unit(encoder.encode(rows))
+            if cache_path:
+                os.makedirs(cache_dir, exist_ok=True)
+                np.save(cache_path, self._taxonomy)
+        for name, vec in zip(rows, self._taxonomy):
+            self._embeddings[name.lower()] = vec
+
+    def _remember(self, cache, key, value):
+        cache[key] = value
+        while len(cache) > self.max_memo:
+            cache.popitem(last=False)
+
+    # ------------------------------------------
+    # EMBEDDING CACHE
+    # ------------------------------------------
+    def embed(self, phrases):
+        """Unit embeddings for phrases, encoding only phrases never seen before"""
+        keys = [p.lower() for p in phrases]
+        with self._lock:
+            missing = list(dict.fromkeys(k for k in keys if k not in self._embeddings))
+        if missing:
+            with span("encode", skills=len(missing)):
+                vectors = _unit(self.encoder.encode(missing))
+            with self._lock:
+                for k, v in zip(missing, vectors):
+                    self._remember(self._embeddings, k, v)
+        with self._lock:
+            vectors = [self._embeddings.get(k) for k in keys]
+        if any(v is None for v in vectors):
+            # evicted between calls under memory pressure: recompute the stragglers
+            gone = [k for k, v in zip(keys, vectors) if v is None]
+            fresh = dict(zip(gone, _unit(self.encoder.encode(gone))))
+            vectors = [fresh[k] if v is None else v for k, v in zip(keys, vectors)]
+        return np.stack(vectors) if vectors else np.zeros((0, self._taxonomy.shape[1]), dtype=np.float32)
+
+    # ------------------------------------------
+    # NORMALIZATION
+    # ------------------------------------------
+    def normalize(self, phrases):
+        """Normalized entry per phrase (same order); unseen phrases are resolved in one batch"""
+        out = [None] * len(phrases)
+        pending = {}
+        with self._lock:
+            for i, phrase in enumerate(phrases):
+                key = phrase.strip().lower()
+                if key in self._exact:
+                    out[i] = Normalized(phrase, self._exact[key], 1.0, "alias")
+                elif key in self._memo:
+                    canonical, score = self._memo[key]
+                    self._memo.move_to_end(key)
+                    out[i] = Normalized(phrase, canonical, score, "semantic" if canonical else "unmatched")
+                else:
+                    pending.setdefault(key, []).append(i)
+
+        if pending:
+            keys = list(pending)
+            with span("normalize", phrases=len(keys)):
+                sims = self.embed(keys) @ self._taxonomy.T
+                best = sims.argmax(axis=1)
+                scores = sims[np.arange(len(keys)), best]
+            with self._lock:
+                for key, b, score in zip(keys, best, scores):
+                    canonical = self._labels[b] if score >= self.cutoff else None
+                    self._remember(self._memo, key, (canonical, float(score)))
+                    for i in pending[key]:
+                        out[i] = Normalized(phrases[i], canonical, float(score), "semantic" if canonical else "unmatched")
+        return out
+
+
+def normalized_labels(entries):
+    """Display labels with duplicates (several phrases → same canonical) removed, order kept"""
+    return list(dict.fromkeys(e.label for e in entries))
@@ -0,0 +1,310 @@
+# ==========================================
+# SkillGapAI - PDF Text Extraction
+# A chain of PDF backends (fastest first) with page-level fallback,
+# a per-document time budget and cancellation (the chain runs in a
+# subprocess that is killed when the budget runs out)
+# ==========================================
+
+import contextvars
+import importlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from io import BytesIO
+
+from skillgapai_tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Seconds one document may spend in extraction before the pages read so far are returned
+PDF_TIME_BUDGET = 10.0
+# A page counts as readable when at least this share of its characters are letters/spaces
+# and fewer than this share of its tokens are single characters ("J o h n" style spacing)
+MIN_LETTER_RATIO = 0.5
+MAX_SINGLE_CHAR_RATIO = 0.5
+
+PdfText = namedtuple("PdfText", ["text", "pages", "backends", "timed_out", "unreadable", "total_pages"])
+
+
+class PdfCancelled(Exception):
+    """Raised inside a backend when the document's budget ran out or it was cancelled"""
+
+
+def readable(text):
+    """Heuristic check that a page's text is real prose, not empty or glyph soup"""
+    stripped = (text or "").strip()
+    if not stripped:
+        return False
+    letters = sum(c.isalpha() or c.isspace() for c in stripped)
+    tokens = stripped.split()
+    singles = sum(len(t) == 1 for t in tokens)
+    return letters / len(stripped) >= MIN_LETTER_RATIO and singles / len(tokens) < MAX_SINGLE_CHAR_RATIO
+
+
+# ------------------------------------------
+# BACKENDS
+# ------------------------------------------
+# Each backend yields (page index, page count, text) for the requested pages
+# (the first `limit` pages when `indices` is None). A page that fails yields ""
+# so the chain can retry just that page with the next backend.
+def _first(count, limit):
+    return range(count if limit is None else min(count, limit))
+
+
+def _pypdfium2_pages(module, data, indices, limit):
+    pdf = module.PdfDocument(data)
+    try:
+        count = len(pdf)
+        for i in _first(count, limit) if indices is None else indices:
+            try:
+                page = pdf[i]
+                textpage = page.get_textpage()
+                text = textpage.get_text_range()
+                textpage.close()
+                page.close()
+            except Exception:
+                text = ""
+            yield i, count, text
+    finally:
+        pdf.close()
+
+
+def _pypdf_pages(module, data, indices, limit):
+    reader = module.PdfReader(BytesIO(data))
+    count = len(reader.pages)
+    for i in _first(count, limit) if indices is None else indices:
+        try:
+            text = reader.pages[i].extract_text() or ""
+        except Exception:
+            text = ""
+        yield i, count, text
+
+
+def _pdfminer_pages(module, data, indices, limit):
+    # layout analysis (LAParams) groups text boxes, so multi-column resumes read column by column
+    from pdfminer.layout import LAParams, LTTextContainer
+    from pdfminer.pdfpage import PDFPage
+
+    count = sum(1 for _ in PDFPage.get_pages(BytesIO(data)))
+    wanted = list(_first(count, limit)) if indices is None else list(indices)
+    layouts = module.extract_pages(BytesIO(data), page_numbers=set(wanted), laparams=LAParams())
+    for i, layout in zip(sorted(wanted), layouts):
+        text = "".join(el.get_text() for el in layout if isinstance(el, LTTextContainer))
+        yield i, count, text
+
+
+# (name, importable module, page generator), fastest first
+PDF_BACKENDS = [
+    ("pypdfium2", "pypdfium2", _pypdfium2_pages),
+    ("pypdf", "pypdf", _pypdf_pages),
+    ("pdfminer.six", "pdfminer.high_level", _pdfminer_pages),
+    ("PyPDF2", "PyPDF2", _pypdf_pages),
+]
+
+_modules = {}
+
+
+def _module(import_name):
+    if import_name not in _modules:
+        try:
+            _modules[import_name] = importlib.import_module(import_name)
+        except Exception:
+            _modules[import_name] = None
+    return _modules[import_name]
+
+
+def available_backends():
+    """Names of the installed PDF backends, in chain order"""
+    return [name for name, import_name, _ in PDF_BACKENDS if _module(import_name) is not None]
+
+
+# ------------------------------------------
+# CHAIN
+# ------------------------------------------
+class _ChainState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pages = {}
+        self.backends = {}
+        self.count = None
+        self.timed_out = False
+
+
+def _record_page(state, i, count, text, name):
+    with state.lock:
+        state.count = count
+        if readable(text) or i not in state.pages:
+            state.pages[i] = text
+            state.backends[i] = name if readable(text) else None
+
+
+def _pending(state, max_pages):
+    """Pages no backend has read yet (None: the page count is not known yet, so all of them)"""
+    with state.lock:
+        if state.count is None:
+            return None
+        return [i for i in _first(state.count, max_pages) if state.backends.get(i) is None]
+
+
+def _run_chain(data, chain, state, deadline, cancel, max_pages, on_page=None, on_backend=None):
+    pending = _pending(state, max_pages)
+    for name, import_name, pages_of in chain:
+        if pending == []:
+            break
+        module = _module(import_name)
+        if module is None:
+            continue
+        if on_backend is not None:
+            on_backend(name)
+        try:
+            with span("pdf_backend", backend=name, pages=len(pending) if pending is not None else -1):
+                for i, count, text in pages_of(module, data, pending, max_pages):
+                    if cancel.is_set() or time.monotonic() > deadline:
+                        raise PdfCancelled()
+                    _record_page(state, i, count, text, name)
+                    if on_page is not None:
+                        on_page((i, count, text, name))
+        except PdfCancelled:
+            state.timed_out = True
+            return
+        except Exception:
+            pass  # unreadable file for this backend; the next one retries every pending page
+        pending = _pending(state, max_pages)
+
+
+def _chain_main():
+    """Child process entry: `python skillgapai_pdf.py <options json>` with the PDF bytes on stdin"""
+    options = json.loads(sys.argv[1])
+    data = sys.stdin.buffer.read()
+
+    def emit(message):
+        sys.stdout.write(json.dumps(message) + "\n")
+        sys.stdout.flush()
+
+    chain = [entry for entry in PDF_BACKENDS if entry[0] in options["backends"]]
+    _run_chain(data, chain, _ChainState(), time.monotonic() + options["budget"], threading.Event(),
+               options["max_pages"], on_page=emit, on_backend=lambda name: emit({"backend": name}))
+    emit(None)
+
+
+def _extract_in_process(data, backends, state, deadline, cancel, max_pages):
+    """
+    Run the chain in a fresh interpreter and collect its pages (one JSON line
+    each) until it finishes, the deadline passes or `cancel` is set - then kill
+    it. A backend stuck inside one pathological page is stopped as well.
+
+    Returns None when the result is final. If the child died before finishing
+    (a backend crashed, import error, out of memory) it is logged and the name
+    of the backend it was running is returned ("" if none had started), so the
+    caller can carry on without it.
+    """
+    options = {"backends": sorted(backends), "budget": deadline - time.monotonic(), "max_pages": max_pages}
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), json.dumps(options)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr,
+        )
+        finished = threading.Event()
+        running = [""]
+
+        def collect():
+            try:
+                proc.stdin.write(data)
+                proc.stdin.close()
+                for line in proc.stdout:
+                    message = json.loads(line)
+                    if message is None:
+                        finished.set()
+                        return
+                    if isinstance(message, dict):
+                        running[0] = message["backend"]
+                    else:
+                        _record_page(state, *message)
+            except (OSError, ValueError):
+                pass  # the child died or was killed; keep the pages it sent
+
+        reader = threading.Thread(target=collect, daemon=True, name="skillgapai-pdf-reader")
+        reader.start()
+        while reader.is_alive() and not cancel.is_set() and time.monotonic() < deadline:
+            reader.join(min(0.05, max(0.0, deadline - time.monotonic())))
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        reader.join()
+        proc.stdout.close()
+        if finished.is_set():
+            return None
+        if cancel.is_set() or time.monotonic() >= deadline:
+            state.timed_out = True
+            return None
+        stderr.seek(0)
+        tail = stderr.read()[-2000:].decode("utf-8", "replace").strip()
+    logger.warning("PDF extraction process exited with code %s during backend %r; continuing in-process. %s",
+                   proc.returncode, running[0] or None, tail)
+    return running[0]
+
+
+def extract_pdf(data, budget=PDF_TIME_BUDGET, backends=None, cancel=None, max_pages=None, isolate=True):
+    """
+    PdfText for PDF bytes, trying each installed backend in turn.
+
+    The first backend reads every page; only pages it could not read (errors,
+    empty or garbled text) go to the next backend. The chain runs in a child
+    process: once `budget` seconds pass (or `cancel` is set) the pages read so
+    far are returned with timed_out=True and the process is killed, even in the
+    middle of a page. With isolate=False (or when no process can be started) it
+    runs on a daemon thread instead, which can only stop between pages; if the
+    child dies early, the pages it did not read go through the thread chain
+    minus the backend it died in.
+    Only the first `max_pages` pages are read; total_pages reports the full count.
+    """
+    backends = set(available_backends() if backends is None else backends)
+    if not backends:
+        raise RuntimeError("Reading PDF files needs one of: pypdfium2, pypdf, pdfminer.six, PyPDF2")
+    chain = [entry for entry in PDF_BACKENDS if entry[0] in backends]
+
+    cancel = cancel or threading.Event()
+    deadline = time.monotonic() + budget
+    state = _ChainState()
+    worker = None
+    with span("extract_pdf", bytes=len(data), isolated=isolate):
+        if isolate:
+            try:
+                crashed = _extract_in_process(data, backends, state, deadline, cancel, max_pages)
+            except OSError:
+                isolate = False  # no subprocesses in this sandbox; fall back to the thread
+            else:
+                if crashed is not None:
+                    # the child died early: the backends after the one it died in read the remaining pages
+                    names = [entry[0] for entry in chain]
+                    chain = chain[names.index(crashed) + 1:] if crashed in names else chain
+                    isolate = False
+        if not isolate:
+            # copy_context keeps traced() spans working inside the worker thread
+            worker = threading.Thread(
+                target=contextvars.copy_context().run, args=(_run_chain, data, chain, state, deadline, cancel, max_pages),
+                daemon=True,
+            )
+            worker.start()
+            worker.join(max(0.0, deadline - time.monotonic()))
+            if worker.is_alive():
+                cancel.set()
+
+    with state.lock:
+        total = state.count or 0
+        kept = len(_first(total, max_pages))
+        pages = [state.pages.get(i, "") for i in range(kept)]
+        used = tuple(state.backends.get(i) for i in range(kept))
+        timed_out = (worker is not None and worker.is_alive()) or state.timed_out
+    unreadable = tuple(i for i, name in enumerate(used) if name is None)
+    return PdfText("\n".join(p for p in pages if p), pages, used, timed_out, unreadable, total)
+
+
+if __name__ == "__main__":
+    _chain_main()
@@ -0,0 +1,184 @@
+# ==========================================
+# SkillGapAI - Incremental Analysis Pipeline
+# Memoized stage graph:
+# clean → extract → embed → similarity → classify → render
+# ==========================================
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from skillgapai_tracing import span
+
+
+# ------------------------------------------
+# HASHING
+# ------------------------------------------
+def _feed(h, value):
+    """Feed a value into a hash object with type tags and length prefixes"""
+    if isinstance(value, np.ndarray):
+        arr = np.ascontiguousarray(value)
+        h.update(f"nd:{arr.dtype}:{arr.shape}:".encode())
+        h.update(arr.tobytes())
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        h.update(f"b:{len(value)}:".encode())
+        h.update(value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        h.update(f"s:{len(data)}:".encode())
+        h.update(data)
+    elif isinstance(value, (list, tuple)):
+        h.update(f"l:{len(value)}:".encode())
+        for item in value:
+            _feed(h, item)
+    elif isinstance(value, dict):
+        h.update(f"d:{len(value)}:".encode())
+        for k in sorted(value, key=repr):
+            _feed(h, k)
+            _feed(h, value[k])
+    else:
+        data = repr(value).encode("utf-8")
+        h.update(f"r:{len(data)}:".encode())
+        h.update(data)
+
+
+def content_hash(value) -> str:
+    """Stable content hash for text, bytes, numpy arrays and nested containers"""
+    h = hashlib.blake2b(digest_size=16)
+    _feed(h, value)
+    return h.hexdigest()
+
+
+def approx_nbytes(value) -> int:
+    """Rough memory footprint of a stage output (arrays, bytes, text and containers)"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(approx_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approx_nbytes(k) + approx_nbytes(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+# ------------------------------------------
+# STAGE GRAPH
+# ------------------------------------------
+class PipelineRun:
+    """Outputs of one graph evaluation plus which stages re-ran or were reused"""
+
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+        self.recomputed = []
+        self.reused = []
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+
+class StageGraph:
+    """
+    Dependency graph of pipeline stages, each memoized on the hash of its inputs.
+
+    A stage's key is derived from the *output* hashes of its dependencies, so
+    when an upstream stage re-runs but produces the same result (e.g. a one-word
+    edit that does not change the detected skills) everything downstream is
+    served from the memo. Resume-side and JD-side chains have independent keys,
+    so editing one document never recomputes the other's stages.
+
+    Anything a stage's result depends on (thresholds, model version) must be a
+    graph input, not a global the stage function closes over. The memo is an
+    LRU bounded by the approximate bytes of the stored outputs. A stage whose
+    value is passed in `inputs` (e.g. skills read back from storage) is taken
+    as given, and the stages only it needed are skipped.
+    """
+
+    def __init__(self, max_bytes=128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._stages = OrderedDict()
+        self._memo = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def add_stage(self, name, fn, deps, hash_output=True):
+        """Register a stage; dependencies must be graph inputs or earlier stages"""
+        if name in self._stages:
+            raise ValueError(f"Stage '{name}' is already registered")
+        self._stages[name] = (fn, list(deps), hash_output)
+
+    def stage(self, name, deps, hash_output=True):
+        """Decorator form of add_stage"""
+        def register(fn):
+            self.add_stage(name, fn, deps, hash_output=hash_output)
+            return fn
+        return register
+
+    def _required(self, targets, given=()):
+        if targets is None:
+            # every stage is upstream of some sink, so walking from the sinks covers the graph
+            upstream = {d for _, deps, _ in self._stages.values() for d in deps}
+            targets = [name for name in self._stages if name not in upstream]
+        needed, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name in needed or name not in self._stages or name in given:
+                continue
+            needed.add(name)
+            stack.extend(self._stages[name][1])
+        return needed
+
+    def run(self, inputs, targets=None):
+        """Evaluate the stages needed for `targets` (default: all), reusing memoized results"""
+        result = PipelineRun()
+        for name, value in inputs.items():
+            result.values[name] = value
+            result.hashes[name] = content_hash(value)
+
+        needed = self._required(targets, inputs)
+        for name, (fn, deps, hash_output) in self._stages.items():
+            if name not in needed:
+                continue
+            missing = [d for d in deps if d not in result.hashes]
+            if missing:
+                raise KeyError(f"Stage '{name}' is missing inputs: {', '.join(missing)}")
+
+            key = content_hash((name, [result.hashes[d] for d in deps]))
+            with self._lock:
+                hit = self._memo.get(key)
+                if hit is not None:
+                    self._memo.move_to_end(key)
+
+            if hit is not None:
+                value, out_hash, _ = hit
+                result.reused.append(name)
+            else:
+                with span(name):
+                    value = fn(*[result.values[d] for d in deps])
+                out_hash = content_hash(value) if hash_output else key
+                size = approx_nbytes(value)
+                with self._lock:
+                    if key not in self._memo and size <= self.max_bytes:
+                        self._memo[key] = (value, out_hash, size)
+                        self._size += size
+                    while self._size > self.max_bytes:
+                        _, (_, _, evicted) = self._memo.popitem(last=False)
+                        self._size -= evicted
+                result.recomputed.append(name)
+
+            result.values[name] = value
+            result.hashes[name] = out_hash
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._memo), "bytes": self._size, "max_bytes": self.max_bytes}
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+            self._size = 0
@@ -0,0 +1,144 @@
+# ==========================================
+# SkillGapAI - Learning Resource Recommendations
+# Local course/resource catalog indexed by skill id and embedding,
+# ranked per (skill, status) with a vectorized lookup and a per-skill cache
+# ==========================================
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from skillgapai_core import DATA_DIR, SKILL_ALIASES
+from skillgapai_pipeline import content_hash
+from skillgapai_tracing import span
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skillgapai_resources.json")
+
+LEVELS = ("beginner", "intermediate", "advanced")
+# Missing skills start from the basics, partial ones move up a level
+TARGET_LEVEL = {"Missing": 0, "Partial": 1}
+
+# Ranking weights: relevance dominates, then rating, then how well the level fits
+W_RELEVANCE = 0.65
+W_RATING = 0.20
+W_LEVEL = 0.15
+# A resource tagged with the skill has relevance 1.0; semantic matches are capped below that
+SEMANTIC_CAP = 0.8
+MIN_RELEVANCE = 0.35
+
+
+def load_catalog(path=CATALOG_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ResourceCatalog:
+    """
+    Ranked learning resources for a skill gap.
+
+    Resources are indexed by canonical skill id (exact tags, aliases resolved
+    through SKILL_ALIASES) and, when an encoder is given, by an embedding of
+    their title and tags so untagged or free-text skills still find neighbours.
+    Rankings are memoized per (skill, status), so a batch of candidates sharing
+    the same gaps costs one lookup per distinct gap.
+    """
+
+    def __init__(self, resources=None, encoder=None, model_name="", cache_dir=None, max_cache=4096):
+        self.resources = load_catalog() if resources is None else list(resources)
+        self.encoder = encoder
+        self.max_cache = max_cache
+
+        self._rating = np.array([r.get("rating", 0.0) / 5.0 for r in self.resources], dtype=np.float64)
+        self._level = np.array([LEVELS.index(r.get("level", "beginner")) for r in self.resources], dtype=np.int64)
+
+        rows = {}
+        for i, r in enumerate(self.resources):
+            for skill in r.get("skills", []):
+                rows.setdefault(skill.lower(), []).append(i)
+        self.skill_index = {skill: np.array(ids, dtype=np.int64) for skill, ids in rows.items()}
+        self._canonical = {
+            alias.lower(): canonical
+            for canonical, aliases in SKILL_ALIASES.items() for alias in [canonical] + list(aliases)
+        }
+
+        self._emb = None
+        if encoder is not None and self.resources:
+            docs = [f"{r['title']}. {', '.join(r.get('skills', []))}" for r in self.resources]
+            cache_dir = os.path.join(DATA_DIR, "catalog_cache") if cache_dir is None else cache_dir
+            path = os.path.join(cache_dir, f"{content_hash((model_name, docs))}.npy") if model_name else None
+            if path and os.path.exists(path):
+                self._emb = np.load(path)
+            else:
+                with span("encode", resources=len(docs)):
+                    self._emb = self._unit(encoder.encode(docs))
+                if path:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    np.save(path, self._emb)
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(rows):
+        rows = np.asarray(rows, dtype=np.float32)
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        return rows / np.where(norms == 0, 1, norms)
+
+    def canonical(self, skill):
+        key = skill.strip().lower()
+        return self._canonical.get(key, key)
+
+    def _relevance(self, skills):
+        """(skills, resources) relevance: 1.0 for tagged resources, capped cosine similarity otherwise"""
+        rel = np.zeros((len(skills), len(self.resources)), dtype=np.float64)
+        if self._emb is not None and skills:
+            with span("encode", skills=len(skills)):
+                q = self._unit(self.encoder.encode(list(skills)))
+            rel = np.clip(q @ self._emb.T, 0.0, None).astype(np.float64) * SEMANTIC_CAP
+        for n, skill in enumerate(skills):
+            tagged = self.skill_index.get(self.canonical(skill))
+            if tagged is not None:
+                rel[n, tagged] = 1.0
+        return rel
+
+    def recommend_many(self, items, k=3):
+        """
+        {(skill, status): [(resource, score), ...]} for (skill, status) pairs.
+
+        Uncached pairs are ranked together: one encode, one (pairs × resources)
+        score matrix and a row-wise argpartition.
+        """
+        items = list(dict.fromkeys((s, status) for s, status in items))
+        with self._lock:
+            todo = [it for it in items if (self.canonical(it[0]), it[1], k) not in self._cache]
+
+        if todo and self.resources:
+            with span("recommend", pairs=len(todo)):
+                rel = self._relevance([s for s, _ in todo])
+                target = np.array([TARGET_LEVEL.get(status, 0) for _, status in todo])[:, None]
+                level_fit = 1.0 - np.abs(self._level[None, :] - target) / (len(LEVELS) - 1)
+                score = W_RELEVANCE * rel + W_RATING * self._rating[None, :] + W_LEVEL * level_fit
+                score[rel < MIN_RELEVANCE] = -np.inf
+
+                kk = min(k, score.shape[1])
+                top = np.argpartition(-score, kk - 1, axis=1)[:, :kk]
+                top_scores = np.take_along_axis(score, top, axis=1)
+                order = np.argsort(-top_scores, axis=1, kind="stable")
+                top = np.take_along_axis(top, order, axis=1)
+                top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            with self._lock:
+                for (skill, status), ids, scores in zip(todo, top, top_scores):
+                    ranked = [(self.resources[i], float(sc)) for i, sc in zip(ids, scores) if np.isfinite(sc)]
+                    self._cache[(self.canonical(skill), status, k)] = ranked
+                    while len(self._cache) > self.max_cache:
+                        self._cache.popitem(last=False)
+
+        with self._lock:
+            return {it: self._cache.get((self.canonical(it[0]), it[1], k), []) for it in items}
+
+    def recommend(self, skill, status="Missing", k=3):
+        return self.recommend_many([(skill, status)], k=k)[(skill, status)]
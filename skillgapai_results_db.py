@@ -0,0 +1,362 @@
+# ==========================================
+# SkillGapAI - Persistent Analysis Store
+# SQLite (WAL) history of every analysis, keyed by
+# (resume hash, JD hash, model), with Parquet export
+# ==========================================
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from skillgapai_classify import CATEGORIES, CLASSIFICATION_DTYPE, MATCHED, MISSING
+from skillgapai_core import DATA_DIR
+from skillgapai_tracing import span
+
+DB_PATH = os.path.join(DATA_DIR, "analyses.sqlite3")
+
+# Hashes per IN (...) query, well under SQLite's bound-parameter limit
+MAX_QUERY_PARAMS = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id            INTEGER PRIMARY KEY,
+    candidate     TEXT NOT NULL,
+    jd_title      TEXT NOT NULL DEFAULT '',
+    resume_hash   TEXT NOT NULL,
+    jd_hash       TEXT NOT NULL,
+    model         TEXT NOT NULL,
+    app           TEXT NOT NULL DEFAULT '',
+    overall_score INTEGER NOT NULL,
+    resume_skills TEXT NOT NULL,
+    created_at    REAL NOT NULL,
+    UNIQUE (resume_hash, jd_hash, model)
+);
+CREATE TABLE IF NOT EXISTS analysis_skills (
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    skill       TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    score       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_created ON analyses(created_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_candidate ON analyses(candidate, created_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_jd ON analyses(jd_hash);
+CREATE INDEX IF NOT EXISTS idx_skills_analysis ON analysis_skills(analysis_id);
+CREATE INDEX IF NOT EXISTS idx_skills_skill_status ON analysis_skills(skill, status);
+"""
+
+
+# ------------------------------------------
+# RECORDS
+# ------------------------------------------
+def analysis_record(candidate, resume_hash, jd_hash, model, resume_skills, jd_skills,
+                    scores, labels, overall_score, app="", jd_title=""):
+    """Plain dict describing one analysis (JD skills with their best score and label)"""
+    return {
+        "candidate": candidate,
+        "jd_title": jd_title,
+        "resume_hash": resume_hash,
+        "jd_hash": jd_hash,
+        "model": model,
+        "app": app,
+        "overall_score": int(overall_score),
+        "resume_skills": list(resume_skills),
+        "skills": [
+            (skill, CATEGORIES[int(label)], float(score))
+            for skill, score, label in zip(jd_skills, np.asarray(scores, dtype=np.float64), labels)
+        ],
+        "created_at": time.time(),
+    }
+
+
+def record_from_classification(candidate, resume_hash, jd_hash, model, resume_skills, jd_skills,
+                               classification, overall_score, **kwargs):
+    """Record from a skillgapai_classify result (Milestone 3 / integrated app)"""
+    scores = np.where(np.isfinite(classification["score"]), classification["score"], 0.0)
+    return analysis_record(candidate, resume_hash, jd_hash, model, resume_skills, jd_skills,
+                           scores, classification["label"], overall_score, **kwargs)
+
+
+def candidate_label(resume_hash, prefix="Resume"):
+    """Display name for an unnamed resume; distinct per resume so dashboards never merge them"""
+    return f"{prefix} {resume_hash[:8]}"
+
+
+def classification_from_record(record):
+    """(JD skills, classification array) rebuilt from a stored record, in JD order"""
+    jd_skills = [s for s, _, _ in record["skills"]]
+    result = np.zeros(len(jd_skills), dtype=CLASSIFICATION_DTYPE)
+    result["skill"] = np.arange(len(jd_skills))
+    result["score"] = [score for _, _, score in record["skills"]]
+    result["label"] = [CATEGORIES.index(status) for _, status, _ in record["skills"]]
+    return jd_skills, result
+
+
+def record_from_skill_sets(candidate, resume_hash, jd_hash, model, resume_skills, jd_skills, **kwargs):
+    """Record from exact-match skill sets (Milestone 2): JD skills are Matched or Missing"""
+    present = np.isin(np.asarray(jd_skills, dtype=object), np.asarray(list(resume_skills), dtype=object))
+    overall = int(present.mean() * 100) if len(jd_skills) else 0
+    return analysis_record(candidate, resume_hash, jd_hash, model, resume_skills, jd_skills,
+                           present.astype(np.float64), np.where(present, MATCHED, MISSING), overall, **kwargs)
+
+
+# ------------------------------------------
+# STORE
+# ------------------------------------------
+class AnalysisStore:
+    """
+    SQLite store of analyses shared by every app and session.
+
+    WAL mode lets dashboards read while a batch is being written; a batch of
+    records is written in one transaction with executemany for the skill rows.
+    Re-running the same (resume hash, JD hash, model) replaces the old row, and
+    `get` on that key is a single unique-index lookup.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+    # ------------------------------------------
+    # WRITES
+    # ------------------------------------------
+    def put(self, record):
+        self.put_many([record])
+
+    def put_many(self, records):
+        """Insert or replace many analyses in a single transaction"""
+        records = list(records)
+        if not records:
+            return
+        with span("store_results", analyses=len(records)), self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                cur.executemany(
+                    "DELETE FROM analyses WHERE resume_hash = ? AND jd_hash = ? AND model = ?",
+                    [(r["resume_hash"], r["jd_hash"], r["model"]) for r in records],
+                )
+                skill_rows = []
+                for r in records:
+                    cur.execute(
+                        "INSERT INTO analyses (candidate, jd_title, resume_hash, jd_hash, model, app, "
+                        "overall_score, resume_skills, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (r["candidate"], r.get("jd_title", ""), r["resume_hash"], r["jd_hash"], r["model"],
+                         r.get("app", ""), r["overall_score"], json.dumps(r["resume_skills"]), r["created_at"]),
+                    )
+                    skill_rows.extend((cur.lastrowid, s, status, score) for s, status, score in r["skills"])
+                cur.executemany(
+                    "INSERT INTO analysis_skills (analysis_id, skill, status, score) VALUES (?, ?, ?, ?)",
+                    skill_rows,
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    # ------------------------------------------
+    # READS
+    # ------------------------------------------
+    def has(self, resume_hash, jd_hash, model):
+        """True when this exact (resume, JD, model) triple is already stored"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM analyses WHERE resume_hash = ? AND jd_hash = ? AND model = ?",
+                (resume_hash, jd_hash, model),
+            ).fetchone() is not None
+
+    def get(self, resume_hash, jd_hash, model):
+        """Stored record for an exact (resume, JD, model) triple, or None"""
+        return self.get_many([resume_hash], jd_hash, model).get(resume_hash)
+
+    def get_many(self, resume_hashes, jd_hash, model):
+        """
+        {resume hash: record} for every stored analysis of these resumes against
+        one JD: one IN (...) query for the analyses and one for their skills
+        (per MAX_QUERY_PARAMS hashes).
+        """
+        hashes = list(dict.fromkeys(resume_hashes))
+        records = {}
+        with self._lock:
+            for start in range(0, len(hashes), MAX_QUERY_PARAMS):
+                chunk = hashes[start:start + MAX_QUERY_PARAMS]
+                rows = self._conn.execute(
+                    "SELECT id, resume_hash, candidate, jd_title, overall_score, resume_skills, app, created_at "
+                    f"FROM analyses WHERE jd_hash = ? AND model = ? AND resume_hash IN ({','.join('?' * len(chunk))})",
+                    (jd_hash, model, *chunk),
+                ).fetchall()
+                if not rows:
+                    continue
+                skills = {row[0]: [] for row in rows}
+                for analysis_id, skill, status, score in self._conn.execute(
+                    "SELECT analysis_id, skill, status, score FROM analysis_skills "
+                    f"WHERE analysis_id IN ({','.join('?' * len(rows))}) ORDER BY rowid",
+                    [row[0] for row in rows],
+                ):
+                    skills[analysis_id].append((skill, status, score))
+                for row in rows:
+                    records[row[1]] = {
+                        "candidate": row[2], "jd_title": row[3], "resume_hash": row[1], "jd_hash": jd_hash,
+                        "model": model, "overall_score": row[4], "resume_skills": json.loads(row[5]), "app": row[6],
+                        "skills": skills[row[0]], "created_at": row[7],
+                    }
+        return records
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def analyses(self, candidate=None, jd_hash=None, since=None, limit=None):
+        """Analysis rows (newest first) as a DataFrame"""
+        where, params = [], []
+        if candidate is not None:
+            where.append("candidate = ?")
+            params.append(candidate)
+        if jd_hash is not None:
+            where.append("jd_hash = ?")
+            params.append(jd_hash)
+        if since is not None:
+            where.append("created_at >= ?")
+            params.append(since)
+        sql = "SELECT id, candidate, jd_title, resume_hash, jd_hash, model, app, overall_score, created_at FROM analyses"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        df = self._query(sql, params)
+        df["created_at"] = pd.to_datetime(df["created_at"], unit="s")
+        return df
+
+    def skill_rows(self, analysis_ids=None):
+        """Columnar (analysis, candidate, JD, skill, status, score) rows for dashboards"""
+        sql = ("SELECT s.analysis_id, a.candidate, a.jd_title, a.jd_hash, a.created_at, s.skill, s.status, s.score "
+               "FROM analysis_skills s JOIN analyses a ON a.id = s.analysis_id")
+        params = []
+        if analysis_ids is not None:
+            ids = [int(i) for i in analysis_ids]
+            if not ids:
+                return self._query(sql + " WHERE 0")
+            sql += f" WHERE s.analysis_id IN ({','.join('?' * len(ids))})"
+            params = ids
+        df = self._query(sql, params)
+        df["created_at"] = pd.to_datetime(df["created_at"], unit="s")
+        return df
+
+    # ------------------------------------------
+    # EXPORT
+    # ------------------------------------------
+    def export_parquet(self, directory):
+        """Write analyses.parquet and analysis_skills.parquet (needs pyarrow or fastparquet)"""
+        os.makedirs(directory, exist_ok=True)
+        paths = {}
+        for table in ("analyses", "analysis_skills"):
+            paths[table] = os.path.join(directory, f"{table}.parquet")
+            self._query(f"SELECT * FROM {table}").to_parquet(paths[table], index=False)
+        return paths
+
+
+# ------------------------------------------
+# INTERCHANGE (JSON / ARROW) & COLUMNAR AGGREGATES
+# ------------------------------------------
+SKILL_COLUMNS = ["analysis_id", "candidate", "jd_title", "jd_hash", "created_at", "skill", "status", "score"]
+
+
+def records_to_json(records):
+    """Analysis records as a JSON document (the format milestone4 loads)"""
+    return json.dumps({"format": "skillgapai.analyses/v1", "analyses": list(records)}, indent=2)
+
+
+def records_to_frame(records):
+    """Flat one-row-per-JD-skill DataFrame with the same columns as AnalysisStore.skill_rows"""
+    records = list(records)
+    lengths = np.array([len(r["skills"]) for r in records], dtype=np.int64)
+    skills = [s for r in records for s in r["skills"]]
+    df = pd.DataFrame({
+        "analysis_id": np.repeat(np.arange(len(records)), lengths),
+        "candidate": np.repeat(np.array([r["candidate"] for r in records], dtype=object), lengths),
+        "jd_title": np.repeat(np.array([r.get("jd_title", "") for r in records], dtype=object), lengths),
+        "jd_hash": np.repeat(np.array([r["jd_hash"] for r in records], dtype=object), lengths),
+        "created_at": np.repeat(np.array([r["created_at"] for r in records], dtype=np.float64), lengths),
+        "skill": [s[0] for s in skills],
+        "status": [s[1] for s in skills],
+        "score": np.array([s[2] for s in skills], dtype=np.float64),
+    }, columns=SKILL_COLUMNS)
+    df["created_at"] = pd.to_datetime(df["created_at"], unit="s")
+    return df
+
+
+def read_results(name, data):
+    """Flat skill-row DataFrame from an uploaded .json, .arrow/.feather or .parquet results file"""
+    lower = name.lower()
+    if lower.endswith(".json"):
+        payload = json.loads(data)
+        return records_to_frame(payload["analyses"] if isinstance(payload, dict) else payload)
+    if lower.endswith((".arrow", ".feather")):
+        df = pd.read_feather(BytesIO(data))
+    elif lower.endswith(".parquet"):
+        df = pd.read_parquet(BytesIO(data))
+    else:
+        raise ValueError("Unsupported results file. Please upload JSON, Arrow/Feather or Parquet.")
+    missing = [c for c in ("candidate", "skill", "status") if c not in df.columns]
+    if missing:
+        raise ValueError(f"Results file is missing columns: {', '.join(missing)}")
+    if "analysis_id" not in df.columns:
+        df["analysis_id"] = pd.factorize(df["candidate"])[0]
+    return df
+
+
+def latest_per_candidate(df):
+    """Only the most recent analysis of each candidate"""
+    if "created_at" not in df.columns:
+        return df
+    latest = df.groupby("candidate")["created_at"].transform("max")
+    return df[df["created_at"] == latest]
+
+
+def skill_status_shares(df):
+    """Per skill: number of analyses in each status and their shares, most-missing first"""
+    counts = df.groupby(["skill", "status"]).size().unstack(fill_value=0)
+    counts = counts.reindex(columns=list(CATEGORIES), fill_value=0)
+    shares = counts.div(counts.sum(axis=1), axis=0).add_suffix(" %")
+    out = pd.concat([counts, shares], axis=1).reset_index()
+    return out.sort_values(["Missing", "Partial"], ascending=False, kind="stable").reset_index(drop=True)
+
+
+def majority_status(shares):
+    """Skills split into (matched, partial, missing) lists by their most common status"""
+    pct = shares[[f"{c} %" for c in CATEGORIES]].to_numpy()
+    status = np.array(CATEGORIES, dtype=object)[pct.argmax(axis=1)]
+    skills = shares["skill"].to_numpy()
+    return tuple(skills[status == c].tolist() for c in ("Matched", "Partial", "Missing"))
+
+
+def gap_matrix(df, max_candidates=40, max_skills=30):
+    """Candidate × skill status codes (Missing=0, Partial=1, Matched=2) for the most-missing skills"""
+    codes = df["status"].map({c: i for i, c in enumerate(CATEGORIES)})
+    top_skills = skill_status_shares(df)["skill"].head(max_skills)
+    sub = df.assign(code=codes)[df["skill"].isin(top_skills)]
+    matrix = sub.pivot_table(index="candidate", columns="skill", values="code", aggfunc="min")
+    matrix = matrix.reindex(columns=[s for s in top_skills if s in matrix.columns])
+    return matrix.loc[matrix.mean(axis=1).sort_values().index[:max_candidates]]
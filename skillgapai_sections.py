@@ -0,0 +1,222 @@
+# ==========================================
+# SkillGapAI - Resume Section Segmentation
+# One linear regex pass finds section headings; skill matching then
+# runs only on the sections that describe what the candidate can do
+# ==========================================
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from skillgapai_core import SKILL_ALIASES, chunk_bounds, clean_lines, clean_text
+from skillgapai_tracing import span, traced
+
+Section = namedtuple("Section", ["name", "start", "end"])
+SkillHit = namedtuple("SkillHit", ["skill", "section", "start", "end"])
+
+# Canonical section -> heading variants (longest variants are tried first)
+SECTION_HEADINGS = {
+    "Summary": ["summary", "professional summary", "profile", "objective", "career objective", "about me"],
+    "Skills": ["skills", "technical skills", "key skills", "core competencies", "competencies",
+               "technologies", "tech stack", "tools"],
+    "Experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "internships", "internship"],
+    "Projects": ["projects", "academic projects", "personal projects", "key projects"],
+    "Education": ["education", "academic background", "qualifications", "academics"],
+    "Certifications": ["certifications", "certificates", "licenses", "courses", "training"],
+    "Publications": ["publications", "papers", "research papers"],
+    "References": ["references", "referees"],
+    "Interests": ["interests", "hobbies", "hobbies and interests", "extracurricular activities"],
+}
+
+# How much a mention in each section says about actual ability.
+# Sections weighted 0 are skipped by the matcher entirely.
+SECTION_WEIGHTS = {
+    "Skills": 1.0,
+    "Experience": 0.95,
+    "Projects": 0.85,
+    "Certifications": 0.8,
+    "Summary": 0.7,
+    "Education": 0.6,
+    "Header": 0.5,   # text before the first heading (name, contact, untitled summary)
+    "Body": 0.75,    # no headings found at all
+    "Publications": 0.0,
+    "References": 0.0,
+    "Interests": 0.0,
+}
+
+_HEADING_TO_SECTION = {
+    variant: section for section, variants in SECTION_HEADINGS.items() for variant in variants
+}
+_HEADING_RE = re.compile(
+    r"(?<![\w&/-])(" + "|".join(re.escape(v) for v in sorted(_HEADING_TO_SECTION, key=len, reverse=True))
+    + r")(?![\w&/-])(\s*[:\-–—|])?",
+    flags=re.IGNORECASE,
+)
+_BOUNDARY = re.compile(r"(^|[\n.•|;·▪●*]\s*)$")
+_LINE_END = re.compile(r"[ \t\r]*(\n|$)")
+# What may sit between a line break and a heading: indentation and bullets
+_LINE_LEAD = " \t•·▪●*-–"
+# Headings are looked for in this many characters before a match to find its line start
+_LINE_LOOKBACK = 40
+
+
+def _opens_line(text, start):
+    lo = max(0, start - _LINE_LOOKBACK)
+    i = text.rfind("\n", lo, start)
+    if i < 0 and lo > 0:
+        return False
+    return not text[i + 1:start].strip(_LINE_LEAD)
+
+
+def _is_heading(text, m, has_lines):
+    """
+    A heading word counts when it ends in a delimiter ("Skills:") or is all
+    caps. In text with line breaks it must otherwise sit on a line of its own,
+    so prose such as "Skills include Python" never opens a section; text
+    collapsed onto one line falls back to Title Case at a boundary marker.
+    """
+    word = m.group(1)
+    if m.group(2) or word.isupper():
+        return True
+    if has_lines:
+        return _opens_line(text, m.start()) and bool(_LINE_END.match(text, m.end(1)))
+    # Title Case headings only count at a boundary, or when multi-word ("Work Experience")
+    return word.istitle() and (m.start() == 0 or " " in word
+                               or bool(_BOUNDARY.search(text[max(0, m.start() - 3):m.start()])))
+
+
+def _stands_alone(text, m):
+    """
+    Stricter test for headings of sections weighted 0, which drop everything
+    after them: the heading must open a line (or follow a boundary marker)
+    and be closed by a delimiter or a line end, not run into a sentence.
+    """
+    opened = m.start() == 0 or _opens_line(text, m.start()) \
+        or bool(_BOUNDARY.search(text[max(0, m.start() - 3):m.start()]))
+    return opened and bool(m.group(2) or _LINE_END.match(text, m.end(1)))
+
+
+@lru_cache(maxsize=1024)
+def _alias_pattern(alias):
+    # "py" must not match inside "happy", nor "lead" inside "misleading"
+    return re.compile(r"(?<!\w)" + re.escape(alias.lower()) + r"(?!\w)")
+
+
+def _segment(text):
+    bounds = []
+    has_lines = "\n" in text
+    for m in _HEADING_RE.finditer(text):
+        name = _HEADING_TO_SECTION[m.group(1).lower()]
+        if _is_heading(text, m, has_lines) and (SECTION_WEIGHTS.get(name, 0) > 0 or _stands_alone(text, m)):
+            bounds.append((name, m.start(), m.end()))
+    if not bounds:
+        return (Section("Body", 0, len(text)),)
+
+    sections = []
+    if bounds[0][1] > 0:
+        sections.append(Section("Header", 0, bounds[0][1]))
+    for k, (name, _, body_start) in enumerate(bounds):
+        end = bounds[k + 1][1] if k + 1 < len(bounds) else len(text)
+        sections.append(Section(name, body_start, end))
+    return tuple(sections)
+
+
+@lru_cache(maxsize=256)
+@traced("segment_sections")
+def segment_sections(text):
+    """Sections covering the whole text as (name, start, end) char offsets (cached per text)"""
+    return _segment(text)
+
+
+def document_sections(text, section_aware=True):
+    """
+    (clean_text(text), its sections) - the one place resumes are segmented.
+
+    Headings are found on clean_lines(text), which keeps the line breaks
+    clean_text removes but has the same char offsets, so the sections apply
+    unchanged to the cleaned text that skills are matched on.
+    """
+    clean = clean_text(text or "")
+    if not clean:
+        return clean, ()
+    if not section_aware:
+        return clean, (Section("Body", 0, len(clean)),)
+    return clean, segment_sections(clean_lines(text))
+
+
+_SKILLS_RE = re.compile(
+    r"(?<![\w&/-])(" + "|".join(re.escape(v) for v in sorted(SECTION_HEADINGS["Skills"], key=len, reverse=True))
+    + r")(?![\w&/-])(\s*[:\-–—|])?",
+    flags=re.IGNORECASE,
+)
+
+
+def skills_sections(text, start=0, stop=None, window=20_000):
+    """
+    Skills sections whose heading lies in text[start:stop], lazily and uncached.
+
+    For oversized text: only Skills headings are searched for, and each one is
+    segmented within the next `window` characters to find where it ends, so
+    the whole text is never segmented (or kept alive in the cache).
+    """
+    end = start
+    has_lines = "\n" in text
+    for m in _SKILLS_RE.finditer(text, start, len(text) if stop is None else stop):
+        if m.start() < end or not _is_heading(text, m, has_lines):
+            continue
+        first = _segment(text[m.start():m.start() + window])[0]
+        end = m.start() + first.end
+        yield Section("Skills", m.start() + first.start, end)
+
+
+def section_at(sections, offset):
+    """Name of the section containing a char offset"""
+    for s in sections:
+        if s.start <= offset < s.end:
+            return s.name
+    return sections[-1].name if sections else "Body"
+
+
+# ------------------------------------------
+# SECTION-AWARE MATCHING
+# ------------------------------------------
+def section_skill_hits(nlp, matcher, text, sections=None, skill_map=None, batch_size=16):
+    """
+    Every skill mention in the relevant sections, with absolute char offsets.
+
+    Sections weighted 0 (publications, references, hobbies) are never tokenized.
+    The alias fallback of phrase_match_skills applies per section, only for
+    skills the PhraseMatcher did not already find there, and only to whole words.
+    """
+    skill_map = SKILL_ALIASES if skill_map is None else skill_map
+    sections = segment_sections(text) if sections is None else sections
+    relevant = [s for s in sections if SECTION_WEIGHTS.get(s.name, 0) > 0]
+
+    # long sections are split into overlapping chunks; hits repeated in an overlap are dropped
+    pieces = [(n, s.start + a, s.start + b) for n, s in enumerate(relevant) for a, b in chunk_bounds(text[s.start:s.end])]
+    found = [set() for _ in relevant]
+    hits = []
+    seen = set()
+    with span("phrase_match_skills", sections=len(relevant)):
+        docs = nlp.pipe((text[a:b] for _, a, b in pieces), batch_size=batch_size)
+        for (n, offset, _), doc in zip(pieces, docs):
+            for match_id, start, end in matcher(doc):
+                piece = doc[start:end]
+                hit = SkillHit(nlp.vocab.strings[match_id], relevant[n].name, offset + piece.start_char, offset + piece.end_char)
+                if hit not in seen:
+                    seen.add(hit)
+                    hits.append(hit)
+                    found[n].add(hit.skill)
+        for n, section in enumerate(relevant):
+            lc = text[section.start:section.end].lower()
+            for canonical, aliases in skill_map.items():
+                if canonical in found[n]:
+                    continue
+                for alias in aliases:
+                    m = _alias_pattern(alias).search(lc)
+                    if m:
+                        hits.append(SkillHit(canonical, section.name, section.start + m.start(), section.start + m.end()))
+                        break
+    return hits
+
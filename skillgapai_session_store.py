@@ -0,0 +1,345 @@
+# ==========================================
+# SkillGapAI - Session Result Store
+# Compact per-session results with LRU eviction
+# ==========================================
+
+import hmac
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from skillgapai_classify import CATEGORIES, CLASSIFICATION_DTYPE, MATCHED, MISSING
+
+# ------------------------------------------
+# DEFAULT CAPS
+# ------------------------------------------
+SESSION_CAP_BYTES = 512 * 1024
+GLOBAL_CAP_BYTES = 64 * 1024 * 1024
+# Sessions untouched for this long are dropped (Streamlit has no session-end hook)
+SESSION_TTL_SECONDS = 30 * 60
+
+# Rough per-entry bookkeeping cost (dict slots, key string, object headers)
+ENTRY_OVERHEAD_BYTES = 256
+
+# The admin view is shown only when ?admin= matches this token; unset disables it
+ADMIN_TOKEN_ENV = "SKILLGAPAI_ADMIN_TOKEN"
+
+StoredResult = namedtuple("StoredResult", [
+    "resume_skills", "jd_skills", "classification", "overall_score", "similarity", "created_at",
+])
+
+
+# ------------------------------------------
+# SKILL VOCABULARY
+# ------------------------------------------
+class SkillVocab:
+    """
+    Interns skill names to small integer ids shared by every session.
+
+    Ids are reference-counted by the stored results that use them; when the
+    last result referencing a skill is evicted its id is freed and reused, so
+    the vocabulary never outgrows the live results.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+        self._refs = []
+        self._free = []
+        self._lock = threading.Lock()
+
+    def acquire(self, skills):
+        """Ids for `skills`, taking one reference per skill"""
+        with self._lock:
+            out = np.empty(len(skills), dtype=np.int32)
+            for i, skill in enumerate(skills):
+                idx = self._ids.get(skill)
+                if idx is None:
+                    if self._free:
+                        idx = self._free.pop()
+                        self._names[idx] = skill
+                        self._refs[idx] = 0
+                    else:
+                        idx = len(self._names)
+                        self._names.append(skill)
+                        self._refs.append(0)
+                    self._ids[skill] = idx
+                self._refs[idx] += 1
+                out[i] = idx
+            return out
+
+    def release(self, ids):
+        with self._lock:
+            for idx in ids.tolist():
+                self._refs[idx] -= 1
+                if self._refs[idx] == 0:
+                    del self._ids[self._names[idx]]
+                    self._names[idx] = None
+                    self._free.append(idx)
+
+    def names(self, ids):
+        return [self._names[i] for i in ids]
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(sys.getsizeof(name) for name in self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+
+# ------------------------------------------
+# COMPACT ENTRIES
+# ------------------------------------------
+class CompactResult:
+    """
+    Skill ids plus float16 scores / int8 labels (and optionally the float16
+    similarity matrix); no raw text, DataFrames or figures.
+
+    Building one takes vocabulary references that are released when the
+    store evicts it, so results should only be built to be put in a store.
+    """
+
+    __slots__ = ("resume_ids", "jd_ids", "scores", "labels", "overall_score", "sim", "created_at")
+
+    def __init__(self, resume_ids, jd_ids, scores, labels, overall_score, sim=None):
+        self.resume_ids = resume_ids
+        self.jd_ids = jd_ids
+        self.scores = np.asarray(scores, dtype=np.float16)
+        self.labels = np.asarray(labels, dtype=np.int8)
+        self.overall_score = int(overall_score)
+        self.sim = None if sim is None else np.asarray(sim, dtype=np.float16)
+        self.created_at = time.time()
+
+    @classmethod
+    def from_classification(cls, vocab, resume_skills, jd_skills, classification, overall_score, sim_matrix=None):
+        """Build from a skillgapai_classify result (Milestone 3 / integrated app)"""
+        return cls(vocab.acquire(resume_skills), vocab.acquire(jd_skills),
+                   classification["score"], classification["label"], overall_score, sim_matrix)
+
+    @classmethod
+    def from_skill_sets(cls, vocab, resume_skills, jd_skills):
+        """Build from exact-match skill sets (Milestone 2): JD skills are Matched or Missing"""
+        present = np.isin(np.asarray(jd_skills, dtype=object), np.asarray(list(resume_skills), dtype=object))
+        labels = np.where(present, MATCHED, MISSING)
+        overall = int(present.mean() * 100) if len(jd_skills) else 0
+        return cls(vocab.acquire(resume_skills), vocab.acquire(jd_skills), present.astype(np.float16), labels, overall)
+
+    @property
+    def nbytes(self):
+        sim = self.sim.nbytes if self.sim is not None else 0
+        return (self.resume_ids.nbytes + self.jd_ids.nbytes + self.scores.nbytes
+                + self.labels.nbytes + sim + ENTRY_OVERHEAD_BYTES)
+
+    def release(self, vocab):
+        vocab.release(self.resume_ids)
+        vocab.release(self.jd_ids)
+
+    def decode(self, vocab):
+        """StoredResult with skill names and a float32 classification array"""
+        classification = np.empty(len(self.jd_ids), dtype=CLASSIFICATION_DTYPE)
+        classification["skill"] = np.arange(len(self.jd_ids), dtype=np.int32)
+        classification["score"] = self.scores
+        classification["label"] = self.labels
+        sim = None if self.sim is None else self.sim.astype(np.float32)
+        return StoredResult(vocab.names(self.resume_ids), vocab.names(self.jd_ids),
+                            classification, self.overall_score, sim, self.created_at)
+
+    def expand(self, vocab):
+        """Decode back to {category: [(skill, score), ...]} for display"""
+        groups = {c: [] for c in CATEGORIES}
+        for skill, score, label in zip(vocab.names(self.jd_ids), self.scores.tolist(), self.labels.tolist()):
+            groups[CATEGORIES[label]].append((skill, score))
+        return groups
+
+
+class CompactText:
+    """zlib-compressed extracted text (e.g. from an uploaded PDF) plus (level, message) UI notes"""
+
+    __slots__ = ("data", "notes", "created_at")
+
+    def __init__(self, text, notes=()):
+        self.data = zlib.compress(text.encode("utf-8"), 6)
+        self.notes = tuple(notes)
+        self.created_at = time.time()
+
+    @property
+    def nbytes(self):
+        return len(self.data) + sum(len(n) for _, n in self.notes) + ENTRY_OVERHEAD_BYTES
+
+    def release(self, vocab):
+        pass
+
+    def decode(self, vocab):
+        return zlib.decompress(self.data).decode("utf-8"), self.notes
+
+
+# ------------------------------------------
+# STORE
+# ------------------------------------------
+class SessionResultStore:
+    """
+    Holds compact entries per session with a per-session and a global byte cap.
+
+    A single access-ordered index spans all sessions, so when the global cap
+    is exceeded the least recently used entry of *any* session is evicted;
+    the per-session cap only evicts within the offending session. Sessions
+    idle for longer than `session_ttl` are dropped on the next write.
+    Entries are decoded under the store lock, so callers never see skill ids
+    freed by a concurrent eviction.
+    """
+
+    def __init__(self, session_cap_bytes=SESSION_CAP_BYTES, global_cap_bytes=GLOBAL_CAP_BYTES,
+                 session_ttl=SESSION_TTL_SECONDS):
+        self.session_cap_bytes = session_cap_bytes
+        self.global_cap_bytes = global_cap_bytes
+        self.session_ttl = session_ttl
+        self.vocab = SkillVocab()
+        self._sessions = {}
+        self._lru = OrderedDict()
+        self._session_bytes = {}
+        self._last_access = {}
+        self._total = 0
+        self._evictions = 0
+        self._expired = 0
+        self._lock = threading.Lock()
+
+    def _remove(self, session_id, key):
+        entry = self._sessions[session_id].pop(key)
+        entry.release(self.vocab)
+        self._lru.pop((session_id, key), None)
+        self._session_bytes[session_id] -= entry.nbytes
+        self._total -= entry.nbytes
+        if not self._sessions[session_id]:
+            del self._sessions[session_id]
+            del self._session_bytes[session_id]
+            self._last_access.pop(session_id, None)
+
+    def _drop(self, session_id):
+        for key in list(self._sessions.get(session_id, {})):
+            self._remove(session_id, key)
+
+    def _expire(self, now):
+        stale = [sid for sid, at in self._last_access.items() if now - at > self.session_ttl]
+        for sid in stale:
+            self._drop(sid)
+        self._expired += len(stale)
+
+    def put(self, session_id, key, entry):
+        """Store a CompactResult or CompactText under (session, key)"""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            if key in self._sessions.get(session_id, {}):
+                self._remove(session_id, key)
+            self._sessions.setdefault(session_id, OrderedDict())[key] = entry
+            self._session_bytes[session_id] = self._session_bytes.get(session_id, 0) + entry.nbytes
+            self._lru[(session_id, key)] = None
+            self._last_access[session_id] = now
+            self._total += entry.nbytes
+
+            session = self._sessions[session_id]
+            while self._session_bytes[session_id] > self.session_cap_bytes and len(session) > 1:
+                self._remove(session_id, next(iter(session)))
+                self._evictions += 1
+            while self._total > self.global_cap_bytes and len(self._lru) > 1:
+                self._remove(*next(iter(self._lru)))
+                self._evictions += 1
+
+    def put_text(self, session_id, key, text, notes=()):
+        self.put(session_id, key, CompactText(text, notes))
+
+    def has(self, session_id, key):
+        with self._lock:
+            return key in self._sessions.get(session_id, {})
+
+    def get(self, session_id, key):
+        """Decoded entry (StoredResult, or (text, notes) for text) or None"""
+        with self._lock:
+            entry = self._sessions.get(session_id, {}).get(key)
+            if entry is None:
+                return None
+            self._sessions[session_id].move_to_end(key)
+            self._lru.move_to_end((session_id, key))
+            self._last_access[session_id] = time.time()
+            return entry.decode(self.vocab)
+
+    def results(self, session_id):
+        """This session's analyses, newest first, as (overall score, {category: [(skill, score)]}, created_at)"""
+        with self._lock:
+            entries = [e for e in self._sessions.get(session_id, {}).values() if isinstance(e, CompactResult)]
+            out = [(e.overall_score, e.expand(self.vocab), e.created_at) for e in entries]
+        return sorted(out, key=lambda r: r[2], reverse=True)
+
+    def drop_session(self, session_id):
+        with self._lock:
+            self._drop(session_id)
+
+    @property
+    def total_bytes(self):
+        return self._total
+
+    def usage(self):
+        """Per-session memory rows for the admin view, largest first"""
+        with self._lock:
+            rows = [
+                {
+                    "session": sid,
+                    "entries": len(entries),
+                    "bytes": self._session_bytes[sid],
+                    "cap_used_%": round(100 * self._session_bytes[sid] / self.session_cap_bytes, 1),
+                    "last_access": time.strftime("%H:%M:%S", time.localtime(self._last_access[sid])),
+                }
+                for sid, entries in self._sessions.items()
+            ]
+        return sorted(rows, key=lambda r: r["bytes"], reverse=True)
+
+    def summary(self):
+        vocab_bytes = self.vocab.nbytes
+        with self._lock:
+            return {"sessions": len(self._sessions), "entries": len(self._lru),
+                    "bytes": self._total, "global_cap_bytes": self.global_cap_bytes,
+                    "evictions": self._evictions, "expired_sessions": self._expired,
+                    "vocab_size": len(self.vocab), "vocab_bytes": vocab_bytes}
+
+
+# ------------------------------------------
+# STREAMLIT PANELS
+# ------------------------------------------
+def admin_allowed(token):
+    """True when `token` matches SKILLGAPAI_ADMIN_TOKEN (never when the variable is unset)"""
+    expected = os.environ.get(ADMIN_TOKEN_ENV)
+    return bool(expected and token) and hmac.compare_digest(str(token), expected)
+
+
+def session_panel(store, session_id, admin_token=None):
+    """Sidebar with this session's recent analyses, and the memory view for admins (Streamlit)"""
+    import pandas as pd
+    import streamlit as st
+
+    results = store.results(session_id)
+    with st.sidebar.expander(f"🕘 This session's analyses ({len(results)})"):
+        if results:
+            st.dataframe(pd.DataFrame([
+                {
+                    "time": time.strftime("%H:%M:%S", time.localtime(created_at)),
+                    "score %": score,
+                    **{c: len(groups[c]) for c in reversed(CATEGORIES)},
+                    "top missing": ", ".join(s for s, _ in groups["Missing"][:3]),
+                }
+                for score, groups, created_at in results
+            ]), use_container_width=True, hide_index=True)
+        if st.button("Clear my session results"):
+            store.drop_session(session_id)
+            st.rerun()
+
+    if admin_allowed(admin_token):
+        with st.sidebar.expander("🛠 Admin: Session Memory", expanded=True):
+            st.json(store.summary())
+            st.dataframe(pd.DataFrame(store.usage()), use_container_width=True)
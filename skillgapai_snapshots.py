@@ -0,0 +1,76 @@
+# ==========================================
+# SkillGapAI - Versioned On-Disk Snapshots
+# Structures shared by several app processes (demand corpus, skill index)
+# are saved as a new version directory made current by one atomic rename
+# of a pointer file; writers are serialized by a file lock
+# ==========================================
+
+import contextlib
+import os
+import shutil
+import time
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: saves from several processes are not serialized
+    fcntl = None
+
+POINTER = "CURRENT"
+# Versions kept on disk, so a reader that just followed the pointer can finish loading
+KEEP_VERSIONS = 2
+
+
+@contextlib.contextmanager
+def locked(directory):
+    """Exclusive cross-process lock on a snapshot directory, held while merging and writing"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, ".lock"), "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def current_version(directory):
+    """Name of the current version, or None if none was committed yet"""
+    try:
+        with open(os.path.join(directory, POINTER)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def version_path(directory, version):
+    """Directory holding a version's files; None is the flat layout written before versioning"""
+    return directory if version is None else os.path.join(directory, version)
+
+
+def commit_version(directory, write):
+    """
+    Write a new version with write(path) and make it current; returns its name.
+
+    Every file of the version is in place before the pointer moves, so a
+    reader sees either the old version or the new one, never a mix. Call
+    under locked(directory).
+    """
+    version = f"v{time.time_ns():016x}-{os.getpid()}"
+    path = os.path.join(directory, version)
+    os.makedirs(path)
+    try:
+        write(path)
+    except BaseException:
+        shutil.rmtree(path, ignore_errors=True)
+        raise
+    tmp = os.path.join(directory, POINTER + ".tmp")
+    with open(tmp, "w") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(directory, POINTER))
+
+    older = sorted(n for n in os.listdir(directory)
+                   if n.startswith("v") and n != version and os.path.isdir(os.path.join(directory, n)))
+    for name in older[:max(0, len(older) - (KEEP_VERSIONS - 1))]:
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+    return version
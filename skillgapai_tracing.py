@@ -0,0 +1,326 @@
+# ==========================================
+# SkillGapAI - Tracing & Profiling
+# Per-stage spans, optional cProfile / pyinstrument capture,
+# Prometheus metrics and JSON traces
+# ==========================================
+
+import cProfile
+import contextvars
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import pyinstrument
+except Exception:
+    pyinstrument = None
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+# Upper bounds (seconds) of the Prometheus histogram buckets
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = contextvars.ContextVar("skillgapai_tracer", default=None)
+
+
+# ------------------------------------------
+# METRICS REGISTRY (PROCESS-WIDE)
+# ------------------------------------------
+class StageMetrics:
+    """Cumulative per-(app, stage) latency histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, app, stage, seconds):
+        with self._lock:
+            series = self._series.setdefault((app, stage), {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    series["buckets"][i] += 1
+            series["sum"] += seconds
+            series["count"] += 1
+
+    def prometheus_text(self):
+        """Prometheus text exposition format"""
+        lines = [
+            "# HELP skillgapai_stage_seconds Latency of SkillGapAI pipeline stages.",
+            "# TYPE skillgapai_stage_seconds histogram",
+        ]
+        with self._lock:
+            for (app, stage), s in sorted(self._series.items()):
+                labels = f'app="{app}",stage="{stage}"'
+                for bound, count in zip(BUCKETS, s["buckets"]):
+                    lines.append(f'skillgapai_stage_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'skillgapai_stage_seconds_bucket{{{labels},le="+Inf"}} {s["count"]}')
+                lines.append(f"skillgapai_stage_seconds_sum{{{labels}}} {s['sum']:.6f}")
+                lines.append(f"skillgapai_stage_seconds_count{{{labels}}} {s['count']}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = StageMetrics()
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """Serve METRICS at http://<host>:<port>/metrics from a daemon thread (loopback only by default)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = METRICS.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, int(port)), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="skillgapai-metrics").start()
+    return server
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def metrics_server_from_env():
+    """
+    Start the metrics endpoint once per process if SKILLGAPAI_METRICS_PORT is set.
+
+    It listens on 127.0.0.1 unless SKILLGAPAI_METRICS_HOST says otherwise
+    (e.g. 0.0.0.0 for a scraper outside the pod).
+    """
+    global _server
+    port = os.environ.get("SKILLGAPAI_METRICS_PORT")
+    with _server_lock:
+        if port and _server is None:
+            _server = start_metrics_server(port, os.environ.get("SKILLGAPAI_METRICS_HOST", "127.0.0.1"))
+    return _server
+
+
+# ------------------------------------------
+# SPANS & TRACER
+# ------------------------------------------
+class Span:
+    __slots__ = ("name", "start", "end", "depth", "attrs")
+
+    def __init__(self, name, start, depth, attrs):
+        self.name = name
+        self.start = start
+        self.end = None
+        self.depth = depth
+        self.attrs = attrs
+
+    @property
+    def duration(self):
+        return (self.end or time.perf_counter()) - self.start
+
+
+class Tracer:
+    """Collects nested spans for one app run, optionally under a profiler"""
+
+    def __init__(self, app, profile=None):
+        if profile not in (None, "") + PROFILERS:
+            raise ValueError(f"Unknown profiler: {profile}")
+        self.app = app
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.finished = False
+        self._depth = 0
+        self._lock = threading.Lock()
+        self._profiler = None
+        self.profile_kind = profile or None
+        try:
+            if profile == "cprofile":
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+            elif profile == "pyinstrument" and pyinstrument is not None:
+                self._profiler = pyinstrument.Profiler()
+                self._profiler.start()
+        except (ValueError, RuntimeError):
+            # another run is already profiling (Python 3.12+ allows one cProfile per process)
+            self._profiler = None
+            self.profile_kind = None
+
+    @contextmanager
+    def span(self, name, **attrs):
+        with self._lock:
+            s = Span(name, time.perf_counter(), self._depth, attrs)
+            self.spans.append(s)
+            self._depth += 1
+        try:
+            yield s
+        finally:
+            s.end = time.perf_counter()
+            with self._lock:
+                self._depth -= 1
+            METRICS.observe(self.app, name, s.end - s.start)
+
+    def finish(self):
+        """Stop profiling (idempotent, from any thread); returns self so it can be chained"""
+        with self._lock:
+            if self.finished:
+                return self
+            self.finished = True
+        if self.profile_kind == "cprofile" and self._profiler is not None:
+            self._profiler.disable()
+        elif self.profile_kind == "pyinstrument" and self._profiler is not None:
+            self._profiler.stop()
+        return self
+
+    def profile_report(self, limit=30):
+        """Text report of the captured profile ("" when profiling is off)"""
+        if self._profiler is None:
+            return ""
+        if self.profile_kind == "cprofile":
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+            return out.getvalue()
+        return self._profiler.output_text(unicode=True, color=False)
+
+    def waterfall(self):
+        """One row per span with offsets relative to the start of the run (ms)"""
+        return [
+            {
+                "stage": s.name,
+                "depth": s.depth,
+                "start_ms": round((s.start - self.origin) * 1000, 3),
+                "end_ms": round(((s.end or time.perf_counter()) - self.origin) * 1000, 3),
+                "duration_ms": round(s.duration * 1000, 3),
+                **{k: v for k, v in s.attrs.items() if isinstance(v, (int, float, str, bool))},
+            }
+            for s in self.spans
+        ]
+
+    def to_json(self):
+        """Chrome trace-event JSON (loadable in chrome://tracing or Perfetto)"""
+        events = [
+            {
+                "name": s.name,
+                "ph": "X",
+                "ts": round((s.start - self.origin) * 1e6, 1),
+                "dur": round(s.duration * 1e6, 1),
+                "pid": os.getpid(),
+                "tid": s.depth,
+                "args": {k: v for k, v in s.attrs.items() if isinstance(v, (int, float, str, bool))},
+            }
+            for s in self.spans
+        ]
+        return json.dumps({
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "metadata": {"app": self.app, "started_at": self.started_at},
+        }, indent=2)
+
+
+_run_tracer = threading.local()
+
+
+def _finish_after(thread, tracer):
+    thread.join()
+    try:
+        tracer.finish()
+    except Exception:
+        pass  # the profiler went away with its thread
+
+
+def start_trace(app, profile=None):
+    """
+    Create a tracer and make it current for traced() stages in this context.
+
+    A run ends without reaching the end of its script on st.stop(),
+    st.rerun() or an error, so the tracer finishes itself: when the same
+    thread starts the next run, or (when profiling) once that thread exits -
+    a profiler never outlives its run and the apps need no try/finally.
+    """
+    previous = getattr(_run_tracer, "tracer", None)
+    if previous is not None:
+        previous.finish()
+    tracer = Tracer(app, profile if profile in PROFILERS else None)
+    _current.set(tracer)
+    _run_tracer.tracer = tracer
+    if tracer._profiler is not None:
+        threading.Thread(target=_finish_after, args=(threading.current_thread(), tracer),
+                         daemon=True, name="skillgapai-trace-finish").start()
+    return tracer
+
+
+def current_tracer():
+    return _current.get()
+
+
+@contextmanager
+def span(name, **attrs):
+    """Span on the current tracer; a no-op when nothing is being traced"""
+    tracer = _current.get()
+    if tracer is None:
+        yield None
+        return
+    with tracer.span(name, **attrs) as s:
+        yield s
+
+
+def traced(name):
+    """Decorator recording every call of a stage function as a span"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tracer = _current.get()
+            if tracer is None:
+                return fn(*args, **kwargs)
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ------------------------------------------
+# STREAMLIT DEBUG PANEL
+# ------------------------------------------
+def debug_panel(tracer):
+    """Per-stage waterfall, profile and exports for the current run (Streamlit)"""
+    import streamlit as st
+
+    tracer.finish()
+    rows = tracer.waterfall()
+    with st.expander("🐞 Debug: Per-Stage Timing", expanded=True):
+        if not rows:
+            st.info("No stages were traced in this run.")
+            return
+        total = max(r["end_ms"] for r in rows)
+        st.caption(f"{len(rows)} spans • {total:.1f} ms traced • profiler: {tracer.profile_kind or 'off'}")
+        st.vega_lite_chart({
+            "data": {"values": rows},
+            "mark": {"type": "bar", "tooltip": True},
+            "encoding": {
+                "y": {"field": "stage", "type": "nominal", "sort": None, "title": None},
+                "x": {"field": "start_ms", "type": "quantitative", "title": "ms since run start"},
+                "x2": {"field": "end_ms"},
+                "color": {"field": "depth", "type": "ordinal", "legend": None},
+            },
+        }, use_container_width=True)
+        st.dataframe(rows, use_container_width=True)
+
+        report = tracer.profile_report()
+        if report:
+            st.code(report)
+
+        c1, c2 = st.columns(2)
+        c1.download_button("⬇️ JSON trace", tracer.to_json(), file_name=f"{tracer.app}_trace.json",
+                           mime="application/json")
+        c2.download_button("⬇️ Prometheus metrics", METRICS.prometheus_text(),
+                           file_name="skillgapai_metrics.prom", mime="text/plain")
@@ -0,0 +1,68 @@
+# ==========================================
+# SkillGapAI - Inverted index tests
+#   python -m pytest -q test_skillgapai_index.py
+# ==========================================
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from skillgapai_index import SkillIndex
+
+
+def test_duplicate_id_in_one_batch_keeps_last_entry():
+    index = SkillIndex()
+    index.add_many([
+        ("a", {"python": 1.0}),
+        ("b", {"python": 1.0}),
+        ("a", {"sql": 1.0}),
+    ], {"a": "alice.pdf"})
+
+    assert len(index) == 2
+    assert index.names(index.postings("python")) == ["b"]
+    assert index.names(index.postings("sql")) == ["a"]
+    assert index.label("a") == "alice.pdf"
+    assert index.label("b") == "b"
+
+
+def test_duplicate_id_across_batches_and_reload(tmp_path):
+    index = SkillIndex()
+    index.add_many([("a", {"python": 1.0}), ("a", {"python": 0.6})])
+    index.add("a", {"docker": 0.8}, label="alice.pdf")
+
+    assert index.names(index.boolean(must=["python"])) == []
+    assert [c for c, _ in index.weighted({"docker": 1.0})] == ["a"]
+
+    index.save(tmp_path)
+    loaded = SkillIndex.load(tmp_path)
+    assert len(loaded) == 1
+    assert loaded.names(loaded.postings("docker")) == ["a"]
+    assert loaded.label("a") == "alice.pdf"
+
+
+def test_bad_item_leaves_index_untouched():
+    index = SkillIndex()
+    index.add("a", {"python": 1.0})
+    with pytest.raises((TypeError, ValueError)):
+        index.add_many([("b", {"sql": 1.0}), ("c", None)])
+
+    assert len(index) == 1
+    assert "b" not in index
+    assert index.names(index.postings("sql")) == []
+
+
+def test_saves_from_two_processes_merge(tmp_path):
+    first, second = SkillIndex.open(tmp_path), SkillIndex.open(tmp_path)
+    first.add("a", {"python": 1.0}, label="alice.pdf")
+    first.save(tmp_path)
+    second.add("b", {"python": 0.6, "sql": 1.0})
+    second.save(tmp_path)
+
+    loaded = SkillIndex.open(tmp_path)
+    assert sorted(loaded.candidates) == ["a", "b"]
+    assert loaded.label("a") == "alice.pdf"
+    assert [c for c, _ in loaded.weighted({"python": 1.0})] == ["a", "b"]
+
+    assert first.sync(tmp_path) == 1
+    assert first.names(first.postings("sql")) == ["b"]
+    assert first.sync(tmp_path) == 0
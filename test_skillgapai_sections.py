@@ -0,0 +1,66 @@
+# ==========================================
+# SkillGapAI - Section segmentation tests
+#   python -m pytest -q test_skillgapai_sections.py
+# ==========================================
+
+from skillgapai_core import clean_lines, clean_text
+from skillgapai_sections import document_sections, section_at, skills_sections
+
+RESUME = """Jane Doe
+jane@example.com
+
+Summary
+Data engineer. Skills include python and a knack for leadership.
+
+Skills
+Python, SQL,   Docker
+
+Experience
+Acme Corp 2019 - 2023
+  Built pipelines in Spark.
+
+Publications
+A paper on leadership
+
+Hobbies
+creative writing
+
+References
+Available on request
+"""
+
+
+def test_clean_lines_keeps_clean_text_offsets():
+    assert clean_lines(RESUME).replace("\n", " ") == clean_text(RESUME)
+
+
+def test_multi_section_resume():
+    clean, sections = document_sections(RESUME)
+
+    assert [s.name for s in sections] == [
+        "Header", "Summary", "Skills", "Experience", "Publications", "Interests", "References",
+    ]
+    body = {s.name: clean[s.start:s.end].strip() for s in sections}
+    assert body["Skills"] == "Python, SQL, Docker"
+    assert body["Experience"] == "Acme Corp 2019 - 2023 Built pipelines in Spark."
+    assert body["Publications"] == "A paper on leadership"
+    assert body["Interests"] == "creative writing"
+    # "Skills include python" is prose inside the summary, not a heading
+    assert section_at(sections, clean.index("Skills include")) == "Summary"
+
+
+def test_text_without_line_breaks_still_segments():
+    _, sections = document_sections("SKILLS: Python, SQL EXPERIENCE: Acme Corp")
+    assert [s.name for s in sections] == ["Skills", "Experience"]
+
+
+def test_section_blind_and_empty():
+    clean, sections = document_sections(RESUME, section_aware=False)
+    assert [(s.name, s.start, s.end) for s in sections] == [("Body", 0, len(clean))]
+    assert document_sections("  \n ") == ("", ())
+
+
+def test_skills_sections_on_raw_text():
+    sections = list(skills_sections(RESUME))
+    assert len(sections) == 1
+    assert RESUME[sections[0].start:sections[0].end].split() == ["Python,", "SQL,", "Docker"]